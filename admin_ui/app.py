@@ -8,115 +8,188 @@ Requires ADMIN_USERNAME and ADMIN_PASSWORD in env.
 
 from __future__ import annotations
 
+import base64
 import os
 import sys
 from pathlib import Path
+from typing import Optional
+from urllib.parse import urlencode
 
 project_root = str(Path(__file__).parent.parent)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 import config  # noqa: F401
+import pandas as pd
+import requests
 import streamlit as st
 
 API_BASE = os.environ.get("API_BASE_URL", "http://localhost:8000")
+PAGE_SIZE = 50
 
 
-def _api_get(path: str, admin_user: str, admin_pass: str) -> tuple[int, dict]:
-    import urllib.request
-    import json as _json
-    import base64
+def _basic_auth_header(admin_user: str, admin_pass: str) -> str:
+    return "Basic " + base64.b64encode(f"{admin_user}:{admin_pass}".encode()).decode()
 
-    auth = base64.b64encode(f"{admin_user}:{admin_pass}".encode()).decode()
-    req = urllib.request.Request(
-        f"{API_BASE}{path}",
-        headers={"Authorization": f"Basic {auth}"},
-        method="GET",
-    )
-    try:
-        with urllib.request.urlopen(req) as r:
-            return r.status, _json.loads(r.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
-        try:
-            return e.code, _json.loads(body)
-        except Exception:
-            return e.code, {"detail": body}
-
-
-def _api_post(
-    path: str, json: dict, admin_user: str, admin_pass: str
-) -> tuple[int, dict]:
-    import urllib.request
-    import json as _json
-    import base64
-
-    auth = base64.b64encode(f"{admin_user}:{admin_pass}".encode()).decode()
-    data = _json.dumps(json).encode()
-    req = urllib.request.Request(
-        f"{API_BASE}{path}",
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {auth}",
-        },
-        method="POST",
-    )
+
+def _get_session(auth_header: str) -> requests.Session:
+    """Return the pooled HTTP session for this browser session (keep-alive across reruns)."""
+    session = st.session_state.get("api_session")
+    if session is None:
+        session = requests.Session()
+        st.session_state.api_session = session
+    if session.headers.get("Authorization") != auth_header:
+        session.headers["Authorization"] = auth_header
+    return session
+
+
+def _json_or_detail(r: requests.Response) -> dict:
     try:
-        with urllib.request.urlopen(req) as r:
-            return r.status, _json.loads(r.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
-        try:
-            return e.code, _json.loads(body)
-        except Exception:
-            return e.code, {"detail": body}
-
-
-def _api_patch(
-    path: str, json: dict, admin_user: str, admin_pass: str
+        return r.json()
+    except ValueError:
+        return {"detail": r.text}
+
+
+def _api_get(path: str, auth_header: str) -> tuple[int, dict]:
+    r = _get_session(auth_header).get(f"{API_BASE}{path}", timeout=10)
+    return r.status_code, _json_or_detail(r)
+
+
+def _api_post(path: str, json: dict, auth_header: str) -> tuple[int, dict]:
+    r = _get_session(auth_header).post(f"{API_BASE}{path}", json=json, timeout=10)
+    return r.status_code, _json_or_detail(r)
+
+
+def _api_patch(path: str, json: dict, auth_header: str) -> tuple[int, dict]:
+    r = _get_session(auth_header).patch(f"{API_BASE}{path}", json=json, timeout=10)
+    return r.status_code, _json_or_detail(r)
+
+
+def _api_delete(path: str, auth_header: str) -> int:
+    r = _get_session(auth_header).delete(f"{API_BASE}{path}", timeout=10)
+    return r.status_code
+
+
+# Streamlit re-runs the whole script on every interaction; cache reads briefly so
+# typing in the search box or clicking unrelated widgets doesn't re-hit the API.
+# Arguments prefixed with "_" are excluded from the cache key (keeps credentials out).
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_tenants(
+    search: str, after: Optional[int], admin_user: str, _auth_header: str
 ) -> tuple[int, dict]:
-    import urllib.request
-    import json as _json
-    import base64
-
-    auth = base64.b64encode(f"{admin_user}:{admin_pass}".encode()).decode()
-    data = _json.dumps(json).encode()
-    req = urllib.request.Request(
-        f"{API_BASE}{path}",
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Basic {auth}",
-        },
-        method="PATCH",
-    )
-    try:
-        with urllib.request.urlopen(req) as r:
-            return r.status, _json.loads(r.read().decode())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
-        try:
-            return e.code, _json.loads(body)
-        except Exception:
-            return e.code, {"detail": body}
-
-
-def _api_delete(path: str, admin_user: str, admin_pass: str) -> int:
-    import urllib.request
-    import base64
-
-    auth = base64.b64encode(f"{admin_user}:{admin_pass}".encode()).decode()
-    req = urllib.request.Request(
-        f"{API_BASE}{path}",
-        headers={"Authorization": f"Basic {auth}"},
-        method="DELETE",
-    )
-    try:
-        with urllib.request.urlopen(req):
-            return 200
-    except urllib.error.HTTPError as e:
-        return e.code
+    params = {"include": "keys,usage", "limit": PAGE_SIZE}
+    if search:
+        params["q"] = search
+    if after is not None:
+        params["after"] = after
+    return _api_get(f"/admin/v1/tenants?{urlencode(params)}", _auth_header)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _hist_df(hist: tuple[tuple[str, int], ...]) -> pd.DataFrame:
+    """Usage history table; keyed on the (period_start, request_count) rows."""
+    return pd.DataFrame(list(hist), columns=["period_start", "request_count"])
+
+
+def _invalidate_cache() -> None:
+    """Drop cached reads after a mutation so the next rerun shows fresh data."""
+    _cached_tenants.clear()
+
+
+def _render_tenant_panel(t: dict, auth: str) -> None:
+    """Edit status/plan, manage keys and show usage for one tenant."""
+    tenant_id = t["id"]
+    st.subheader(f"{t.get('name', '')} ({t.get('email', '')})")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        new_status = st.selectbox(
+            "Status",
+            ["active", "suspended"],
+            index=0 if t.get("status") == "active" else 1,
+            key=f"status_{tenant_id}",
+        )
+        if st.button("Update status", key=f"upd_status_{tenant_id}"):
+            code, _ = _api_patch(
+                f"/admin/v1/tenants/{tenant_id}",
+                {"status": new_status},
+                auth,
+            )
+            if code == 200:
+                st.success("Updated")
+                _invalidate_cache()
+                st.rerun()
+            else:
+                st.error("Failed")
+
+    with col2:
+        st.caption("Change plan (1=free, 2=pro, 3=enterprise)")
+        plan_id = st.number_input(
+            "Plan ID",
+            min_value=1,
+            max_value=3,
+            value=t.get("plan_id", 1),
+            key=f"plan_{tenant_id}",
+        )
+        if st.button("Update plan", key=f"upd_plan_{tenant_id}"):
+            code, _ = _api_patch(
+                f"/admin/v1/tenants/{tenant_id}",
+                {"plan_id": plan_id},
+                auth,
+            )
+            if code == 200:
+                st.success("Updated")
+                _invalidate_cache()
+                st.rerun()
+            else:
+                st.error("Failed")
+
+    st.subheader("Keys")
+    if "keys" in t:
+        for k in t["keys"]:
+            c1, c2, c3 = st.columns([2, 2, 1])
+            with c1:
+                st.text(f"{k['name']} - {k['key_prefix']}...")
+            with c2:
+                st.caption(k["created_at"])
+            with c3:
+                if st.button("Revoke", key=f"revoke_{tenant_id}_{k['id']}"):
+                    _api_delete(
+                        f"/admin/v1/tenants/{tenant_id}/keys/{k['id']}",
+                        auth,
+                    )
+                    _invalidate_cache()
+                    st.rerun()
+
+        with st.form(f"create_key_{tenant_id}"):
+            key_name = st.text_input("New key name", value="Default")
+            if st.form_submit_button("Create key"):
+                code, kdata = _api_post(
+                    f"/admin/v1/tenants/{tenant_id}/keys",
+                    {"name": key_name},
+                    auth,
+                )
+                if code == 200:
+                    st.success("Key created (copy now):")
+                    st.code(kdata.get("key", ""))
+                    _invalidate_cache()
+                    st.rerun()
+                else:
+                    st.error(kdata.get("detail", "Failed"))
+    else:
+        st.error("Failed to load keys")
+
+    st.subheader("Usage")
+    usage_data = t.get("usage")
+    if usage_data is not None:
+        curr = usage_data.get("current", {})
+        st.metric("This month", curr.get("request_count", 0))
+        hist = usage_data.get("history", [])
+        if hist:
+            df = _hist_df(tuple((d["period_start"], d["request_count"]) for d in hist))
+            st.dataframe(df, use_container_width=True, hide_index=True)
+    else:
+        st.error("Failed to load usage")
 
 
 def main():
@@ -141,137 +214,83 @@ def main():
                 if u == admin_user and p == admin_pass:
                     st.session_state.admin_logged_in = True
                     st.session_state.admin_user = u
-                    st.session_state.admin_pass = p
+                    # Encoded once here; every API call reuses the same header value
+                    st.session_state.auth_header = _basic_auth_header(u, p)
                     st.rerun()
                 else:
                     st.error("Invalid credentials")
         return
 
     u = st.session_state.admin_user
-    p = st.session_state.admin_pass
+    auth = st.session_state.auth_header
 
     st.title("Admin UI")
     if st.sidebar.button("Logout"):
         st.session_state.admin_logged_in = False
         st.rerun()
 
-    status, data = _api_get("/admin/v1/tenants", u, p)
+    search = st.text_input("Search tenants", placeholder="Filter by name or email...").strip()
+
+    # Cursor stack for the paginator: cursors[-1] is the `after` of the current page.
+    if st.session_state.get("page_search") != search:
+        st.session_state.page_search = search
+        st.session_state.page_cursors = [None]
+    cursors = st.session_state.page_cursors
+
+    status, data = _cached_tenants(search, cursors[-1], u, auth)
     if status != 200:
         st.error(data.get("detail", "Failed to load tenants"))
         return
 
     tenants = data.get("tenants", [])
+    if not tenants and len(cursors) > 1:
+        # Page emptied out underneath us; start over from the first page
+        st.session_state.page_cursors = [None]
+        st.rerun()
     if not tenants:
-        st.info("No tenants yet.")
+        st.info("No tenants match your search." if search else "No tenants yet.")
         return
 
-    search = st.text_input("Search tenants", placeholder="Filter by name or email...")
-    if search:
-        search_lower = search.lower()
-        tenants = [
-            t
-            for t in tenants
-            if search_lower in (t.get("name", "") or "").lower()
-            or search_lower in (t.get("email", "") or "").lower()
-        ]
-
-    for t in tenants:
-        with st.expander(f"{t.get('name', '')} ({t.get('email', '')}) - {t.get('plan_name', '')} - {t.get('status', '')}"):
-            tenant_id = t["id"]
-
-            col1, col2 = st.columns(2)
-            with col1:
-                new_status = st.selectbox(
-                    "Status",
-                    ["active", "suspended"],
-                    index=0 if t.get("status") == "active" else 1,
-                    key=f"status_{tenant_id}",
-                )
-                if st.button("Update status", key=f"upd_status_{tenant_id}"):
-                    code, _ = _api_patch(
-                        f"/admin/v1/tenants/{tenant_id}",
-                        {"status": new_status},
-                        u,
-                        p,
-                    )
-                    if code == 200:
-                        st.success("Updated")
-                        st.rerun()
-                    else:
-                        st.error("Failed")
-
-            with col2:
-                st.caption("Change plan (1=free, 2=pro, 3=enterprise)")
-                plan_id = st.number_input(
-                    "Plan ID",
-                    min_value=1,
-                    max_value=3,
-                    value=t.get("plan_id", 1),
-                    key=f"plan_{tenant_id}",
-                )
-                if st.button("Update plan", key=f"upd_plan_{tenant_id}"):
-                    code, _ = _api_patch(
-                        f"/admin/v1/tenants/{tenant_id}",
-                        {"plan_id": plan_id},
-                        u,
-                        p,
-                    )
-                    if code == 200:
-                        st.success("Updated")
-                        st.rerun()
-                    else:
-                        st.error("Failed")
-
-            st.subheader("Keys")
-            status2, keys_data = _api_get(f"/admin/v1/tenants/{tenant_id}/keys", u, p)
-            if status2 == 200:
-                keys = keys_data.get("keys", [])
-                for k in keys:
-                    c1, c2, c3 = st.columns([2, 2, 1])
-                    with c1:
-                        st.text(f"{k['name']} - {k['key_prefix']}...")
-                    with c2:
-                        st.caption(k["created_at"])
-                    with c3:
-                        if st.button("Revoke", key=f"revoke_{tenant_id}_{k['id']}"):
-                            _api_delete(
-                                f"/admin/v1/tenants/{tenant_id}/keys/{k['id']}",
-                                u,
-                                p,
-                            )
-                            st.rerun()
-
-                with st.form(f"create_key_{tenant_id}"):
-                    key_name = st.text_input("New key name", value="Default")
-                    if st.form_submit_button("Create key"):
-                        code, kdata = _api_post(
-                            f"/admin/v1/tenants/{tenant_id}/keys",
-                            {"name": key_name},
-                            u,
-                            p,
-                        )
-                        if code == 200:
-                            st.success("Key created (copy now):")
-                            st.code(kdata.get("key", ""))
-                            st.rerun()
-                        else:
-                            st.error(kdata.get("detail", "Failed"))
-            else:
-                st.error("Failed to load keys")
-
-            st.subheader("Usage")
-            status3, usage_data = _api_get(
-                f"/admin/v1/tenants/{tenant_id}/usage", u, p
-            )
-            if status3 == 200:
-                curr = usage_data.get("current", {})
-                st.metric("This month", curr.get("request_count", 0))
-                hist = usage_data.get("history", [])
-                if hist:
-                    import pandas as pd
-                    st.dataframe(pd.DataFrame(hist), use_container_width=True, hide_index=True)
-            else:
-                st.error("Failed to load usage")
+    next_cursor = data.get("next_cursor")
+    c_prev, c_page, c_next = st.columns([1, 2, 1])
+    with c_prev:
+        if st.button("← Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with c_page:
+        st.caption(f"Page {len(cursors)}")
+    with c_next:
+        if st.button("Next →", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+    # One table widget regardless of tenant count; details render only for the selected row.
+    rows = [
+        {
+            "id": t["id"],
+            "name": t.get("name", ""),
+            "email": t.get("email", ""),
+            "plan": t.get("plan_name", ""),
+            "status": t.get("status", ""),
+            "keys": len(t.get("keys", [])),
+            "this month": (t.get("usage") or {}).get("current", {}).get("request_count", 0),
+            "created_at": t.get("created_at", ""),
+        }
+        for t in tenants
+    ]
+    event = st.dataframe(
+        rows,
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        key="tenant_table",
+    )
+    selected = event.selection.rows
+    if not selected or selected[0] >= len(tenants):
+        st.caption("Select a tenant to manage status, plan, keys and usage.")
+        return
+    _render_tenant_panel(tenants[selected[0]], auth)
 
 
 if __name__ == "__main__":
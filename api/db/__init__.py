@@ -4,8 +4,16 @@ Database initialization and schema for SaaS (plans, tenants, api_keys).
 
 from __future__ import annotations
 
+import os
+import threading
+
 from api.db.schema import init_db, seed_plans
 
+# Paths already initialized by this process; ensure_db() runs on every repository
+# call, so after the first time it should be a set lookup, not DDL + a plans query.
+_ready_paths: set[str] = set()
+_lock = threading.Lock()
+
 
 def _get_db_path() -> str:
     try:
@@ -16,7 +24,13 @@ def _get_db_path() -> str:
 
 
 def ensure_db() -> None:
-    """Ensure DB exists with schema and seed data."""
+    """Ensure DB exists with schema and seed data (once per path per process)."""
     path = _get_db_path()
-    init_db(path)
-    seed_plans(path)
+    if path in _ready_paths and os.path.exists(path):
+        return
+    with _lock:
+        if path in _ready_paths and os.path.exists(path):
+            return
+        init_db(path)
+        seed_plans(path)
+        _ready_paths.add(path)
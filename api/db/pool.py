@@ -0,0 +1,67 @@
+"""
+Per-thread pooled SQLite connections.
+
+Opening a connection per request re-opens the file and throws away SQLite's page
+cache. Instead each worker thread keeps one connection per database path, so hot
+lookups (login, API key auth) hit a warm cache.
+
+Connections run in autocommit mode (isolation_level=None): reads never hold an
+implicit transaction open, and writers issue BEGIN/COMMIT explicitly. A large
+statement cache keeps the prepared form of each SQL literal, so repeated queries
+skip parsing.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from api.db.schema import apply_pragmas
+
+_local = threading.local()
+
+
+def get_conn(db_path: str) -> sqlite3.Connection:
+    """Return this thread's connection to db_path, opening it on first use."""
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(
+            db_path,
+            check_same_thread=False,
+            cached_statements=512,
+            isolation_level=None,
+        )
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn)
+        conns[db_path] = conn
+    return conn
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Run a write on a pooled (autocommit) connection as one transaction.
+
+    BEGIN IMMEDIATE takes the write lock up front, so concurrent writers queue on
+    busy_timeout instead of failing mid-transaction on lock upgrade.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def close_thread_connections() -> None:
+    """Close all connections opened by the current thread."""
+    conns = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        conn.close()
+    conns.clear()
@@ -8,9 +8,34 @@ import sqlite3
 from typing import Optional
 
 
+# Per-connection tuning. journal_mode=WAL is persisted in the DB file; the rest
+# must be applied on every connection that serves traffic.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    # Wait for a concurrent writer instead of failing with "database is locked"
+    "PRAGMA busy_timeout=5000",
+    # Checkpoint every ~40MB of WAL rather than every 1000 pages (~4MB), and
+    # truncate the WAL back to 64MB after a checkpoint instead of letting it grow
+    "PRAGMA wal_autocheckpoint=10000",
+    "PRAGMA journal_size_limit=67108864",
+)
+
+
+def apply_pragmas(conn: sqlite3.Connection) -> None:
+    """Apply per-connection performance pragmas."""
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+
 def init_db(db_path: str) -> None:
-    """Create tables if they don't exist."""
+    """Create tables if they don't exist and switch the DB to WAL mode."""
     with sqlite3.connect(db_path) as conn:
+        # WAL lets readers proceed while a writer commits (auth lookups vs. usage/admin writes)
+        conn.execute("PRAGMA journal_mode=WAL")
+        apply_pragmas(conn)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS plans (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,9 +70,15 @@ def init_db(db_path: str) -> None:
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_api_keys_key_hash ON api_keys(key_hash)
         """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_api_keys_hash_tenant ON api_keys(key_hash, tenant_id)
+        """)
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_api_keys_tenant ON api_keys(tenant_id)
         """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_api_keys_prefix ON api_keys(key_prefix)
+        """)
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_tenants_email ON tenants(email)
         """)
@@ -57,8 +88,8 @@ def init_db(db_path: str) -> None:
 def seed_plans(db_path: str) -> None:
     """Seed default plans if none exist."""
     with sqlite3.connect(db_path) as conn:
-        cursor = conn.execute("SELECT COUNT(*) FROM plans")
-        if cursor.fetchone()[0] > 0:
+        cursor = conn.execute("SELECT 1 FROM plans LIMIT 1")
+        if cursor.fetchone():
             return
         conn.execute("""
             INSERT INTO plans (name, rate_limit, monthly_quota, features)
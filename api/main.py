@@ -20,10 +20,12 @@ import config  # noqa: F401
 
 from fastapi import Depends, FastAPI, Request
 
-# Ensure SaaS DB is initialized on startup
+# Ensure SaaS DB is initialized and the plan table loaded on startup
 try:
     from api.db import ensure_db
+    from api.saas.repository import load_plans
     ensure_db()
+    load_plans()
 except Exception:
     pass  # Non-fatal; will retry on first use
 from fastapi.middleware.cors import CORSMiddleware
@@ -33,8 +35,9 @@ from slowapi.errors import RateLimitExceeded
 
 from api.middleware.auth import TenantContext, verify_api_key
 from api.middleware.rate_limit import limiter
-from api.models import HealthResponse
+from api.models import HealthResponse, UsageResponse
 from api.routers import account, admin, charts
+from api.usage import usage_tracker
 
 # Configure logging
 logging.basicConfig(
@@ -80,14 +83,11 @@ async def health_check():
     return HealthResponse(status="ok", version="0.1.0")
 
 
-@app.get("/v1/usage", tags=["system"])
+@app.get("/v1/usage", response_model=UsageResponse, tags=["system"])
 async def get_usage(
     ctx: TenantContext = Depends(verify_api_key),
 ):
     """Get usage statistics for the current API key or tenant."""
-    from api.models import UsageResponse
-    from api.usage import usage_tracker
-
     if ctx.tenant_id is not None:
         usage = usage_tracker.get_usage_for_tenant(ctx.tenant_id)
         return UsageResponse(
@@ -9,12 +9,16 @@ Supports:
 
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
 from typing import Optional
 
 from fastapi import HTTPException, Security
 from fastapi.security import APIKeyHeader
 
+from api.saas.repository import get_tenant_by_key
+from config import config
+
 # API key header
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
@@ -32,7 +36,6 @@ class TenantContext:
         """Rate limit string from plan or config default."""
         if self.plan is not None and hasattr(self.plan, "rate_limit"):
             return self.plan.rate_limit
-        from config import config
         return config.rate_limit
 
     @property
@@ -47,13 +50,19 @@ class TenantContext:
         return self.tenant_id is not None and self.monthly_quota is not None
 
 
-def get_api_keys() -> set:
-    """Load API keys from centralized config (env fallback)."""
-    from config import config
+@functools.lru_cache(maxsize=1)
+def _load_api_keys() -> frozenset:
+    return frozenset(config.api_keys)
+
+
+def get_api_keys() -> frozenset:
+    """API keys from centralized config (env fallback). Parsed once per process."""
+    return _load_api_keys()
 
-    if not config.api_keys:
-        return set()
-    return set(config.api_keys)
+
+def reload_api_keys() -> None:
+    """Drop the cached key set so the next request re-reads config."""
+    _load_api_keys.cache_clear()
 
 
 async def verify_api_key(
@@ -67,38 +76,35 @@ async def verify_api_key(
     Raises:
         HTTPException 401 if key is missing or invalid.
     """
-    # 1. Try SaaS DB lookup first (if key provided)
-    if api_key:
-        try:
-            from api.saas.repository import get_tenant_by_key
-
-            result = get_tenant_by_key(api_key)
-            if result is not None:
-                return TenantContext(
-                    api_key=api_key,
-                    tenant_id=result.tenant.id,
-                    plan=result.plan,
-                )
-        except Exception:
-            pass  # Fall through to env check
-
-        # 2. Env fallback: check if key is in API_KEYS
-        valid_keys = get_api_keys()
-        if valid_keys and api_key in valid_keys:
-            return TenantContext(api_key=api_key, tenant_id=None, plan=None)
-
-    # 3. No keys configured = dev mode
     valid_keys = get_api_keys()
-    if not valid_keys:
-        return TenantContext(api_key=api_key or "dev", tenant_id=None, plan=None)
 
-    # 4. Reject
     if not api_key:
+        # 3. No keys configured = dev mode
+        if not valid_keys:
+            return TenantContext(api_key="dev", tenant_id=None, plan=None)
+        # 4. Reject
         raise HTTPException(
             status_code=401,
             detail="Missing API key. Provide X-API-Key header.",
         )
 
+    # 1. Try SaaS DB lookup first
+    try:
+        result = get_tenant_by_key(api_key)
+        if result is not None:
+            return TenantContext(
+                api_key=api_key,
+                tenant_id=result.tenant.id,
+                plan=result.plan,
+            )
+    except Exception:
+        pass  # Fall through to env check
+
+    # 2. Env fallback: check if key is in API_KEYS
+    if not valid_keys or api_key in valid_keys:
+        # Empty key set = dev mode: any key is accepted
+        return TenantContext(api_key=api_key, tenant_id=None, plan=None)
+
     raise HTTPException(
         status_code=401,
         detail="Invalid API key.",
@@ -1,18 +1,31 @@
 """
-Rate limiting middleware using slowapi.
+Rate limiting.
+
+Per-request limits use in-process token buckets keyed by tenant (or API key /
+IP), at the tenant plan's rate_limit. With REDIS_URL set, the slowapi limiter
+additionally enforces that same plan limit across all workers (plan_rate_limit).
 """
 
 from __future__ import annotations
 
+import hashlib
+import math
+import threading
+
+from fastapi import Depends, HTTPException, Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from api.middleware.auth import TenantContext, verify_api_key
+from api.middleware.token_bucket import TokenBucket, parse_rate_limits
+
 
 def _get_api_key_or_ip(request) -> str:
     """Extract rate limit key from API key header or IP address."""
     api_key = request.headers.get("X-API-Key")
     if api_key:
-        return f"key:{api_key}"
+        # Hashed so raw API keys never end up in the limiter storage (e.g. Redis)
+        return f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:32]}"
     return get_remote_address(request)
 
 
@@ -22,8 +35,96 @@ def _get_rate_limit() -> str:
     return config.rate_limit
 
 
+def _get_storage_uri() -> str:
+    """Redis when configured (shared by all workers), otherwise in-process memory."""
+    from config import config
+    return config.redis_url or "memory://"
+
+
 # Default rate limit (read from config)
 DEFAULT_RATE_LIMIT = _get_rate_limit()
 
-# Create limiter instance
-limiter = Limiter(key_func=_get_api_key_or_ip)
+# Shared (cross-worker) limiter; only needed when there is shared storage, since
+# the in-process token buckets below already cover a single worker
+limiter = Limiter(
+    key_func=_get_api_key_or_ip,
+    storage_uri=_get_storage_uri(),
+    strategy="fixed-window",
+    enabled=_get_storage_uri() != "memory://",
+)
+
+
+def _plan_limit_key(request: Request) -> str:
+    """
+    Shared-limiter key: "<plan spec>@<bucket key>" as recorded by
+    enforce_rate_limit, so _plan_limit can read the plan's limit back from it.
+    """
+    plan = getattr(request.state, "rate_limit", None)
+    if plan is None:
+        return _get_api_key_or_ip(request)
+    spec, key = plan
+    return f"{spec}@{key}"
+
+
+def _plan_limit(key: str) -> str:
+    """slowapi limit provider: the plan spec carried in the key, else the default."""
+    spec, sep, _ = key.partition("@")
+    return spec if sep else DEFAULT_RATE_LIMIT
+
+
+def plan_rate_limit():
+    """
+    Route decorator: the shared limiter at the caller's plan limit (a no-op
+    without Redis). Routes must depend on enforce_rate_limit, which resolves
+    the plan before slowapi checks the limit.
+    """
+    return limiter.limit(_plan_limit, key_func=_plan_limit_key)
+
+
+# Longest Retry-After sent: a "0/minute" plan (tenant blocked) never refills,
+# and math.ceil(inf) would raise instead of answering 429
+_MAX_RETRY_AFTER_S = 24 * 3600
+
+# One bucket set per distinct limit string (plans share them); specs are parsed
+# once. A multi-limit spec ("100/minute;1000/hour") gets one bucket per limit.
+_buckets: dict[str, tuple[TokenBucket, ...]] = {}
+_buckets_lock = threading.Lock()
+
+
+def _buckets_for(spec: str) -> tuple[TokenBucket, ...]:
+    buckets = _buckets.get(spec)
+    if buckets is None:
+        with _buckets_lock:
+            buckets = _buckets.get(spec)
+            if buckets is None:
+                buckets = _buckets[spec] = tuple(
+                    TokenBucket(rate, burst) for rate, burst in parse_rate_limits(spec)
+                )
+    return buckets
+
+
+# Fail at startup, not on every request, if the configured default is malformed
+_buckets_for(DEFAULT_RATE_LIMIT)
+
+
+async def enforce_rate_limit(
+    request: Request,
+    ctx: TenantContext = Depends(verify_api_key),
+) -> TenantContext:
+    """
+    Authenticate (verify_api_key) and take one token from each of the caller's
+    buckets (one per limit in the plan's spec).
+
+    Raises:
+        HTTPException 429 with Retry-After when a bucket is empty.
+    """
+    key = f"tenant:{ctx.tenant_id}" if ctx.tenant_id is not None else _get_api_key_or_ip(request)
+    request.state.rate_limit = (ctx.rate_limit, key)  # Read by the shared limiter
+    for bucket in _buckets_for(ctx.rate_limit):
+        if not bucket.try_consume(key):
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: {ctx.rate_limit}",
+                headers={"Retry-After": str(math.ceil(min(bucket.retry_after(key), _MAX_RETRY_AFTER_S)))},
+            )
+    return ctx
@@ -0,0 +1,71 @@
+"""
+In-process token-bucket rate limiting.
+
+Each key's state is a single (tokens, last_refill) pair, refilled on access from
+the monotonic clock: O(1) per check, with no window bookkeeping or spec parsing
+on the request path.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from limits import parse_many
+
+
+@functools.lru_cache(maxsize=64)
+def parse_rate_limits(spec: str) -> tuple[tuple[float, float], ...]:
+    """
+    Parse a limit spec the way slowapi does ("60/minute", "60 per minute",
+    "100/2 hours", or several joined by ";" or ",") into one
+    (tokens_per_second, burst) pair per limit. The burst is the full amount
+    for one period.
+
+    Raises:
+        ValueError: If the spec can't be parsed.
+    """
+    return tuple(
+        (item.amount / (item.multiples * item.GRANULARITY.seconds), float(item.amount))
+        for item in parse_many(spec)
+    )
+
+
+class TokenBucket:
+    """Token bucket per key: `rate` tokens/second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 100_000):
+        self.rate = rate
+        self.capacity = capacity
+        self._max_keys = max_keys
+        # Least recently used first, so going over max_keys evicts in O(1)
+        self._state: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_consume(self, key: str) -> bool:
+        """Take one token for `key`; False if the bucket is empty."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._state.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self._state[key] = (tokens - allowed, now)
+            if len(self._state) > self._max_keys:
+                # The idlest key: most likely refilled already, so forgetting it
+                # rarely hands out extra tokens
+                self._state.popitem(last=False)
+        return allowed
+
+    def retry_after(self, key: str) -> float:
+        """Seconds until `key` has a token again (0 if it has one now)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._state.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - last) * self.rate)
+        return max(0.0, (1 - tokens) / self.rate) if self.rate else float("inf")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state.clear()
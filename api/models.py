@@ -7,10 +7,17 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class ChartCreateResponse(BaseModel):
+class _ResponseModel(BaseModel):
+    """Base for response bodies: immutable, built once per request and serialized."""
+
+    # from_attributes: repository dataclasses can be validated directly
+    model_config = ConfigDict(frozen=True, extra="ignore", from_attributes=True)
+
+
+class ChartCreateResponse(_ResponseModel):
     """Response after creating a chart."""
 
     id: str
@@ -20,7 +27,7 @@ class ChartCreateResponse(BaseModel):
     created_at: str
 
 
-class ChartMetadataResponse(BaseModel):
+class ChartMetadataResponse(_ResponseModel):
     """Response for chart metadata."""
 
     id: str
@@ -30,26 +37,26 @@ class ChartMetadataResponse(BaseModel):
     created_at: str
 
 
-class CodeResponse(BaseModel):
+class CodeResponse(_ResponseModel):
     """Response containing generated Python code."""
 
     code: str
 
 
-class ErrorResponse(BaseModel):
+class ErrorResponse(_ResponseModel):
     """Standard error response."""
 
     detail: str
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(_ResponseModel):
     """Health check response."""
 
     status: str = "ok"
     version: str = "0.1.0"
 
 
-class UsageResponse(BaseModel):
+class UsageResponse(_ResponseModel):
     """Usage statistics response."""
 
     api_key: str
@@ -69,12 +76,12 @@ class LoginRequest(BaseModel):
     password: str
 
 
-class TokenResponse(BaseModel):
+class TokenResponse(_ResponseModel):
     access_token: str
     token_type: str = "bearer"
 
 
-class AccountMeResponse(BaseModel):
+class AccountMeResponse(_ResponseModel):
     id: int
     name: str
     email: str
@@ -86,24 +93,67 @@ class KeyCreateRequest(BaseModel):
     name: str = "Default"
 
 
-class KeyCreateResponse(BaseModel):
+class KeyCreateResponse(_ResponseModel):
     id: int
     key: str  # Full key, shown once
     name: str
 
 
-class KeyListItem(BaseModel):
+class KeyListItem(_ResponseModel):
     id: int
     name: str
     key_prefix: str
     created_at: str
 
 
-class KeyListResponse(BaseModel):
+class KeyListResponse(_ResponseModel):
     keys: list[KeyListItem]
 
 
-class AccountUsageResponse(BaseModel):
+class AccountUsageResponse(_ResponseModel):
     period_start: str
     request_count: int
     history: Optional[list[dict]] = None
+
+
+# Admin
+class AdminTenantItem(_ResponseModel):
+    id: int
+    name: str
+    email: str
+    plan_id: int
+    plan_name: str
+    status: str
+    created_at: str
+    keys: Optional[list[KeyListItem]] = None  # With include=keys
+    usage: Optional[dict] = None  # With include=usage
+
+
+class AdminTenantListResponse(_ResponseModel):
+    tenants: list[AdminTenantItem]
+    next_cursor: Optional[int] = None
+
+
+class AdminTenantUsageItem(_ResponseModel):
+    id: int
+    name: str
+    email: str
+    plan_id: int
+    plan_name: str
+    status: str
+    created_at: str
+    request_count: int
+
+
+class AdminTenantUsageListResponse(_ResponseModel):
+    period: str
+    tenants: list[AdminTenantUsageItem]
+    next_cursor: Optional[int] = None
+
+
+class AdminTenantUpdateResponse(_ResponseModel):
+    id: int
+    name: str
+    status: str
+    plan_id: int
+    plan_name: str
@@ -4,9 +4,13 @@ Account routes for Developer Portal: register, login, API keys, usage.
 
 from __future__ import annotations
 
+import hashlib
+import hmac
+import secrets
 import sqlite3
 from typing import Optional
 
+import bcrypt
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
@@ -21,8 +25,8 @@ from api.models import (
     RegisterRequest,
     TokenResponse,
 )
+from api.db.pool import get_conn
 from api.saas.jwt import create_token, decode_token
-from passlib.context import CryptContext
 
 from api.saas.repository import (
     create_api_key,
@@ -32,6 +36,7 @@ from api.saas.repository import (
     list_api_keys_for_tenant,
     revoke_api_key,
 )
+from api.ttl_cache import TTLCache
 from api.usage import usage_tracker
 
 router = APIRouter(prefix="/v1/account", tags=["account"])
@@ -51,15 +56,48 @@ async def get_current_tenant_id(
     return int(payload["sub"])
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_BCRYPT_ROUNDS = 12
+_BCRYPT_MAX_BYTES = 72  # bcrypt only uses the first 72 bytes of a password
+
+
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(
+        password.encode()[:_BCRYPT_MAX_BYTES], bcrypt.gensalt(rounds=_BCRYPT_ROUNDS)
+    ).decode()
+
+
+def _check_password(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode()[:_BCRYPT_MAX_BYTES], password_hash.encode())
+    except ValueError:  # malformed stored hash
+        return False
+
+
+# bcrypt verification costs ~100ms of CPU by design. Remember recent results for a
+# minute so repeated logins (token refresh, scripted clients) don't pay it each time.
+# Keys are HMACs under a per-process secret: raw passwords are never stored.
+_VERIFY_CACHE_SECRET = secrets.token_bytes(32)
+_verify_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def _verify_password(email: str, password: str, password_hash: str) -> bool:
+    """bcrypt check with a short-lived cache of results."""
+    cache_key = hmac.new(
+        _VERIFY_CACHE_SECRET,
+        f"{email}|{password_hash}|{password}".encode(),
+        hashlib.sha256,
+    ).digest()
+    result = _verify_cache.get(cache_key)
+    if result is None:
+        result = _check_password(password, password_hash)
+        _verify_cache.set(cache_key, result)
+    return result
 
 
 @router.post("/register", response_model=TokenResponse)
 async def register(req: RegisterRequest):
     """Register a new tenant (account)."""
-    password_hash = pwd_context.hash(req.password)
-
-    import sqlite3
+    password_hash = _hash_password(req.password)
 
     try:
         tenant = create_tenant(
@@ -90,14 +128,12 @@ async def login(req: LoginRequest):
 
     ensure_db()
 
-    with sqlite3.connect(_get_saas_db_path()) as conn:
-        conn.row_factory = sqlite3.Row
-        row = conn.execute(
-            "SELECT id, name, email, password_hash FROM tenants WHERE email = ? AND status = 'active'",
-            (req.email.lower(),),
-        ).fetchone()
+    row = get_conn(_get_saas_db_path()).execute(
+        "SELECT id, name, email, password_hash FROM tenants WHERE email = ? AND status = 'active'",
+        (req.email.lower(),),
+    ).fetchone()
 
-    if not row or not pwd_context.verify(req.password, row["password_hash"]):
+    if not row or not _verify_password(row["email"], req.password, row["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid email or password.")
 
     token = create_token(row["id"], row["email"])
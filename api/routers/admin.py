@@ -4,83 +4,224 @@ Admin routes for operators: tenants, keys, usage.
 
 from __future__ import annotations
 
-from typing import Optional
+import hashlib
+import hmac
+import secrets
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, HTTPBasic, HTTPBasicCredentials
 
+from api.models import (
+    AdminTenantItem,
+    AdminTenantListResponse,
+    AdminTenantUpdateResponse,
+    AdminTenantUsageItem,
+    AdminTenantUsageListResponse,
+    KeyCreateResponse,
+    KeyListItem,
+    KeyListResponse,
+)
+
 from api.saas.repository import (
     create_api_key,
-    get_plan,
-    get_tenant,
+    get_tenant_with_plan,
     list_api_keys_for_tenant,
+    list_api_keys_for_tenants,
     list_tenants,
+    list_tenants_with_usage,
     revoke_api_key,
     update_tenant,
 )
-from api.usage import usage_tracker
+from api.ttl_cache import TTLCache
+from api.usage import current_period, usage_tracker
+from config import config
 
 router = APIRouter(prefix="/admin/v1", tags=["admin"])
+
+# Tenant list page size (default / upper bound)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
 security_bearer = HTTPBearer(auto_error=False)
 security_basic = HTTPBasic(auto_error=False)
 
+# The admin UI sends credentials on every request; remember recently accepted ones
+# for a short while. Keys are HMAC digests (process-local secret) of the configured
+# and presented credentials, so no plaintext is kept and a config change misses.
+_AUTH_CACHE_SECRET = secrets.token_bytes(32)
+_auth_cache = TTLCache(maxsize=64, ttl=60)
+
+
+def _eq(a: str, b: str) -> bool:
+    """Constant-time string compare."""
+    return hmac.compare_digest(a.encode(), b.encode())
+
+
+def _auth_cache_key(*parts: str) -> bytes:
+    return hmac.new(_AUTH_CACHE_SECRET, "\0".join(parts).encode(), hashlib.sha256).digest()
+
+
+def _check_admin(
+    username: str,
+    password: str,
+    token: Optional[str],
+    basic: Optional[HTTPBasicCredentials],
+) -> bool:
+    """Return True if the Bearer token or Basic credentials match the admin account."""
+    # Check Bearer token (username:password as token for simplicity, or use ADMIN_SECRET)
+    if token is not None:
+        # Allow token = admin password as simple secret
+        if _eq(token, password):
+            return True
+        user, sep, pw = token.partition(":")
+        if sep and _eq(user, username) & _eq(pw, password):
+            return True
+
+    # Check Basic auth
+    if basic:
+        if _eq(basic.username, username) & _eq(basic.password, password):
+            return True
+
+    return False
+
 
 async def verify_admin(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_bearer),
-    basic: Optional[HTTPBasicCredentials] = Depends(security_basic),
+    credentials: Annotated[Optional[HTTPAuthorizationCredentials], Depends(security_bearer)],
+    basic: Annotated[Optional[HTTPBasicCredentials], Depends(security_basic)],
 ) -> None:
     """Verify admin credentials. Raises 401 if invalid."""
-    from config import config
-
     username = config.admin_username
     password = config.admin_password
 
     if not username or not password:
         raise HTTPException(status_code=503, detail="Admin auth not configured.")
 
-    # Check Bearer token (username:password as token for simplicity, or use ADMIN_SECRET)
+    token = None
     if credentials and credentials.scheme.lower() == "bearer":
-        # Token could be base64 of "user:pass" or a shared secret
         token = credentials.credentials
-        if token == password or (":" in token and token.split(":")[0] == username and token.split(":")[1] == password):
-            return
-        # Allow token = admin password as simple secret
-        if token == password:
-            return
-
-    # Check Basic auth
-    if basic:
-        if basic.username == username and basic.password == password:
-            return
+    if token is None and basic is None:
+        raise HTTPException(status_code=401, detail="Invalid admin credentials.")
+
+    cache_key = _auth_cache_key(
+        username,
+        password,
+        "" if token is None else token,
+        basic.username if basic else "",
+        basic.password if basic else "",
+    )
+    if _auth_cache.get(cache_key):
+        return
+    if _check_admin(username, password, token, basic):
+        _auth_cache.set(cache_key, True)
+        return
 
     raise HTTPException(status_code=401, detail="Invalid admin credentials.")
 
 
-@router.get("/tenants")
-async def admin_list_tenants(_: None = Depends(verify_admin)):
-    """List all tenants."""
-    return {"tenants": list_tenants()}
+# Shared dependency marker for every admin route
+AdminAuth = Annotated[None, Depends(verify_admin)]
+
+
+def _paginate(request: Request, response: Response, rows: list[dict], limit: int) -> tuple[list[dict], Optional[int]]:
+    """
+    Trim a `limit + 1` row fetch to one page and return (rows, next_cursor).
 
+    Sets the `Link: <...>; rel="next"` header when there is a next page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    next_cursor = rows[-1]["id"]
+    next_url = request.url.include_query_params(after=next_cursor, limit=limit)
+    response.headers["Link"] = f'<{next_url.path}?{next_url.query}>; rel="next"'
+    return rows, next_cursor
 
-@router.get("/tenants/{tenant_id}")
+
+@router.get("/tenants", response_model=AdminTenantListResponse, response_model_exclude_unset=True)
+async def admin_list_tenants(
+    request: Request,
+    response: Response,
+    _: AdminAuth,
+    q: Optional[str] = None,
+    include: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    List tenants, newest first. `q` filters by name or email substring (case-insensitive).
+
+    `include=keys,usage` embeds each tenant's keys and usage (current + history),
+    so a dashboard can render everything from one request.
+
+    Paginated: pass `next_cursor` from the response as `after` for the next page
+    (also advertised in the `Link: <...>; rel="next"` header).
+    """
+    tenants, next_cursor = _paginate(request, response, list_tenants(q, after=after, limit=limit + 1), limit)
+    includes = {part.strip() for part in include.split(",")} if include else set()
+    tenant_ids = [t["id"] for t in tenants]
+    if "keys" in includes:
+        keys_by_tenant = list_api_keys_for_tenants(tenant_ids)
+        for t in tenants:
+            t["keys"] = [KeyListItem.model_validate(k) for k in keys_by_tenant[t["id"]]]
+    if "usage" in includes:
+        usage_by_tenant = usage_tracker.get_usage_for_tenants(tenant_ids)
+        for t in tenants:
+            t["usage"] = usage_by_tenant[t["id"]]
+    # Unset keys/usage are left out of the response (response_model_exclude_unset)
+    return AdminTenantListResponse(
+        tenants=[AdminTenantItem(**t) for t in tenants],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/usage/tenants", response_model=AdminTenantUsageListResponse)
+async def admin_list_tenant_usage(
+    request: Request,
+    response: Response,
+    _: AdminAuth,
+    period: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="YYYY-MM (default: current)"),
+    q: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """
+    Tenants with their request count for one period, from a single query.
+
+    Prefer this over calling /tenants/{id}/usage per tenant when only the
+    period total is needed. Filtering and pagination work as in /tenants.
+    """
+    if period is None:
+        period = current_period()
+    usage_tracker.flush()  # Include buffered events in the counters
+    rows = list_tenants_with_usage(usage_tracker.db_path, period, q, after=after, limit=limit + 1)
+    rows, next_cursor = _paginate(request, response, rows, limit)
+    return AdminTenantUsageListResponse(
+        period=period,
+        tenants=[AdminTenantUsageItem(**r) for r in rows],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/tenants/{tenant_id}", response_model=AdminTenantItem, response_model_exclude_unset=True)
 async def admin_get_tenant(
     tenant_id: int,
-    _: None = Depends(verify_admin),
+    _: AdminAuth,
 ):
     """Get tenant detail."""
-    tenant = get_tenant(tenant_id)
-    if not tenant:
+    found = get_tenant_with_plan(tenant_id)
+    if not found:
         raise HTTPException(status_code=404, detail="Tenant not found.")
-    plan = get_plan(tenant.plan_id)
-    return {
-        "id": tenant.id,
-        "name": tenant.name,
-        "email": tenant.email,
-        "plan_id": tenant.plan_id,
-        "plan_name": plan.name if plan else None,
-        "status": tenant.status,
-        "created_at": tenant.created_at,
-    }
+    tenant, plan = found.tenant, found.plan
+    return AdminTenantItem(
+        id=tenant.id,
+        name=tenant.name,
+        email=tenant.email,
+        plan_id=tenant.plan_id,
+        plan_name=plan.name,
+        status=tenant.status,
+        created_at=tenant.created_at,
+    )
 
 
 from pydantic import BaseModel
@@ -91,61 +232,56 @@ class TenantUpdateRequest(BaseModel):
     plan_id: Optional[int] = None
 
 
-@router.patch("/tenants/{tenant_id}")
+@router.patch("/tenants/{tenant_id}", response_model=AdminTenantUpdateResponse)
 async def admin_update_tenant(
     tenant_id: int,
+    _: AdminAuth,
     body: TenantUpdateRequest = TenantUpdateRequest(),
-    _: None = Depends(verify_admin),
 ):
     """Update tenant status or plan."""
-    tenant = update_tenant(tenant_id, status=body.status, plan_id=body.plan_id)
-    if not tenant:
+    found = update_tenant(tenant_id, status=body.status, plan_id=body.plan_id)
+    if not found:
         raise HTTPException(status_code=404, detail="Tenant not found.")
-    plan = get_plan(tenant.plan_id)
-    return {
-        "id": tenant.id,
-        "name": tenant.name,
-        "status": tenant.status,
-        "plan_id": tenant.plan_id,
-        "plan_name": plan.name if plan else None,
-    }
+    tenant, plan = found.tenant, found.plan
+    return AdminTenantUpdateResponse(
+        id=tenant.id,
+        name=tenant.name,
+        status=tenant.status,
+        plan_id=tenant.plan_id,
+        plan_name=plan.name,
+    )
 
 
-@router.get("/tenants/{tenant_id}/keys")
+@router.get("/tenants/{tenant_id}/keys", response_model=KeyListResponse)
 async def admin_list_keys(
     tenant_id: int,
-    _: None = Depends(verify_admin),
+    _: AdminAuth,
 ):
     """List API keys for a tenant."""
     keys = list_api_keys_for_tenant(tenant_id)
-    return {
-        "keys": [
-            {"id": k.id, "name": k.name, "key_prefix": k.key_prefix, "created_at": k.created_at}
-            for k in keys
-        ]
-    }
+    return KeyListResponse(keys=[KeyListItem.model_validate(k) for k in keys])
 
 
 class KeyCreateBody(BaseModel):
     name: str = "Default"
 
 
-@router.post("/tenants/{tenant_id}/keys")
+@router.post("/tenants/{tenant_id}/keys", response_model=KeyCreateResponse)
 async def admin_create_key(
     tenant_id: int,
+    _: AdminAuth,
     body: KeyCreateBody = KeyCreateBody(),
-    _: None = Depends(verify_admin),
 ):
     """Create API key for a tenant."""
     raw_key, info = create_api_key(tenant_id, body.name)
-    return {"id": info.id, "key": raw_key, "name": info.name}
+    return KeyCreateResponse(id=info.id, key=raw_key, name=info.name)
 
 
 @router.delete("/tenants/{tenant_id}/keys/{key_id}")
 async def admin_revoke_key(
     tenant_id: int,
     key_id: int,
-    _: None = Depends(verify_admin),
+    _: AdminAuth,
 ):
     """Revoke an API key."""
     ok = revoke_api_key(key_id, tenant_id=tenant_id)
@@ -157,9 +293,13 @@ async def admin_revoke_key(
 @router.get("/tenants/{tenant_id}/usage")
 async def admin_get_usage(
     tenant_id: int,
-    _: None = Depends(verify_admin),
+    _: AdminAuth,
 ):
     """Get usage for a tenant."""
     usage = usage_tracker.get_usage_for_tenant(tenant_id)
     history = usage_tracker.get_usage_history_for_tenant(tenant_id)
-    return {"current": usage, "history": history}
+    # Plain dicts built here: serialize directly, no response model validation
+    return Response(
+        content=orjson.dumps({"current": usage, "history": history}),
+        media_type="application/json",
+    )
@@ -5,35 +5,39 @@ Chart API routes: /v1/charts
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import HTMLResponse, Response
 
-from api.middleware.auth import TenantContext, verify_api_key
-from api.middleware.rate_limit import DEFAULT_RATE_LIMIT, limiter
+from api.middleware.auth import TenantContext
+from api.middleware.rate_limit import enforce_rate_limit, plan_rate_limit
 from api.models import ChartCreateResponse, ChartMetadataResponse, CodeResponse
 from api.storage import chart_store
+from api.usage import usage_tracker
+from api.usage_counter import quota_counter
 from chart_service import create_chart
 from chart_service.exporters.code import CodeExporter
-from chart_service.exporters.embed import EmbedExporter
-from chart_service.exporters.image import ImageExporter
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1/charts", tags=["charts"])
 
+# Uploads pandas can read straight from the spooled temp file
+STREAMED_UPLOAD_EXTENSIONS = (".csv", ".xlsx", ".xls")
+# Other uploads (images) are read into memory, up to this size
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
 
 @router.post("", response_model=ChartCreateResponse)
-@limiter.limit(DEFAULT_RATE_LIMIT)
+@plan_rate_limit()
 async def create_chart_endpoint(
     request: Request,
     data: Optional[str] = Form(None, description="Raw text data (tab/comma/space separated)"),
     file: Optional[UploadFile] = File(None, description="File upload (CSV, Excel, or Image)"),
     chart_type: str = Form("auto", description="Chart type: auto, line, bar, scatter, pie"),
     title: Optional[str] = Form(None, description="Optional chart title"),
-    ctx: TenantContext = Depends(verify_api_key),
+    ctx: TenantContext = Depends(enforce_rate_limit),
 ):
     """
     Create a chart from text data or file upload.
@@ -49,23 +53,28 @@ async def create_chart_endpoint(
             detail="Provide either 'data' (text) or 'file' (upload).",
         )
 
-    # Quota check for SaaS tenants
+    # Quota check for SaaS tenants: reserve one unit up front, give it back on failure
+    reserved = False
     if ctx.has_quota():
-        from api.usage import usage_tracker
-
-        period = datetime.now(timezone.utc).strftime("%Y-%m")
-        count = usage_tracker.get_count_for_tenant(ctx.tenant_id, period)
-        if count >= ctx.monthly_quota:
+        if not await quota_counter.incr_and_check(ctx.tenant_id, ctx.monthly_quota):
             raise HTTPException(
                 status_code=429,
                 detail=f"Quota exceeded for this period. Limit: {ctx.monthly_quota} charts/month.",
             )
+        reserved = True
 
     try:
         if file:
-            file_bytes = await file.read()
             filename = file.filename
-            raw_input = file_bytes
+            if filename and filename.lower().endswith(STREAMED_UPLOAD_EXTENSIONS):
+                raw_input = file.file
+            else:
+                raw_input = await file.read(MAX_UPLOAD_BYTES + 1)
+                if len(raw_input) > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum size is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.",
+                    )
         else:
             raw_input = data
             filename = None
@@ -79,11 +88,10 @@ async def create_chart_endpoint(
 
         # Store chart
         chart_id = chart_store.save(fig, parsed.dataframe, config)
+        reserved = False  # Chart exists; the quota unit is spent
 
         # Track usage
         try:
-            from api.usage import usage_tracker
-
             if ctx.tenant_id is not None:
                 usage_tracker.record_for_tenant(ctx.tenant_id, "/v1/charts")
             else:
@@ -105,19 +113,24 @@ async def create_chart_endpoint(
             created_at=chart_data["created_at"],
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Chart creation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
+    finally:
+        if reserved:
+            await quota_counter.release(ctx.tenant_id)
 
 
 @router.get("/{chart_id}", response_model=ChartMetadataResponse)
-@limiter.limit(DEFAULT_RATE_LIMIT)
+@plan_rate_limit()
 async def get_chart(
     request: Request,
     chart_id: str,
-    ctx: TenantContext = Depends(verify_api_key),
+    ctx: TenantContext = Depends(enforce_rate_limit),
 ):
     """Get chart metadata by ID."""
     data = chart_store.get(chart_id)
@@ -137,23 +150,21 @@ async def get_chart(
 
 
 @router.get("/{chart_id}/image")
-@limiter.limit(DEFAULT_RATE_LIMIT)
+@plan_rate_limit()
 async def get_chart_image(
     request: Request,
     chart_id: str,
-    ctx: TenantContext = Depends(verify_api_key),
+    ctx: TenantContext = Depends(enforce_rate_limit),
 ):
     """Get chart as PNG image."""
-    fig = chart_store.get_figure(chart_id)
-    if fig is None:
-        raise HTTPException(status_code=404, detail="Chart not found.")
-
     try:
-        img_bytes = ImageExporter.to_bytes(fig)
-        return Response(content=img_bytes, media_type="image/png")
+        img_bytes = chart_store.get_png(chart_id)
     except Exception as e:
         logger.error(f"Image export failed: {e}")
         raise HTTPException(status_code=500, detail=f"Image export failed: {str(e)}")
+    if img_bytes is None:
+        raise HTTPException(status_code=404, detail="Chart not found.")
+    return Response(content=img_bytes, media_type="image/png")
 
 
 @router.get("/{chart_id}/embed", response_class=HTMLResponse)
@@ -165,20 +176,18 @@ async def get_chart_embed(
 
     Note: This endpoint is public (no auth required) for embedding.
     """
-    fig = chart_store.get_figure(chart_id)
-    if fig is None:
+    html = chart_store.get_embed_html(chart_id)
+    if html is None:
         raise HTTPException(status_code=404, detail="Chart not found.")
-
-    html = EmbedExporter.generate_embed_html(fig)
     return HTMLResponse(content=html)
 
 
 @router.get("/{chart_id}/code", response_model=CodeResponse)
-@limiter.limit(DEFAULT_RATE_LIMIT)
+@plan_rate_limit()
 async def get_chart_code(
     request: Request,
     chart_id: str,
-    ctx: TenantContext = Depends(verify_api_key),
+    ctx: TenantContext = Depends(enforce_rate_limit),
 ):
     """Get reproducible Python code for the chart."""
     df = chart_store.get_dataframe(chart_id)
@@ -4,19 +4,31 @@ JWT utilities for account (Developer Portal) authentication.
 
 from __future__ import annotations
 
+import hashlib
 import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from jose import JWTError, jwt
+
+from api.ttl_cache import TTLCache
+
 JWT_SECRET = os.environ.get("JWT_SECRET", "change-me-in-production")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRES_HOURS = 24 * 7  # 7 days
 
+_ALGORITHMS = [JWT_ALGORITHM]
+
+# Verified payloads keyed by a digest of the token (raw tokens are not kept).
+# Entries live at most 60s and never past the token's own `exp`; invalid tokens
+# are never cached.
+_DECODE_CACHE_TTL = 60
+_decode_cache = TTLCache(maxsize=10_000, ttl=_DECODE_CACHE_TTL)
+
 
 def create_token(tenant_id: int, email: str) -> str:
     """Create a JWT for the given tenant."""
-    from jose import jwt
-
     now = datetime.now(timezone.utc)
     expire = now + timedelta(hours=JWT_EXPIRES_HOURS)
     payload = {
@@ -30,10 +42,15 @@ def create_token(tenant_id: int, email: str) -> str:
 
 def decode_token(token: str) -> Optional[dict]:
     """Decode and validate JWT. Returns payload or None."""
-    from jose import JWTError, jwt
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    cache_key = hashlib.sha256(token.encode()).digest()[:16]
+    payload = _decode_cache.get(cache_key)
+    if payload is not None:
         return payload
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=_ALGORITHMS)
     except JWTError:
         return None
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _decode_cache.set(cache_key, payload, ttl=min(_DECODE_CACHE_TTL, exp - time.time()))
+    return payload
@@ -4,15 +4,18 @@ SaaS repository: tenant, plan, API key CRUD and lookup.
 
 from __future__ import annotations
 
+import base64
 import hashlib
+import hmac
 import secrets
-import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Optional
 
 # Ensure DB is initialized on first use
 from api.db import ensure_db
+from api.db.pool import get_conn, write_transaction
+from api.ttl_cache import TTLCache
 
 
 @dataclass
@@ -61,8 +64,84 @@ def _ensure_db():
     ensure_db()
 
 
-def _hash_key(api_key: str) -> str:
-    return hashlib.sha256(api_key.encode()).hexdigest()
+def _conn_for_thread():
+    """This thread's pooled connection to the SaaS DB (see api.db.pool)."""
+    return get_conn(_get_db_path())
+
+
+_sha256 = hashlib.sha256
+
+
+def _hash_key(api_key: str | bytes) -> str:
+    return _sha256(api_key.encode() if isinstance(api_key, str) else api_key).hexdigest()
+
+
+# Stored alongside the hash for display and as the lookup index probe. Keys
+# created before the prefix was widened store the first 8 characters only.
+KEY_PREFIX_LEN = 12
+_LEGACY_KEY_PREFIX_LEN = 8
+
+
+def _key_prefix(api_key: str) -> str:
+    return api_key[:KEY_PREFIX_LEN]
+
+
+# Resolved key lookups: (db_path, key_hash) -> (expires_at, TenantWithPlan).
+# Cleared on local key/tenant changes; the TTL bounds staleness for changes made
+# by other workers. Misses are not cached (the prefix probe makes them cheap and a
+# key created elsewhere should work immediately).
+_tenant_cache = TTLCache(maxsize=10_000, ttl=30)
+
+
+def _lookup_key(db_path: str, key_hash: str, key_prefix: str) -> Optional[tuple[Optional[str], TenantWithPlan]]:
+    """
+    Resolve a key hash to (expires_at, TenantWithPlan), or None.
+
+    Probes the key_prefix index first and compares hashes only for the few
+    candidates that share the prefix.
+    """
+    cache_key = (db_path, key_hash)
+    cached = _tenant_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rows = get_conn(db_path).execute("""
+        SELECT k.key_hash, k.expires_at,
+               t.id as t_id, t.name as t_name, t.email, t.plan_id, t.status, t.created_at as t_created,
+               p.id as p_id, p.name as p_name, p.rate_limit, p.monthly_quota, p.features
+        FROM api_keys k
+        JOIN tenants t ON k.tenant_id = t.id
+        JOIN plans p ON t.plan_id = p.id
+        WHERE k.key_prefix IN (?, ?) AND t.status = 'active'
+    """, (key_prefix, key_prefix[:_LEGACY_KEY_PREFIX_LEN])).fetchall()
+
+    for row in rows:
+        if not hmac.compare_digest(row["key_hash"], key_hash):
+            continue
+        tenant = Tenant(
+            id=row["t_id"],
+            name=row["t_name"],
+            email=row["email"],
+            plan_id=row["plan_id"],
+            status=row["status"],
+            created_at=row["t_created"],
+        )
+        plan = Plan(
+            id=row["p_id"],
+            name=row["p_name"],
+            rate_limit=row["rate_limit"],
+            monthly_quota=row["monthly_quota"],
+            features=row["features"],
+        )
+        found = (row["expires_at"], TenantWithPlan(tenant=tenant, plan=plan))
+        _tenant_cache.set(cache_key, found)
+        return found
+    return None
+
+
+def _invalidate_key_cache() -> None:
+    """Forget cached key lookups (call after creating/revoking keys or changing tenants)."""
+    _tenant_cache.clear()
 
 
 def get_tenant_by_key(api_key: str) -> Optional[TenantWithPlan]:
@@ -71,25 +150,11 @@ def get_tenant_by_key(api_key: str) -> Optional[TenantWithPlan]:
     Returns None if not found, tenant suspended, or key expired.
     """
     _ensure_db()
-    key_hash = _hash_key(api_key)
-    db_path = _get_db_path()
-
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        row = conn.execute("""
-            SELECT k.id, k.tenant_id, k.expires_at,
-                   t.id as t_id, t.name as t_name, t.email, t.plan_id, t.status, t.created_at as t_created,
-                   p.id as p_id, p.name as p_name, p.rate_limit, p.monthly_quota, p.features
-            FROM api_keys k
-            JOIN tenants t ON k.tenant_id = t.id
-            JOIN plans p ON t.plan_id = p.id
-            WHERE k.key_hash = ? AND t.status = 'active'
-        """, (key_hash,)).fetchone()
-
-    if row is None:
+    found = _lookup_key(_get_db_path(), _hash_key(api_key), _key_prefix(api_key))
+    if found is None:
         return None
 
-    expires_at = row["expires_at"]
+    expires_at, tenant_with_plan = found
     if expires_at:
         try:
             exp = datetime.fromisoformat(expires_at)
@@ -98,54 +163,77 @@ def get_tenant_by_key(api_key: str) -> Optional[TenantWithPlan]:
         except (ValueError, TypeError):
             pass
 
-    tenant = Tenant(
-        id=row["t_id"],
-        name=row["t_name"],
-        email=row["email"],
-        plan_id=row["plan_id"],
-        status=row["status"],
-        created_at=row["t_created"],
-    )
-    plan = Plan(
-        id=row["p_id"],
-        name=row["p_name"],
-        rate_limit=row["rate_limit"],
-        monthly_quota=row["monthly_quota"],
-        features=row["features"],
-    )
-    return TenantWithPlan(tenant=tenant, plan=plan)
+    return tenant_with_plan
+
+
+# Plans are a handful of near-static rows: loaded once per DB and served from
+# memory. Call invalidate_plans() after editing the plans table.
+_plan_cache: dict[str, dict[int, Plan]] = {}
+
+
+def load_plans() -> dict[int, Plan]:
+    """(Re)load every plan of the SaaS DB into the in-memory plan table."""
+    _ensure_db()
+    rows = _conn_for_thread().execute(
+        "SELECT id, name, rate_limit, monthly_quota, features FROM plans"
+    ).fetchall()
+    plans = {
+        row["id"]: Plan(
+            id=row["id"],
+            name=row["name"],
+            rate_limit=row["rate_limit"],
+            monthly_quota=row["monthly_quota"],
+            features=row["features"],
+        )
+        for row in rows
+    }
+    _plan_cache[_get_db_path()] = plans
+    return plans
+
+
+def invalidate_plans() -> None:
+    """Drop the in-memory plan table; the next get_plan reloads it."""
+    _plan_cache.clear()
 
 
 def get_plan(plan_id: int) -> Optional[Plan]:
+    plans = _plan_cache.get(_get_db_path())
+    if plans is None:
+        plans = load_plans()
+    return plans.get(plan_id)
+
+
+def get_tenant(tenant_id: int) -> Optional[Tenant]:
     _ensure_db()
-    with sqlite3.connect(_get_db_path()) as conn:
-        conn.row_factory = sqlite3.Row
-        row = conn.execute(
-            "SELECT id, name, rate_limit, monthly_quota, features FROM plans WHERE id = ?",
-            (plan_id,),
-        ).fetchone()
+    row = _conn_for_thread().execute(
+        "SELECT id, name, email, plan_id, status, created_at FROM tenants WHERE id = ?",
+        (tenant_id,),
+    ).fetchone()
     if row is None:
         return None
-    return Plan(
+    return Tenant(
         id=row["id"],
         name=row["name"],
-        rate_limit=row["rate_limit"],
-        monthly_quota=row["monthly_quota"],
-        features=row["features"],
+        email=row["email"],
+        plan_id=row["plan_id"],
+        status=row["status"],
+        created_at=row["created_at"],
     )
 
 
-def get_tenant(tenant_id: int) -> Optional[Tenant]:
+def get_tenant_with_plan(tenant_id: int) -> Optional[TenantWithPlan]:
+    """Tenant and its plan in one JOIN (instead of get_tenant + get_plan)."""
     _ensure_db()
-    with sqlite3.connect(_get_db_path()) as conn:
-        conn.row_factory = sqlite3.Row
-        row = conn.execute(
-            "SELECT id, name, email, plan_id, status, created_at FROM tenants WHERE id = ?",
-            (tenant_id,),
-        ).fetchone()
+    row = _conn_for_thread().execute("""
+        SELECT t.id, t.name, t.email, t.plan_id, t.status, t.created_at,
+               p.name as p_name, p.rate_limit, p.monthly_quota, p.features
+        FROM tenants t
+        JOIN plans p ON t.plan_id = p.id
+        WHERE t.id = ?
+    """, (tenant_id,)).fetchone()
     if row is None:
         return None
-    return Tenant(
+    tenant = Tenant(
         id=row["id"],
         name=row["name"],
         email=row["email"],
@@ -153,6 +241,14 @@ def get_tenant(tenant_id: int) -> Optional[Tenant]:
         status=row["status"],
         created_at=row["created_at"],
     )
+    plan = Plan(
+        id=row["plan_id"],
+        name=row["p_name"],
+        rate_limit=row["rate_limit"],
+        monthly_quota=row["monthly_quota"],
+        features=row["features"],
+    )
+    return TenantWithPlan(tenant=tenant, plan=plan)
 
 
 def create_tenant(
@@ -164,7 +260,7 @@ def create_tenant(
     """Create a new tenant. plan_id=1 is typically Free."""
     _ensure_db()
     now = datetime.now(timezone.utc).isoformat()
-    with sqlite3.connect(_get_db_path()) as conn:
+    with write_transaction(_conn_for_thread()) as conn:
         cursor = conn.execute(
             "INSERT INTO tenants (name, email, password_hash, plan_id, status, created_at) VALUES (?, ?, ?, ?, 'active', ?)",
             (name, email, password_hash, plan_id, now),
@@ -180,7 +276,8 @@ def update_tenant(
     *,
     status: Optional[str] = None,
     plan_id: Optional[int] = None,
-) -> Optional[Tenant]:
+) -> Optional[TenantWithPlan]:
+    """Update status and/or plan; returns the refreshed tenant with its plan."""
     _ensure_db()
     updates = []
     params = []
@@ -191,27 +288,99 @@ def update_tenant(
         updates.append("plan_id = ?")
         params.append(plan_id)
     if not updates:
-        return get_tenant(tenant_id)
+        return get_tenant_with_plan(tenant_id)
     params.append(tenant_id)
-    with sqlite3.connect(_get_db_path()) as conn:
+    with write_transaction(_conn_for_thread()) as conn:
         conn.execute(
             f"UPDATE tenants SET {', '.join(updates)} WHERE id = ?",
             params,
         )
-    return get_tenant(tenant_id)
+    _invalidate_key_cache()
+    return get_tenant_with_plan(tenant_id)
 
 
-def list_tenants() -> list[dict]:
-    """List all tenants with plan name."""
+_TENANT_LIST_SELECT = """
+    SELECT t.id, t.name, t.email, t.status, t.created_at, p.name as plan_name, p.id as plan_id{extra}
+    FROM tenants t
+    JOIN plans p ON t.plan_id = p.id{join}
+"""
+
+
+def _tenant_page_sql(
+    sql: str,
+    params: list,
+    q: Optional[str],
+    after: Optional[int],
+    limit: Optional[int],
+) -> str:
+    """Append the search filter, keyset cursor and limit of a tenant listing (extends params)."""
+    where: list[str] = []
+    if q:
+        pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where.append("(t.name LIKE ? ESCAPE '\\' OR t.email LIKE ? ESCAPE '\\')")
+        params += [pattern, pattern]
+    if after is not None:
+        where.append("t.id < ?")
+        params.append(after)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY t.id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql
+
+
+def list_tenants(
+    q: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """
+    List tenants with plan name, newest first, optionally filtered by a name/email substring.
+
+    Keyset pagination: pass the last seen id as `after` to get the next `limit` rows.
+    """
+    _ensure_db()
+    params: list = []
+    sql = _tenant_page_sql(_TENANT_LIST_SELECT.format(extra="", join=""), params, q, after, limit)
+    rows = _conn_for_thread().execute(sql, params).fetchall()
+    return [dict(r) for r in rows]
+
+
+def list_tenants_with_usage(
+    usage_db_path: str,
+    period: str,
+    q: Optional[str] = None,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """
+    list_tenants plus each tenant's `request_count` for `period` (YYYY-MM), in one query.
+
+    Counts come from the usage DB's maintained usage_counters table, attached to
+    this connection for the duration of the query (tenants without usage get 0).
+    """
     _ensure_db()
-    with sqlite3.connect(_get_db_path()) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute("""
-            SELECT t.id, t.name, t.email, t.status, t.created_at, p.name as plan_name, p.id as plan_id
-            FROM tenants t
-            JOIN plans p ON t.plan_id = p.id
-            ORDER BY t.created_at DESC
-        """).fetchall()
+    params: list = [period]
+    sql = _tenant_page_sql(
+        _TENANT_LIST_SELECT.format(
+            extra=", COALESCE(u.count, 0) as request_count",
+            join="\n    LEFT JOIN usage_db.usage_counters u ON u.tenant_id = t.id AND u.period = ?",
+        ),
+        params,
+        q,
+        after,
+        limit,
+    )
+    conn = _conn_for_thread()
+    # Detached again afterwards so write transactions on the pooled connection
+    # never take locks on the usage DB
+    conn.execute("ATTACH DATABASE ? AS usage_db", (usage_db_path,))
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.execute("DETACH DATABASE usage_db")
     return [dict(r) for r in rows]
 
 
@@ -221,17 +390,19 @@ def create_api_key(tenant_id: int, name: str = "Default") -> tuple[str, ApiKeyIn
     Returns (raw_key, ApiKeyInfo). Raw key is shown only once.
     """
     _ensure_db()
-    raw_key = secrets.token_urlsafe(32)
-    key_hash = _hash_key(raw_key)
-    key_prefix = raw_key[:8] if len(raw_key) >= 8 else raw_key
+    raw_bytes = base64.urlsafe_b64encode(secrets.token_bytes(32)).rstrip(b"=")
+    raw_key = raw_bytes.decode("ascii")
+    key_hash = _hash_key(raw_bytes)  # Already bytes: no re-encode
+    key_prefix = _key_prefix(raw_key)
     now = datetime.now(timezone.utc).isoformat()
 
-    with sqlite3.connect(_get_db_path()) as conn:
+    with write_transaction(_conn_for_thread()) as conn:
         cursor = conn.execute(
             "INSERT INTO api_keys (tenant_id, key_hash, key_prefix, name, created_at) VALUES (?, ?, ?, ?, ?)",
             (tenant_id, key_hash, key_prefix, name, now),
         )
         key_id = cursor.lastrowid
+    _invalidate_key_cache()
 
     return raw_key, ApiKeyInfo(
         id=key_id,
@@ -244,12 +415,10 @@ def create_api_key(tenant_id: int, name: str = "Default") -> tuple[str, ApiKeyIn
 
 def list_api_keys_for_tenant(tenant_id: int) -> list[ApiKeyInfo]:
     _ensure_db()
-    with sqlite3.connect(_get_db_path()) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(
-            "SELECT id, tenant_id, key_prefix, name, created_at FROM api_keys WHERE tenant_id = ? ORDER BY created_at DESC",
-            (tenant_id,),
-        ).fetchall()
+    rows = _conn_for_thread().execute(
+        "SELECT id, tenant_id, key_prefix, name, created_at FROM api_keys WHERE tenant_id = ? ORDER BY created_at DESC",
+        (tenant_id,),
+    ).fetchall()
     return [
         ApiKeyInfo(
             id=r["id"],
@@ -262,10 +431,34 @@ def list_api_keys_for_tenant(tenant_id: int) -> list[ApiKeyInfo]:
     ]
 
 
+def list_api_keys_for_tenants(tenant_ids: list[int]) -> dict[int, list[ApiKeyInfo]]:
+    """Batch variant of list_api_keys_for_tenant: one query for many tenants."""
+    _ensure_db()
+    result: dict[int, list[ApiKeyInfo]] = {tid: [] for tid in tenant_ids}
+    if not tenant_ids:
+        return result
+    placeholders = ", ".join("?" for _ in tenant_ids)
+    rows = _conn_for_thread().execute(
+        f"SELECT id, tenant_id, key_prefix, name, created_at FROM api_keys WHERE tenant_id IN ({placeholders}) ORDER BY created_at DESC",
+        list(tenant_ids),
+    ).fetchall()
+    for r in rows:
+        result[r["tenant_id"]].append(
+            ApiKeyInfo(
+                id=r["id"],
+                tenant_id=r["tenant_id"],
+                key_prefix=r["key_prefix"],
+                name=r["name"],
+                created_at=r["created_at"],
+            )
+        )
+    return result
+
+
 def revoke_api_key(key_id: int, tenant_id: Optional[int] = None) -> bool:
     """Revoke (delete) an API key. If tenant_id provided, verify ownership."""
     _ensure_db()
-    with sqlite3.connect(_get_db_path()) as conn:
+    with write_transaction(_conn_for_thread()) as conn:
         if tenant_id is not None:
             cursor = conn.execute(
                 "DELETE FROM api_keys WHERE id = ? AND tenant_id = ?",
@@ -273,4 +466,7 @@ def revoke_api_key(key_id: int, tenant_id: Optional[int] = None) -> bool:
             )
         else:
             cursor = conn.execute("DELETE FROM api_keys WHERE id = ?", (key_id,))
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+    if deleted:
+        _invalidate_key_cache()
+    return deleted
@@ -4,15 +4,17 @@ In-memory chart storage for the API.
 
 from __future__ import annotations
 
-import json
+import heapq
+import time
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Optional
 
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.io as pio
 
+from chart_service.exporters.embed import EmbedExporter, figure_to_json
+from chart_service.exporters.image import ImageExporter
 from chart_service.models import ChartConfig
 
 
@@ -22,6 +24,8 @@ class ChartStore:
     def __init__(self, ttl_hours: int = 24):
         self._store: dict[str, dict[str, Any]] = {}
         self._ttl_hours = ttl_hours
+        # (expires_at_monotonic, chart_id), oldest first: cleanup only touches expired entries
+        self._expiry_heap: list[tuple[float, str]] = []
 
     def save(
         self,
@@ -33,18 +37,27 @@ class ChartStore:
         """
         Save a chart and return its ID.
 
+        The figure, DataFrame and config objects are kept as-is (no JSON round
+        trip); callers must treat them as read-only once saved.
+
         Returns:
             The chart ID.
         """
         if chart_id is None:
             chart_id = str(uuid.uuid4())
 
+        created_monotonic = time.monotonic()
         self._store[chart_id] = {
-            "figure_json": json.loads(pio.to_json(fig)),
-            "dataframe_dict": df.to_dict("list"),
-            "config": config.to_dict(),
+            "figure": fig,
+            "dataframe": df,
+            "config": config,
             "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_monotonic": created_monotonic,
         }
+        heapq.heappush(
+            self._expiry_heap,
+            (created_monotonic + self._ttl_hours * 3600, chart_id),
+        )
 
         self._cleanup()
         return chart_id
@@ -54,25 +67,56 @@ class ChartStore:
         return self._store.get(chart_id)
 
     def get_figure(self, chart_id: str) -> go.Figure | None:
-        """Reconstruct the Plotly figure from storage."""
+        """Get the stored Plotly figure (shared; do not mutate)."""
+        data = self.get(chart_id)
+        if data is None:
+            return None
+        return data["figure"]
+
+    def get_figure_json(self, chart_id: str) -> str | None:
+        """Get the figure as Plotly JSON, serialized on first request and then cached."""
+        data = self.get(chart_id)
+        if data is None:
+            return None
+        fig_json = data.get("figure_json")
+        if fig_json is None:
+            fig_json = data["figure_json"] = figure_to_json(data["figure"])
+        return fig_json
+
+    def get_embed_html(self, chart_id: str) -> bytes | None:
+        """Get the embed page as UTF-8 bytes, rendered on first request and then cached."""
+        data = self.get(chart_id)
+        if data is None:
+            return None
+        html = data.get("embed_html")
+        if html is None:
+            fig_json = self.get_figure_json(chart_id)
+            html = data["embed_html"] = EmbedExporter.generate_embed_html_from_json(fig_json).encode("utf-8")
+        return html
+
+    def get_png(self, chart_id: str) -> bytes | None:
+        """Get the chart as PNG bytes, exported on first request and then cached."""
         data = self.get(chart_id)
         if data is None:
             return None
-        return go.Figure(data["figure_json"])
+        png = data.get("png")
+        if png is None:
+            png = data["png"] = ImageExporter.to_bytes(data["figure"])
+        return png
 
     def get_dataframe(self, chart_id: str) -> pd.DataFrame | None:
-        """Reconstruct the DataFrame from storage."""
+        """Get the stored DataFrame (shared; do not mutate)."""
         data = self.get(chart_id)
         if data is None:
             return None
-        return pd.DataFrame(data["dataframe_dict"])
+        return data["dataframe"]
 
     def get_config(self, chart_id: str) -> ChartConfig | None:
-        """Reconstruct the ChartConfig from storage."""
+        """Get the stored ChartConfig."""
         data = self.get(chart_id)
         if data is None:
             return None
-        return ChartConfig.from_dict(data["config"])
+        return data["config"]
 
     def exists(self, chart_id: str) -> bool:
         """Check if a chart exists."""
@@ -83,16 +127,16 @@ class ChartStore:
         return self._store.pop(chart_id, None) is not None
 
     def _cleanup(self):
-        """Remove expired charts."""
-        now = datetime.now(timezone.utc)
-        expired = []
-        for cid, data in self._store.items():
-            created = datetime.fromisoformat(data["created_at"])
-            age_hours = (now - created).total_seconds() / 3600
-            if age_hours > self._ttl_hours:
-                expired.append(cid)
-        for cid in expired:
-            del self._store[cid]
+        """Remove expired charts (pops only the expired head of the heap)."""
+        now = time.monotonic()
+        ttl_seconds = self._ttl_hours * 3600
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            expires_at, cid = heapq.heappop(heap)
+            data = self._store.get(cid)
+            # Skip stale heap entries for charts re-saved (or deleted) since
+            if data is not None and data["created_monotonic"] + ttl_seconds == expires_at:
+                del self._store[cid]
 
 
 # Global store instance (reads TTL from config)
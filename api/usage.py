@@ -6,28 +6,175 @@ Tracks request counts per API key (legacy) or tenant_id per period.
 
 from __future__ import annotations
 
+import atexit
+import calendar
+import logging
 import sqlite3
 import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from contextlib import closing
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from api.db.pool import close_thread_connections, get_conn, write_transaction
+from api.db.schema import apply_pragmas
+from api.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between the passive WAL checkpoints run from the flusher thread
+_CHECKPOINT_INTERVAL_S = 30.0
+
+# (period, epoch second the period ends): recomputed only when a month boundary passes
+_period_cache: tuple[str, float] = ("", 0.0)
+
+
+def current_period() -> str:
+    """Current UTC usage period ("YYYY-MM"); a float compare per call instead of datetime + strftime."""
+    return _refresh_period()[0]
+
+
+def current_period_end() -> float:
+    """Epoch seconds at which the current period ends (start of next month, UTC)."""
+    return _refresh_period()[1]
+
+
+def _refresh_period() -> tuple[str, float]:
+    global _period_cache
+    now = time.time()
+    if now >= _period_cache[1]:
+        t = time.gmtime(now)
+        year, month = (t.tm_year + 1, 1) if t.tm_mon == 12 else (t.tm_year, t.tm_mon + 1)
+        _period_cache = (time.strftime("%Y-%m", t), float(calendar.timegm((year, month, 1, 0, 0, 0))))
+    return _period_cache
+
+
+def _count_key(api_key: str, tenant_id: Optional[int], period: str) -> tuple:
+    """Count cache key: per tenant when there is one, else per API key."""
+    return ("tenant", tenant_id, period) if tenant_id is not None else ("key", api_key, period)
+
+
+def _subtract(pending: Counter, written: Counter) -> None:
+    """Drop written events from a pending counter, removing keys that reach zero."""
+    for key, n in written.items():
+        left = pending[key] - n
+        if left > 0:
+            pending[key] = left
+        else:
+            pending.pop(key, None)
+
+
+def _flush_loop(tracker_ref: weakref.ref[UsageTracker], stop: threading.Event, interval_s: float) -> None:
+    """
+    Flusher thread: flush every interval_s until close() or the tracker is collected.
+
+    Holds the tracker only weakly between passes, so the thread doesn't keep it alive.
+    """
+    try:
+        while not stop.wait(interval_s):
+            tracker = tracker_ref()
+            if tracker is None:
+                break
+            tracker._flush_tick()
+            del tracker
+    finally:
+        close_thread_connections()
+
 
 class UsageTracker:
-    """Track API usage per key or tenant using SQLite."""
+    """
+    Track API usage per key or tenant using SQLite.
+
+    Every query runs on the calling thread's long-lived pooled connection
+    (api.db.pool.get_conn): opened once per thread and database, never per call.
+    """
 
-    def __init__(self, db_path: str | None = None):
+    # Request-path SQL as fixed strings: the pooled connections' statement cache
+    # (api.db.pool, cached_statements=512) keeps each one prepared after first use
+    _SQL_INSERT = "INSERT INTO usage (api_key, tenant_id, endpoint, timestamp, period) VALUES (?, ?, ?, ?, ?)"
+    _SQL_UPSERT_TENANT_COUNTER = (
+        "INSERT INTO usage_counters (tenant_id, period, count) VALUES (?, ?, ?) "
+        "ON CONFLICT (tenant_id, period) DO UPDATE SET count = count + excluded.count"
+    )
+    _SQL_UPSERT_KEY_COUNTER = (
+        "INSERT INTO key_usage_counters (api_key, period, count) VALUES (?, ?, ?) "
+        "ON CONFLICT (api_key, period) DO UPDATE SET count = count + excluded.count"
+    )
+    _SQL_KEY_COUNT = "SELECT count FROM key_usage_counters WHERE api_key = ? AND period = ?"
+    _SQL_TENANT_COUNT = "SELECT count FROM usage_counters WHERE tenant_id = ? AND period = ?"
+    _SQL_TENANT_HISTORY = (
+        "SELECT period, count FROM usage_counters WHERE tenant_id = ? ORDER BY period DESC LIMIT ?"
+    )
+    # Tenant ids passed as one JSON array, so every batch size shares one statement
+    _SQL_TENANTS_HISTORY = (
+        "SELECT tenant_id, period, count FROM usage_counters "
+        "WHERE tenant_id IN (SELECT value FROM json_each(?)) "
+        "ORDER BY tenant_id, period DESC"
+    )
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        flush_every: int = 100,
+        flush_interval_s: float = 1.0,
+    ):
         if db_path is None:
             db_path = os.environ.get("USAGE_DB_PATH", "usage.db")
         self._db_path = db_path
         self._init_db()
+        # Events are buffered and written in batches (see _enqueue). Reads add the
+        # pending counts, so they never lag behind.
+        self._flush_every = flush_every
+        self._flush_interval_s = flush_interval_s
+        self._pending_rows: deque[tuple] = deque()
+        self._pending_counts: Counter = Counter()  # (tenant_id, period)
+        self._pending_key_counts: Counter = Counter()  # (api_key, period)
+        self._pending_lock = threading.Lock()
+        # One long-lived flusher thread (started on the first buffered event), so
+        # its pooled connection and page cache survive from one flush to the next
+        self._flusher: Optional[threading.Thread] = None
+        self._stop_flusher = threading.Event()
+        self._last_checkpoint = time.monotonic()
+        # Count reads cached for a second; this process's own events bump the
+        # cached value, so only other workers' writes can be up to 1s late
+        self._count_cache = TTLCache(maxsize=10_000, ttl=1.0)
+        # Bumped (under _pending_lock) whenever committed rows change, so a count
+        # computed across a write isn't cached (see _read_count)
+        self._write_generation = 0
+        # The flusher holds only a weak reference; wake it to exit once we're gone
+        weakref.finalize(self, self._stop_flusher.set)
+
+    @property
+    def db_path(self) -> str:
+        return self._db_path
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's pooled connection (autocommit; writes use write_transaction)."""
+        return get_conn(self._db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """A new (unpooled) connection with the shared per-connection pragmas applied."""
+        conn = sqlite3.connect(self._db_path)
+        apply_pragmas(conn)
+        return conn
 
     def _init_db(self):
         """Create usage table if it doesn't exist; add tenant_id if missing."""
-        with sqlite3.connect(self._db_path) as conn:
+        with closing(self._connect()) as conn, conn:
+            if self._db_path != ":memory:":
+                # WAL + synchronous=NORMAL: commits append to the log without an fsync
+                # each, and readers don't block the writer. Persisted in the file.
+                conn.execute("PRAGMA journal_mode=WAL")
+            # Append-only audit log: counts come from the counter tables below, so
+            # the log carries no secondary indexes and no AUTOINCREMENT bookkeeping
+            # (both only added work to every insert).
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS usage (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id INTEGER PRIMARY KEY,
                     api_key TEXT,
                     tenant_id INTEGER,
                     endpoint TEXT NOT NULL,
@@ -35,75 +182,231 @@ class UsageTracker:
                     period TEXT NOT NULL
                 )
             """)
-            conn.commit()
             # Add tenant_id to existing tables (ignore if already present)
             try:
                 conn.execute("ALTER TABLE usage ADD COLUMN tenant_id INTEGER")
-                conn.commit()
             except sqlite3.OperationalError:
                 pass  # Column already exists
+            conn.execute("DROP INDEX IF EXISTS idx_usage_key_period")
+            conn.execute("DROP INDEX IF EXISTS idx_usage_tenant_period")
+            # Maintained per-period counters so quota checks are a primary-key
+            # lookup instead of COUNT(*) over every request this month. The
+            # `usage` table stays as the per-request audit log. WITHOUT ROWID:
+            # rows live in the primary-key b-tree, so a lookup is one search.
+            existing = {
+                r[0] for r in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('usage_counters', 'key_usage_counters')"
+                )
+            }
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_usage_key_period
-                ON usage (api_key, period)
+                CREATE TABLE IF NOT EXISTS usage_counters (
+                    tenant_id INTEGER NOT NULL,
+                    period TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (tenant_id, period)
+                ) WITHOUT ROWID
             """)
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_usage_tenant_period
-                ON usage (tenant_id, period)
+                CREATE TABLE IF NOT EXISTS key_usage_counters (
+                    api_key TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (api_key, period)
+                ) WITHOUT ROWID
             """)
-            conn.commit()
+            # Backfill counters from the log the first time they are created
+            if "usage_counters" not in existing:
+                conn.execute("""
+                    INSERT INTO usage_counters (tenant_id, period, count)
+                    SELECT tenant_id, period, COUNT(*) FROM usage
+                    WHERE tenant_id IS NOT NULL
+                    GROUP BY tenant_id, period
+                """)
+            if "key_usage_counters" not in existing:
+                conn.execute("""
+                    INSERT INTO key_usage_counters (api_key, period, count)
+                    SELECT api_key, period, COUNT(*) FROM usage
+                    WHERE tenant_id IS NULL AND api_key IS NOT NULL
+                    GROUP BY api_key, period
+                """)
 
     def record(self, api_key: str, endpoint: str = "/v1/charts") -> None:
-        """Record a request for the given API key (legacy)."""
-        now = datetime.now(timezone.utc)
-        period = now.strftime("%Y-%m")
+        """Record a request for the given API key (legacy). Buffered like record_for_tenant."""
+        self._enqueue(api_key, None, endpoint)
 
-        with sqlite3.connect(self._db_path) as conn:
-            conn.execute(
-                "INSERT INTO usage (api_key, tenant_id, endpoint, timestamp, period) VALUES (?, ?, ?, ?, ?)",
-                (api_key, None, endpoint, now.isoformat(), period),
-            )
-            conn.commit()
+    def record_many(self, events: list[tuple[Optional[str], Optional[int], str]]) -> None:
+        """
+        Record several `(api_key, tenant_id, endpoint)` events in one transaction.
+
+        Rows with a tenant_id count towards the tenant, the others towards api_key.
+        Unlike record/record_for_tenant this writes immediately (no buffering).
+        """
+        timestamp, period = datetime.now(timezone.utc).isoformat(), current_period()
+        self._write_rows([(api_key, tenant_id, endpoint, timestamp, period) for api_key, tenant_id, endpoint in events])
+        with self._pending_lock:
+            self._write_generation += 1
+            for api_key, tenant_id, _ in events:
+                self._count_cache.incr(_count_key(api_key, tenant_id, period))
+
+    def _write_rows(self, rows: list[tuple]) -> tuple[Counter, Counter]:
+        """
+        Insert usage log rows and bump their counters: one executemany per table.
+
+        Returns the (tenant, period) and (api_key, period) counts written.
+        """
+        tenant_counts: Counter = Counter()
+        key_counts: Counter = Counter()
+        for api_key, tenant_id, _, _, period in rows:
+            if tenant_id is not None:
+                tenant_counts[(tenant_id, period)] += 1
+            else:
+                key_counts[(api_key, period)] += 1
+        with write_transaction(self._conn()) as conn:
+            conn.executemany(self._SQL_INSERT, rows)
+            if tenant_counts:
+                conn.executemany(
+                    self._SQL_UPSERT_TENANT_COUNTER,
+                    [(tid, period, n) for (tid, period), n in tenant_counts.items()],
+                )
+            if key_counts:
+                conn.executemany(
+                    self._SQL_UPSERT_KEY_COUNTER,
+                    [(key, period, n) for (key, period), n in key_counts.items()],
+                )
+        return tenant_counts, key_counts
 
     def record_for_tenant(self, tenant_id: int, endpoint: str = "/v1/charts") -> None:
-        """Record a request for the given tenant."""
-        now = datetime.now(timezone.utc)
-        period = now.strftime("%Y-%m")
+        """
+        Record a request for the given tenant.
+
+        Only appends to an in-memory buffer; the buffer is written in one
+        transaction after `flush_every` events or `flush_interval_s` seconds.
+        """
+        self._enqueue("", tenant_id, endpoint)
+
+    def _enqueue(self, api_key: str, tenant_id: Optional[int], endpoint: str) -> None:
+        """Buffer one event; flush when the buffer is full, else leave it to the flusher thread."""
+        period = current_period()
+        timestamp = datetime.now(timezone.utc).isoformat()
+
+        with self._pending_lock:
+            self._pending_rows.append((api_key, tenant_id, endpoint, timestamp, period))
+            if tenant_id is not None:
+                self._pending_counts[(tenant_id, period)] += 1
+            else:
+                self._pending_key_counts[(api_key, period)] += 1
+            # Under the lock, so _read_count either sees this event in pending
+            # or has already cached the count this increments
+            self._count_cache.incr(_count_key(api_key, tenant_id, period))
+            full = len(self._pending_rows) >= self._flush_every
+            if self._flusher is None and not self._stop_flusher.is_set():
+                self._flusher = threading.Thread(
+                    target=_flush_loop,
+                    args=(weakref.ref(self), self._stop_flusher, self._flush_interval_s),
+                    name="usage-flusher",
+                    daemon=True,
+                )
+                self._flusher.start()
+        if full:
+            self.flush()
+
+    def _flush_tick(self) -> None:
+        """One flusher-thread pass: write the buffer, checkpoint now and then."""
+        self.flush()
+        # Checkpoint from this thread so WAL pages are copied back while no
+        # request is waiting, leaving little for a writer-triggered autocheckpoint
+        now = time.monotonic()
+        if now - self._last_checkpoint >= _CHECKPOINT_INTERVAL_S:
+            self._last_checkpoint = now
+            self.checkpoint()
+
+    def close(self) -> None:
+        """
+        Stop the flusher thread and write whatever is still buffered.
 
-        with sqlite3.connect(self._db_path) as conn:
-            conn.execute(
-                "INSERT INTO usage (api_key, tenant_id, endpoint, timestamp, period) VALUES (?, ?, ?, ?, ?)",
-                ("", tenant_id, endpoint, now.isoformat(), period),
-            )
-            conn.commit()
+        The global usage_tracker is closed at exit; close other instances
+        yourself: events still buffered when one is garbage-collected are dropped.
+        """
+        self._stop_flusher.set()
+        flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        self.flush()
+
+    def checkpoint(self) -> None:
+        """Run a PASSIVE WAL checkpoint: copies what it can without blocking readers or writers."""
+        try:
+            self._conn().execute("PRAGMA wal_checkpoint(PASSIVE)")
+        except sqlite3.Error:
+            logger.exception("Usage WAL checkpoint failed")
+
+    def flush(self) -> None:
+        """
+        Write buffered events in one transaction (see _write_rows).
+
+        The pending counters keep these events until the write has committed,
+        so a count read mid-flush sees them either pending or in the database
+        (briefly both: an overcount, never a miss).
+        """
+        with self._pending_lock:
+            rows, self._pending_rows = self._pending_rows, deque()
+        if not rows:
+            return
+        try:
+            counts, key_counts = self._write_rows(list(rows))
+        except sqlite3.Error:
+            logger.exception("Usage flush failed; keeping %d events for the next flush", len(rows))
+            with self._pending_lock:
+                self._pending_rows.extendleft(reversed(rows))
+            return
+        with self._pending_lock:
+            _subtract(self._pending_counts, counts)
+            _subtract(self._pending_key_counts, key_counts)
+            self._write_generation += 1
+
+    def _read_count(self, cache_key: tuple, sql: str, pending: Counter, args: tuple[object, str]) -> int:
+        """
+        Committed + pending count for one (tenant or key, period), via the count cache.
+
+        `args` is both the SQL parameters and the key into `pending`.
+        """
+        count = self._count_cache.get(cache_key)
+        if count is not None:
+            return count
+        # Pending before the database: flush commits rows before dropping them
+        # from pending, so this order can't miss events mid-flush
+        with self._pending_lock:
+            generation, pending_count = self._write_generation, pending.get(args, 0)
+        row = self._conn().execute(sql, args).fetchone()
+        count = (row[0] if row else 0) + pending_count
+        with self._pending_lock:
+            # Cache only if no event was enqueued for this key and no write
+            # committed since the reads: either could make `count` stale, and
+            # the cache's incr() can't correct an entry it doesn't hold yet
+            if self._write_generation == generation and pending.get(args, 0) == pending_count:
+                self._count_cache.set(cache_key, count)
+        return count
 
     def get_count(self, api_key: str, period: str | None = None) -> int:
         """Get the request count for an API key in a period."""
         if period is None:
-            period = datetime.now(timezone.utc).strftime("%Y-%m")
-
-        with sqlite3.connect(self._db_path) as conn:
-            cursor = conn.execute(
-                "SELECT COUNT(*) FROM usage WHERE api_key = ? AND period = ?",
-                (api_key, period),
-            )
-            return cursor.fetchone()[0]
+            period = current_period()
+        return self._read_count(
+            _count_key(api_key, None, period), self._SQL_KEY_COUNT, self._pending_key_counts, (api_key, period)
+        )
 
     def get_count_for_tenant(self, tenant_id: int, period: str | None = None) -> int:
         """Get the request count for a tenant in a period."""
         if period is None:
-            period = datetime.now(timezone.utc).strftime("%Y-%m")
-
-        with sqlite3.connect(self._db_path) as conn:
-            cursor = conn.execute(
-                "SELECT COUNT(*) FROM usage WHERE tenant_id = ? AND period = ?",
-                (tenant_id, period),
-            )
-            return cursor.fetchone()[0]
+            period = current_period()
+        return self._read_count(
+            _count_key("", tenant_id, period), self._SQL_TENANT_COUNT, self._pending_counts, (tenant_id, period)
+        )
 
     def get_usage(self, api_key: str, period: str | None = None) -> dict:
         """Get usage stats for an API key."""
         if period is None:
-            period = datetime.now(timezone.utc).strftime("%Y-%m")
+            period = current_period()
 
         count = self.get_count(api_key, period)
         return {
@@ -117,7 +420,7 @@ class UsageTracker:
     ) -> dict:
         """Get usage stats for a tenant."""
         if period is None:
-            period = datetime.now(timezone.utc).strftime("%Y-%m")
+            period = current_period()
 
         count = self.get_count_for_tenant(tenant_id, period)
         return {
@@ -130,21 +433,45 @@ class UsageTracker:
         self, tenant_id: int, limit: int = 12
     ) -> list[dict]:
         """Get usage history (by period) for a tenant."""
-        with sqlite3.connect(self._db_path) as conn:
-            cursor = conn.execute("""
-                SELECT period, COUNT(*) as count
-                FROM usage
-                WHERE tenant_id = ?
-                GROUP BY period
-                ORDER BY period DESC
-                LIMIT ?
-            """, (tenant_id, limit))
-            rows = cursor.fetchall()
+        self.flush()  # Dashboard read, not hot path: persist buffered events first
+        rows = self._conn().execute(self._SQL_TENANT_HISTORY, (tenant_id, limit)).fetchall()
         return [
             {"period": r[0], "period_start": f"{r[0]}-01", "request_count": r[1]}
             for r in rows
         ]
 
+    def get_usage_for_tenants(
+        self, tenant_ids: list[int], history_limit: int = 12
+    ) -> dict[int, dict]:
+        """
+        Batch variant of get_usage_for_tenant + get_usage_history_for_tenant.
+
+        Returns {tenant_id: {"current": {...}, "history": [...]}} from a single query.
+        """
+        period = current_period()
+        result = {
+            tid: {
+                "current": {"tenant_id": tid, "period_start": f"{period}-01", "request_count": 0},
+                "history": [],
+            }
+            for tid in tenant_ids
+        }
+        if not tenant_ids:
+            return result
+        self.flush()  # Dashboard read, not hot path: persist buffered events first
+        ids_json = "[" + ",".join(str(int(tid)) for tid in tenant_ids) + "]"
+        rows = self._conn().execute(self._SQL_TENANTS_HISTORY, (ids_json,)).fetchall()
+        for tid, p, count in rows:
+            entry = result[tid]
+            if p == period:
+                entry["current"]["request_count"] = count
+            if len(entry["history"]) < history_limit:
+                entry["history"].append(
+                    {"period": p, "period_start": f"{p}-01", "request_count": count}
+                )
+        return result
+
 
 # Global instance
 usage_tracker = UsageTracker()
+atexit.register(usage_tracker.close)
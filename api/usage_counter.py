@@ -0,0 +1,101 @@
+"""
+Monthly quota counter for SaaS tenants.
+
+With REDIS_URL set, quota is enforced by an atomic INCR on
+`quota:{tenant_id}:{YYYY-MM}` shared by every worker. A request that finds no
+period key seeds it from usage.db with SET NX EX (expiring after the period
+ends) and INCRs it in the same transaction, so no request is counted against
+an unseeded key; once the key exists each request is EXISTS + INCR. Without
+Redis it falls back to UsageTracker's maintained SQLite counters.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from api.usage import UsageTracker, current_period, current_period_end, usage_tracker
+
+logger = logging.getLogger(__name__)
+
+# Keep period keys around a day past month end so late requests still see them
+_EXPIRY_GRACE_SECONDS = 24 * 3600
+
+
+def _period_key(tenant_id: int) -> str:
+    return f"quota:{tenant_id}:{current_period()}"
+
+
+def _seconds_until_period_end() -> int:
+    return int(current_period_end() - time.time()) + _EXPIRY_GRACE_SECONDS
+
+
+class QuotaCounter:
+    """Reserve one unit of a tenant's monthly quota per request."""
+
+    def __init__(self, redis_url: str = "", tracker: UsageTracker = usage_tracker):
+        self._redis_url = redis_url
+        self._tracker = tracker
+        self._redis = None
+        self._redis_unavailable = not redis_url
+
+    def _get_redis(self):
+        if self._redis is None and not self._redis_unavailable:
+            try:
+                import redis.asyncio as redis_asyncio
+
+                self._redis = redis_asyncio.from_url(self._redis_url)
+            except ImportError:
+                logger.warning("REDIS_URL is set but redis is not installed; using SQLite quota counters")
+                self._redis_unavailable = True
+        return self._redis
+
+    async def incr_and_check(self, tenant_id: int, limit: int) -> bool:
+        """
+        Count one request against the tenant's quota for this period.
+
+        Returns False (and undoes the increment) if the quota is exhausted.
+        Call release() if the request fails after a successful reservation.
+        """
+        client = self._get_redis()
+        if client is None:
+            # SQLite fallback: the request is recorded by UsageTracker on success
+            return self._tracker.get_count_for_tenant(tenant_id) < limit
+
+        key = _period_key(tenant_id)
+        if await client.exists(key):
+            used = await client.incr(key)
+        else:
+            # No period key yet: seed it from the persisted count so a Redis
+            # flush or a first deploy doesn't hand out a fresh quota. Only here
+            # does the (blocking) SQLite read run, off the loop. NX keeps a seed
+            # another worker set meanwhile; either way our INCR lands on it.
+            seed = await run_in_threadpool(self._tracker.get_count_for_tenant, tenant_id)
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.set(key, seed, nx=True, ex=_seconds_until_period_end())
+                pipe.incr(key)
+                _, used = await pipe.execute()
+        if used > limit:
+            await client.decr(key)
+            return False
+        return True
+
+    async def release(self, tenant_id: int) -> None:
+        """Give back a reservation made by incr_and_check (request failed)."""
+        client = self._get_redis()
+        if client is None:
+            return
+        await client.decr(_period_key(tenant_id))
+
+
+def _create_counter() -> QuotaCounter:
+    try:
+        from config import config
+        return QuotaCounter(redis_url=config.redis_url)
+    except Exception:
+        return QuotaCounter()
+
+
+quota_counter = _create_counter()
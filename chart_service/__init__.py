@@ -8,18 +8,22 @@ and an orchestration function to go from raw input to Plotly figure.
 from __future__ import annotations
 
 import logging
-from typing import List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from chart_service.models import ChartConfig, ParsedData
 from chart_service.parsers import parser_registry
+from chart_service.parsers.base import RawInput, input_length
 from chart_service.chart_types import chart_type_registry
 from chart_service.plotters import plotter_registry
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 logger = logging.getLogger(__name__)
 
 
 def create_chart(
-    raw_input: Union[str, bytes],
+    raw_input: RawInput,
     filename: Optional[str] = None,
     chart_type: str = "auto",
     title: Optional[str] = None,
@@ -30,7 +34,7 @@ def create_chart(
     End-to-end: parse input -> decide chart type -> plot figure.
 
     Args:
-        raw_input: Raw text or file bytes.
+        raw_input: Raw text, file bytes, or a binary file object (CSV/Excel).
         filename: Optional filename for parser selection.
         chart_type: "auto" for AI/rule-based, or specific type name.
         title: Optional chart title.
@@ -40,22 +44,18 @@ def create_chart(
     Returns:
         Tuple of (ParsedData, ChartConfig, plotly Figure).
     """
-    import plotly.graph_objects as go
-
     # 1. Parse
-    logger.info(
-        "[DEBUG] create_chart: raw_input type=%s, len=%s, filename=%s",
-        type(raw_input).__name__,
-        len(raw_input) if raw_input is not None else 0,
-        filename,
-    )
-    print(f"[CREATE_CHART] start type={type(raw_input).__name__} len={len(raw_input) if raw_input else 0} filename={filename!r}", flush=True)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "create_chart: raw_input type=%s, len=%s, filename=%s",
+            type(raw_input).__name__,
+            input_length(raw_input),
+            filename,
+        )
     parser = parser_registry.get_parser_for(raw_input, filename)
-    print(f"[CREATE_CHART] parsing with {parser.name}...", flush=True)
     df = parser.parse(raw_input, filename)
     source_type = parser.name
-    logger.info("[DEBUG] create_chart: parsed source=%s, shape=%s", source_type, df.shape)
-    print(f"[CREATE_CHART] parsed source={source_type} shape={df.shape}", flush=True)
+    logger.debug("create_chart: parsed source=%s, shape=%s", source_type, df.shape)
     parsed = ParsedData(dataframe=df, source_type=source_type)
 
     # 2. Decide chart type and build config
@@ -79,8 +79,7 @@ def create_chart(
             config = ct.get_default_config(df)
             config.chart_type = chosen_type
     else:
-        chart_type_registry.get(chart_type)  # validate it exists
-        ct = chart_type_registry.get(chart_type)
+        ct = chart_type_registry.get(chart_type)  # Raises KeyError if unknown
         config = ct.get_default_config(df)
         config.chart_type = chart_type
 
@@ -94,5 +93,5 @@ def create_chart(
 
     # 4. Plot
     fig = plotter_registry.plot(df, config)
-    logger.info("[DEBUG] create_chart: plot done, figure has %s traces", len(fig.data))
+    logger.debug("create_chart: plot done, figure has %s traces", len(fig.data))
     return parsed, config, fig
@@ -10,6 +10,23 @@ import pandas as pd
 
 from chart_service.models import ChartConfig
 
+# Dtype kinds select_dtypes(include="number") selects: int, uint, float, complex, timedelta
+_NUMERIC_KINDS = frozenset("iufcm")
+
+
+def split_columns(df: pd.DataFrame) -> tuple[list[str], list[str]]:
+    """
+    (numeric, non-numeric) column names in one pass over df.dtypes.
+
+    Same split as select_dtypes(include/exclude="number") without building two
+    filtered DataFrames.
+    """
+    numeric: list[str] = []
+    other: list[str] = []
+    for col, dtype in df.dtypes.items():
+        (numeric if dtype.kind in _NUMERIC_KINDS else other).append(col)
+    return numeric, other
+
 
 class ChartType(ABC):
     """Abstract base class for chart types."""
@@ -30,8 +47,12 @@ class ChartType(ABC):
 
     def _get_numeric_columns(self, df: pd.DataFrame) -> list[str]:
         """Helper: get numeric column names."""
-        return list(df.select_dtypes(include="number").columns)
+        return split_columns(df)[0]
 
     def _get_categorical_columns(self, df: pd.DataFrame) -> list[str]:
         """Helper: get non-numeric column names."""
-        return list(df.select_dtypes(exclude="number").columns)
+        return split_columns(df)[1]
+
+    def _get_column_split(self, df: pd.DataFrame) -> tuple[list[str], list[str]]:
+        """Helper: (numeric, non-numeric) column names from a single pass."""
+        return split_columns(df)
@@ -24,8 +24,7 @@ class LineChartType(ChartType):
 
     def get_default_config(self, df: pd.DataFrame) -> ChartConfig:
         """Auto-detect x and y columns for line chart."""
-        numeric_cols = self._get_numeric_columns(df)
-        cat_cols = self._get_categorical_columns(df)
+        numeric_cols, cat_cols = self._get_column_split(df)
 
         # Use first column as x
         x_col = df.columns[0]
@@ -19,16 +19,14 @@ class PieChartType(ChartType):
 
     def is_suitable_for(self, df: pd.DataFrame, config: ChartConfig | None = None) -> bool:
         """Pie charts need 1 categorical + 1 numeric, with few categories."""
-        numeric_cols = self._get_numeric_columns(df)
-        cat_cols = self._get_categorical_columns(df)
+        numeric_cols, cat_cols = self._get_column_split(df)
         if len(numeric_cols) >= 1 and len(cat_cols) >= 1:
             return df[cat_cols[0]].nunique() <= 15
         return False
 
     def get_default_config(self, df: pd.DataFrame) -> ChartConfig:
         """Auto-detect names and values columns for pie chart."""
-        numeric_cols = self._get_numeric_columns(df)
-        cat_cols = self._get_categorical_columns(df)
+        numeric_cols, cat_cols = self._get_column_split(df)
 
         if cat_cols and numeric_cols:
             names_col = cat_cols[0]
@@ -6,7 +6,29 @@ from __future__ import annotations
 
 import pandas as pd
 
-from chart_service.chart_types.base import ChartType
+from chart_service.chart_types.base import ChartType, split_columns
+
+# Leading non-null values parsed to decide whether a column holds dates
+_DATETIME_SAMPLE_SIZE = 20
+
+# Most distinct categories for which a single-series chart becomes a pie
+_PIE_MAX_CATEGORIES = 8
+
+# Inference rules: (numeric bucket, has categorical, few categories) -> chart
+# types in order of preference; the first registered one wins. The numeric
+# bucket is min(n_numeric, 3); "few categories" is only evaluated (an O(n)
+# nunique) for the 1 categorical + 1 numeric shape and is None otherwise.
+_RULES: dict[tuple[int, bool, bool | None], tuple[str, ...]] = {
+    (0, False, None): ("bar",),
+    (0, True, None): ("bar",),
+    (1, False, None): ("bar",),
+    (1, True, True): ("pie", "bar"),
+    (1, True, False): ("bar",),
+    (2, False, None): ("scatter", "line", "bar"),
+    (2, True, None): ("bar",),
+    (3, False, None): ("line", "bar"),
+    (3, True, None): ("bar",),
+}
 
 
 class ChartTypeRegistry:
@@ -14,10 +36,21 @@ class ChartTypeRegistry:
 
     def __init__(self) -> None:
         self._types: dict[str, ChartType] = {}
+        # _RULES resolved against the registered types: rule key -> chart type name
+        self._resolved_rules: dict[tuple[int, bool, bool | None], str] = {}
 
     def register(self, chart_type: ChartType) -> None:
         """Register a chart type."""
         self._types[chart_type.name] = chart_type
+        self._resolve_rules()
+
+    def _resolve_rules(self) -> None:
+        """Pick each rule's chart type once per registration instead of on every inference."""
+        fallback = next(iter(self._types))
+        self._resolved_rules = {
+            key: next((name for name in candidates if name in self._types), fallback)
+            for key, candidates in _RULES.items()
+        }
 
     def get(self, name: str) -> ChartType:
         """
@@ -54,60 +87,36 @@ class ChartTypeRegistry:
         - Time-series like x column: line
         - Default: bar
         """
-        numeric_cols = list(df.select_dtypes(include="number").columns)
-        cat_cols = list(df.select_dtypes(exclude="number").columns)
-        n_num = len(numeric_cols)
-        n_cat = len(cat_cols)
-
-        # Check for time-series: first column looks like dates
-        first_col = df.columns[0]
-        if self._is_datetime_like(df[first_col]):
-            if "line" in self._types:
-                return "line"
-
-        # Only numeric columns
-        if n_cat == 0 and n_num >= 2:
-            if n_num == 2 and "scatter" in self._types:
-                return "scatter"
-            if "line" in self._types:
-                return "line"
-
-        # 1 categorical + 1 numeric
-        if n_cat >= 1 and n_num == 1:
-            cat_col = cat_cols[0]
-            unique_count = df[cat_col].nunique()
-            if unique_count <= 8 and "pie" in self._types:
-                return "pie"
-            if "bar" in self._types:
-                return "bar"
-
-        # 1 categorical + multiple numeric
-        if n_cat >= 1 and n_num > 1:
-            if "bar" in self._types:
-                return "bar"
-
-        # 1 numeric column only (no categorical)
-        if n_num == 1 and n_cat == 0:
-            if "bar" in self._types:
-                return "bar"
-
-        # Default
-        if "bar" in self._types:
-            return "bar"
-
-        # Fallback to first registered type
-        return self.list_types()[0]
+        # Time-series: first column looks like dates
+        if "line" in self._types and self._is_datetime_like(df[df.columns[0]]):
+            return "line"
+
+        numeric_cols, cat_cols = split_columns(df)
+        n_num = min(len(numeric_cols), 3)
+        has_cat = bool(cat_cols)
+        few_categories = None
+        if n_num == 1 and has_cat:
+            few_categories = bool(df[cat_cols[0]].nunique() <= _PIE_MAX_CATEGORIES)
+
+        # Falls back to the first registered type when no preferred one is registered
+        return self._resolved_rules[(n_num, has_cat, few_categories)]
 
     @staticmethod
     def _is_datetime_like(series: pd.Series) -> bool:
-        """Check if a series looks like datetime data."""
+        """Check if a series looks like datetime data (probes a small sample, not every row)."""
         if pd.api.types.is_datetime64_any_dtype(series):
             return True
-        # Try parsing as dates
-        if series.dtype == object:
+        # Numbers and booleans are never treated as dates
+        if series.dtype.kind in "biufc":
+            return False
+        # Try parsing text as dates (object or pandas string dtype)
+        if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            sample = series.dropna().head(_DATETIME_SAMPLE_SIZE)
+            if sample.empty:
+                return False
             try:
-                pd.to_datetime(series, format="mixed")
+                pd.to_datetime(sample, format="mixed")
                 return True
-            except (ValueError, TypeError):
+            except (ValueError, TypeError, OverflowError):
                 pass
         return False
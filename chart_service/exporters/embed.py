@@ -4,10 +4,10 @@ Embed exporter: generates standalone HTML for embedding charts.
 
 from __future__ import annotations
 
-import json
 import uuid
 from typing import Optional
 
+import orjson
 import plotly.graph_objects as go
 import plotly.io as pio
 
@@ -16,6 +16,14 @@ import plotly.io as pio
 _chart_store: dict[str, dict] = {}
 
 
+def figure_to_json(fig: go.Figure) -> str:
+    """
+    Serialize a figure built by our plotters: orjson engine, compact, and no
+    schema validation pass (the figure is already a validated go.Figure).
+    """
+    return pio.to_json(fig, validate=False, pretty=False, engine="orjson")
+
+
 class EmbedExporter:
     """Export charts as embeddable HTML."""
 
@@ -37,7 +45,7 @@ class EmbedExporter:
             chart_id = str(uuid.uuid4())
 
         _chart_store[chart_id] = {
-            "figure_json": json.loads(pio.to_json(fig)),
+            "figure_json": orjson.loads(figure_to_json(fig)),
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
         return chart_id
@@ -58,8 +66,19 @@ class EmbedExporter:
         Returns:
             Complete HTML string.
         """
-        fig_json = pio.to_json(fig)
+        return EmbedExporter.generate_embed_html_from_json(figure_to_json(fig))
+
+    @staticmethod
+    def generate_embed_html_from_json(fig_json: str) -> str:
+        """
+        Generate the embed page from an already-serialized figure.
 
+        Args:
+            fig_json: Plotly figure JSON (as produced by plotly.io.to_json).
+
+        Returns:
+            Complete HTML string.
+        """
         html = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
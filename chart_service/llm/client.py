@@ -4,38 +4,194 @@ LLM client for chart configuration inference and image data extraction.
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import base64
+import importlib.util
 import json
 import logging
 import os
+import threading
+import time
+import weakref
 from typing import Any, Optional
 
 import pandas as pd
 
+from chart_service.llm.cache import ResponseCache, cache_key
 from chart_service.llm.prompts import (
     CHART_CONFIG_SYSTEM_PROMPT,
     CHART_CONFIG_USER_PROMPT,
+    CHART_CONFIGS_USER_PROMPT,
     IMAGE_EXTRACTION_SYSTEM_PROMPT,
     IMAGE_EXTRACTION_USER_PROMPT,
 )
 from chart_service.llm.schema import CHART_CONFIG_SCHEMA, TABLE_EXTRACTION_SCHEMA
 from chart_service.models import ChartConfig
 
+try:
+    from openai import AsyncOpenAI, OpenAI
+except ImportError:  # Only needed once an LLM call is made; see _require_openai
+    OpenAI = AsyncOpenAI = None
+
+try:
+    # The module, not its `config` object, so a replaced config is still seen
+    import config as _app_config_module
+except ImportError:  # chart_service used without the app's config module
+    _app_config_module = None
+
 logger = logging.getLogger(__name__)
 
 
+def _app_setting(name: str) -> str:
+    """A string setting from the app config, or '' when there is no config module."""
+    return getattr(getattr(_app_config_module, "config", None), name, "") or ""
+
+
 def _get_api_key(api_key: str | None = None) -> str | None:
     """Resolve API key: explicit argument (including '') > config (from .env) > os.environ."""
     if api_key is not None:
         return api_key.strip() or None
-    try:
-        from config import config as app_config
-        if getattr(app_config, "openai_api_key", ""):
-            return app_config.openai_api_key.strip() or None
-    except ImportError:
-        pass
+    configured = _app_setting("openai_api_key").strip()
+    if configured:
+        return configured
     return (os.environ.get("OPENAI_API_KEY") or "").strip() or None
 
 
+# Rows sent verbatim in the chart-config prompt; everything else is summarized
+_PROMPT_SAMPLE_ROWS = 5
+# Datasets with a longer packed description get a request of their own
+_PACKED_ENTRY_MAX_CHARS = 4000
+
+
+def _summarize_columns(df: pd.DataFrame) -> str:
+    """
+    One compact JSON line per column: dtype, null count, range (numeric) or
+    distinct count (other), and a few example values. Much smaller than rows
+    of data, and it is all the chart-type decision needs.
+    """
+    lines = []
+    for i, (name, dtype) in enumerate(df.dtypes.items()):
+        series = df.iloc[:, i]
+        info: dict[str, Any] = {"name": name, "dtype": str(dtype), "nulls": int(series.isna().sum())}
+        if dtype.kind in "iuf":
+            info["min"], info["max"] = series.agg(["min", "max"]).tolist()
+        else:
+            info["distinct"] = int(series.nunique())
+            info["examples"] = series.dropna().unique()[:5].tolist()
+        lines.append(json.dumps(info, separators=(",", ":"), default=str))
+    return "\n".join(lines)
+
+
+# Vision inputs beyond this long edge are downscaled by the API anyway (and billed per tile)
+_VISION_MAX_EDGE = 1568
+# Images under this size and edge are sent as uploaded
+_VISION_RECOMPRESS_BYTES = 512 * 1024
+
+
+def _shrink_image(image_bytes: bytes, mime_type: str) -> tuple[bytes, str]:
+    """
+    Downscale to the Vision API's working resolution and re-encode large images
+    as JPEG (metadata dropped). Returns the input unchanged when it is already
+    small or can't be decoded.
+    """
+    from io import BytesIO
+
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        img = Image.open(BytesIO(image_bytes))
+        if len(image_bytes) <= _VISION_RECOMPRESS_BYTES and max(img.size) <= _VISION_MAX_EDGE:
+            return image_bytes, mime_type
+        img.thumbnail((_VISION_MAX_EDGE, _VISION_MAX_EDGE), Image.LANCZOS)
+        out = BytesIO()
+        img.save(out, format="PNG", optimize=True)
+        shrunk_mime = "image/png"
+        if out.tell() > _VISION_RECOMPRESS_BYTES:
+            out = BytesIO()
+            img.convert("RGB").save(out, format="JPEG", quality=85)
+            shrunk_mime = "image/jpeg"
+    except (UnidentifiedImageError, OSError, ValueError):
+        return image_bytes, mime_type
+    if out.tell() >= len(image_bytes):
+        return image_bytes, mime_type
+    return out.getvalue(), shrunk_mime
+
+
+def _get_cache_path(cache_path: str | None = None) -> str:
+    """Resolve the on-disk response cache: explicit argument > config; '' = memory only."""
+    if cache_path is not None:
+        return cache_path
+    return _app_setting("llm_cache_path")
+
+
+# Batch API statuses after which a batch will not change any more
+_BATCH_FINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+# Connection pool shared by every OpenAI client in the process, so calls reuse
+# kept-alive TLS connections instead of handshaking per client
+_HTTP_LIMITS = {"max_keepalive_connections": 20, "max_connections": 50}
+_http_client = None
+# httpx.AsyncClient connections belong to the event loop that opened them, so
+# the async pool is per running loop (a later asyncio.run() gets its own)
+_async_http_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_http_client_lock = threading.Lock()
+
+
+def _shared_http_client():
+    """Process-wide httpx.Client for the sync OpenAI client (closed at exit)."""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                import httpx
+
+                _http_client = httpx.Client(limits=httpx.Limits(**_HTTP_LIMITS), http2=_http2_available())
+                atexit.register(_http_client.close)
+    return _http_client
+
+
+def _shared_async_http_client():
+    """The running event loop's httpx.AsyncClient for AsyncOpenAI clients."""
+    loop = asyncio.get_running_loop()
+    client = _async_http_clients.get(loop)
+    if client is None:
+        with _http_client_lock:
+            client = _async_http_clients.get(loop)
+            if client is None:
+                import httpx
+
+                _drop_closed_loops(_async_http_clients)
+                client = _async_http_clients[loop] = httpx.AsyncClient(
+                    limits=httpx.Limits(**_HTTP_LIMITS), http2=_http2_available()
+                )
+    return client
+
+
+def _drop_closed_loops(per_loop: weakref.WeakKeyDictionary) -> None:
+    """
+    Forget entries for closed loops.
+
+    Open connections reference their loop, so such entries aren't always
+    collected on their own.
+    """
+    for loop in [loop for loop in per_loop.keys() if loop.is_closed()]:
+        per_loop.pop(loop, None)
+
+
+def _require_openai(client_cls):
+    """The given openai client class, or a helpful ImportError if openai isn't installed."""
+    if client_cls is None:
+        raise ImportError("openai package is required. Install with: pip install openai")
+    return client_cls
+
+
+def _http2_available() -> bool:
+    """HTTP/2 multiplexing needs the optional `h2` package (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
 class LLMClient:
     """Client for OpenAI API interactions."""
 
@@ -44,40 +200,77 @@ class LLMClient:
         api_key: str | None = None,
         model: str = "gpt-4o-mini",
         vision_model: str = "gpt-4o",
+        cache_ttl: float = 24 * 3600,
+        cache_path: str | None = None,
+        max_retries: int = 5,
     ):
         self._api_key_arg = api_key
+        # Handed to the OpenAI SDK, which retries 429s, 5xx and connection errors
+        # with exponential backoff and jitter, honouring Retry-After
+        self.max_retries = max_retries
         self.api_key = _get_api_key(api_key)
         self.model = model
         self.vision_model = vision_model
         self._client = None
+        # AsyncOpenAI clients by event loop (see _shared_async_http_client)
+        self._aclients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._client_lock = threading.Lock()
+        # Successful responses by request hash; cache_path None = LLM_CACHE_PATH from config
+        self._cache = ResponseCache(ttl=cache_ttl, path=_get_cache_path(cache_path))
 
     @property
     def is_available(self) -> bool:
-        """Check if API key is configured (re-read from config/env at use time)."""
-        key = _get_api_key(self._api_key_arg)
-        if key and key != self.api_key:
-            self.api_key = key
+        """
+        Check if an API key is configured.
+
+        Once found, the key is kept (see refresh()); while there is none, config
+        and env are re-read on each check so a key set later is still picked up.
+        """
+        if not self.api_key:
+            self.api_key = _get_api_key(self._api_key_arg)
         return bool(self.api_key)
 
-    def _get_client(self):
-        """Lazy-initialize the OpenAI client."""
+    def refresh(self) -> None:
+        """Re-resolve the API key, dropping clients built with a previous one."""
         key = _get_api_key(self._api_key_arg)
-        if key:
+        if key != self.api_key:
             self.api_key = key
-        if not self.api_key:
+            self._client = None
+            self._aclients = weakref.WeakKeyDictionary()
+
+    def _get_client(self):
+        """Lazy-initialize the OpenAI client (once, even with concurrent callers)."""
+        if not self.is_available:
             return None
         if self._client is None:
-            try:
-                from openai import OpenAI
-                self._client = OpenAI(api_key=self.api_key)
-            except ImportError:
-                raise ImportError("openai package is required. Install with: pip install openai")
+            with self._client_lock:
+                if self._client is None:
+                    self._client = _require_openai(OpenAI)(
+                        api_key=self.api_key, max_retries=self.max_retries, http_client=_shared_http_client()
+                    )
         return self._client
 
+    def _get_async_client(self):
+        """Lazy-initialize the running loop's AsyncOpenAI client (used by the a* methods)."""
+        if not self.is_available:
+            return None
+        loop = asyncio.get_running_loop()
+        aclient = self._aclients.get(loop)
+        if aclient is None:
+            with self._client_lock:
+                aclient = self._aclients.get(loop)
+                if aclient is None:
+                    _drop_closed_loops(self._aclients)
+                    aclient = self._aclients[loop] = _require_openai(AsyncOpenAI)(
+                        api_key=self.api_key, max_retries=self.max_retries, http_client=_shared_async_http_client()
+                    )
+        return aclient
+
     def infer_chart_config(
         self,
         df: pd.DataFrame,
         available_types: list[str] | None = None,
+        bypass_cache: bool = False,
     ) -> ChartConfig | None:
         """
         Use LLM to suggest chart type and configuration for the given data.
@@ -85,6 +278,7 @@ class LLMClient:
         Args:
             df: The data to visualize.
             available_types: List of valid chart type names.
+            bypass_cache: Always call the API, even for a previously seen request.
 
         Returns:
             ChartConfig if successful, None if LLM is unavailable or fails.
@@ -94,73 +288,276 @@ class LLMClient:
             return None
 
         try:
-            # Prepare data summary as JSON (max 50 rows as per spec)
-            sample = df.head(min(50, len(df)))
-            sample_str = sample.to_json(orient="records", indent=2, default_handler=str)
-            columns = list(df.columns)
-            column_types = {col: str(df[col].dtype) for col in columns}
-            column_types_str = "\n".join(f"  - {col}: {dtype}" for col, dtype in column_types.items())
-
-            user_prompt = CHART_CONFIG_USER_PROMPT.format(
-                columns=columns,
-                n_rows=min(20, len(df)),
-                sample_data=sample_str,
-                total_rows=len(df),
-                column_types=column_types_str,
-            )
+            request = self._chart_config_request(df)
+            key = None if bypass_cache else self._request_cache_key(request)
+            cached = self._cache.get(key) if key else None
+            if cached is None:
+                response = self._get_client().chat.completions.create(**request)
+                content = response.choices[0].message.content
+            else:
+                content = cached
+            config = self._chart_config_from_response(content, df, available_types)
+            if config is not None and key and cached is None:
+                self._cache.set(key, content)
+            return config
+        except Exception as e:
+            logger.error(f"LLM inference failed: {e}")
+            return None
 
-            client = self._get_client()
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": CHART_CONFIG_SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-                max_tokens=500,
-            )
+    async def ainfer_chart_config(
+        self,
+        df: pd.DataFrame,
+        available_types: list[str] | None = None,
+        bypass_cache: bool = False,
+    ) -> ChartConfig | None:
+        """Async infer_chart_config: awaits the API call instead of blocking the thread."""
+        if not self.is_available:
+            logger.warning("LLM not available (no API key). Falling back to rule-based.")
+            return None
 
-            result = json.loads(response.choices[0].message.content)
-            logger.info(f"LLM suggested: {result}")
+        try:
+            request = self._chart_config_request(df)
+            key = None if bypass_cache else self._request_cache_key(request)
+            cached = self._cache.get(key) if key else None
+            if cached is None:
+                response = await self._get_async_client().chat.completions.create(**request)
+                content = response.choices[0].message.content
+            else:
+                content = cached
+            config = self._chart_config_from_response(content, df, available_types)
+            if config is not None and key and cached is None:
+                self._cache.set(key, content)
+            return config
+        except Exception as e:
+            logger.error(f"LLM inference failed: {e}")
+            return None
 
-            # Validate chart type
-            chart_type = result.get("chart_type", "bar")
-            if available_types and chart_type not in available_types:
-                logger.warning(
-                    f"LLM suggested '{chart_type}' which is not available. "
-                    f"Falling back to rule-based."
+    async def ainfer_chart_configs(
+        self,
+        dfs: list[pd.DataFrame],
+        available_types: list[str] | None = None,
+        max_concurrency: int = 8,
+    ) -> list[ChartConfig | None]:
+        """
+        Infer chart configs for several dataframes concurrently.
+
+        At most `max_concurrency` requests are in flight at once, to stay under
+        the account's request/token rate limits. Results keep the order of `dfs`.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def infer(df: pd.DataFrame) -> ChartConfig | None:
+            async with semaphore:
+                return await self.ainfer_chart_config(df, available_types)
+
+        return list(await asyncio.gather(*(infer(df) for df in dfs)))
+
+    def infer_chart_config_batch(
+        self,
+        dfs: list[pd.DataFrame],
+        available_types: list[str] | None = None,
+        poll_interval: float = 30.0,
+        timeout: float | None = None,
+    ) -> list[ChartConfig | None]:
+        """
+        Infer chart configs for many dataframes through the OpenAI Batch API.
+
+        For offline/bulk jobs: the requests are uploaded as one JSONL file and
+        processed asynchronously by OpenAI (within 24h, at half the price of
+        individual calls); this blocks, polling every `poll_interval` seconds,
+        until the batch ends or `timeout` passes. Results keep the order of
+        `dfs`, with None where a request failed or its answer didn't fit.
+        """
+        results: list[ChartConfig | None] = [None] * len(dfs)
+        client = self._get_client()
+        if client is None or not dfs:
+            return results
+
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._chart_config_request(df),
+            })
+            for i, df in enumerate(dfs)
+        ]
+        batch_input = client.files.create(
+            file=("chart_configs.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=batch_input.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while batch.status not in _BATCH_FINAL_STATUSES:
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning("Batch %s still %s after %ss; giving up", batch.id, batch.status, timeout)
+                return results
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.warning("Batch %s ended with status %s", batch.id, batch.status)
+            return results
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            i = int(item["custom_id"])
+            try:
+                content = item["response"]["body"]["choices"][0]["message"]["content"]
+                results[i] = self._chart_config_from_response(content, dfs[i], available_types)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning("Batch result %s unusable: %s", i, e)
+        return results
+
+    def infer_chart_configs(
+        self,
+        dfs: list[pd.DataFrame],
+        available_types: list[str] | None = None,
+        per_request: int = 10,
+    ) -> list[ChartConfig | None]:
+        """
+        Infer chart configs for several small dataframes, up to `per_request`
+        of them packed into each chat request (one request instead of k when
+        the account is bound by requests per minute).
+
+        Dataframes whose summary is too large to pack, and any the packed answer
+        leaves out or gets wrong, fall back to infer_chart_config one by one.
+        Results keep the order of `dfs`.
+        """
+        results: list[ChartConfig | None] = [None] * len(dfs)
+        if not self.is_available:
+            logger.warning("LLM not available (no API key). Falling back to rule-based.")
+            return results
+
+        entries = {i: self._packed_entry(i, df) for i, df in enumerate(dfs)}
+        packable = [i for i, entry in entries.items() if len(entry) <= _PACKED_ENTRY_MAX_CHARS]
+        for start in range(0, len(packable), per_request):
+            group = packable[start:start + per_request]
+            try:
+                response = self._get_client().chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": CHART_CONFIG_SYSTEM_PROMPT},
+                        {
+                            "role": "user",
+                            "content": CHART_CONFIGS_USER_PROMPT.format(
+                                datasets="\n".join(entries[i] for i in group)
+                            ),
+                        },
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.1,
+                    max_tokens=300 * len(group),
                 )
-                return None
+                answers = json.loads(response.choices[0].message.content).get("results", [])
+            except Exception as e:
+                logger.error(f"Packed LLM inference failed: {e}")
+                continue
+            for answer in answers:
+                i = answer.get("id") if isinstance(answer, dict) else None
+                if i in group and results[i] is None:
+                    results[i] = self._chart_config_from_result(answer, dfs[i], available_types)
+
+        for i, df in enumerate(dfs):
+            if results[i] is None:
+                results[i] = self.infer_chart_config(df, available_types)
+        return results
+
+    @staticmethod
+    def _packed_entry(i: int, df: pd.DataFrame) -> str:
+        """One dataset of a packed request: id, column summary and first rows, as one JSON line."""
+        return json.dumps(
+            {
+                "id": i,
+                "total_rows": len(df),
+                "columns": [json.loads(line) for line in _summarize_columns(df).splitlines()],
+                "first_rows": json.loads(
+                    df.head(_PROMPT_SAMPLE_ROWS).to_json(orient="values", date_format="iso", default_handler=str)
+                ),
+            },
+            separators=(",", ":"),
+            default=str,
+        )
+
+    def _chart_config_request(self, df: pd.DataFrame) -> dict[str, Any]:
+        """Keyword arguments for the chart-config chat completion."""
+        user_prompt = CHART_CONFIG_USER_PROMPT.format(
+            columns=list(df.columns),
+            column_summary=_summarize_columns(df),
+            n_rows=min(_PROMPT_SAMPLE_ROWS, len(df)),
+            sample_data=df.head(_PROMPT_SAMPLE_ROWS).to_json(orient="values", date_format="iso", default_handler=str),
+            total_rows=len(df),
+        )
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": CHART_CONFIG_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            max_tokens=500,
+        )
+
+    @staticmethod
+    def _request_cache_key(request: dict[str, Any]) -> str:
+        """Cache key for a text-only chat request: model plus every message."""
+        return cache_key(request["model"], *(message["content"] for message in request["messages"]))
+
+    @staticmethod
+    def _chart_config_from_response(
+        content: str,
+        df: pd.DataFrame,
+        available_types: list[str] | None,
+    ) -> ChartConfig | None:
+        """Validate the LLM's suggestion against the data; None if it doesn't fit."""
+        return LLMClient._chart_config_from_result(json.loads(content), df, available_types)
 
-            # Validate columns exist in dataframe
-            x_col = result.get("x_column")
-            y_cols = result.get("y_columns", [])
-            if x_col and x_col not in df.columns:
-                logger.warning(f"LLM suggested x_column '{x_col}' not in data columns.")
-                return None
-            for y in y_cols:
-                if y not in df.columns:
-                    logger.warning(f"LLM suggested y_column '{y}' not in data columns.")
-                    return None
-
-            return ChartConfig(
-                chart_type=chart_type,
-                x_column=x_col,
-                y_columns=y_cols,
-                title=result.get("title"),
-                x_label=result.get("x_label"),
-                y_label=result.get("y_label"),
+    @staticmethod
+    def _chart_config_from_result(
+        result: dict[str, Any],
+        df: pd.DataFrame,
+        available_types: list[str] | None,
+    ) -> ChartConfig | None:
+        """_chart_config_from_response for an already-decoded suggestion."""
+        logger.info(f"LLM suggested: {result}")
+
+        # Validate chart type
+        chart_type = result.get("chart_type", "bar")
+        if available_types and chart_type not in available_types:
+            logger.warning(
+                f"LLM suggested '{chart_type}' which is not available. "
+                f"Falling back to rule-based."
             )
+            return None
 
-        except Exception as e:
-            logger.error(f"LLM inference failed: {e}")
+        # Validate columns exist in dataframe
+        x_col = result.get("x_column")
+        y_cols = result.get("y_columns", [])
+        if x_col and x_col not in df.columns:
+            logger.warning(f"LLM suggested x_column '{x_col}' not in data columns.")
             return None
+        for y in y_cols:
+            if y not in df.columns:
+                logger.warning(f"LLM suggested y_column '{y}' not in data columns.")
+                return None
+
+        return ChartConfig(
+            chart_type=chart_type,
+            x_column=x_col,
+            y_columns=y_cols,
+            title=result.get("title"),
+            x_label=result.get("x_label"),
+            y_label=result.get("y_label"),
+        )
 
     def extract_table_from_image(
         self,
         image_bytes: bytes,
         mime_type: str = "image/png",
+        bypass_cache: bool = False,
     ) -> dict[str, Any] | None:
         """
         Use Vision LLM to extract tabular data from an image.
@@ -168,75 +565,121 @@ class LLMClient:
         Args:
             image_bytes: Raw image bytes.
             mime_type: MIME type of the image.
+            bypass_cache: Always call the API, even for a previously seen image.
 
         Returns:
             Dict with 'columns' and 'rows' keys, or None on failure.
         """
         if not self.is_available:
-            logger.warning("[DEBUG] LLM not available for image extraction (no API key).")
+            logger.warning("LLM not available for image extraction (no API key).")
             return None
 
         try:
-            import base64
-            b64_image = base64.b64encode(image_bytes).decode("utf-8")
-            logger.info(
-                "[DEBUG] Vision API: calling model=%s, image_bytes=%s, mime=%s",
-                self.vision_model,
-                len(image_bytes),
-                mime_type,
-            )
-
-            client = self._get_client()
-            response = client.chat.completions.create(
-                model=self.vision_model,
-                messages=[
-                    {"role": "system", "content": IMAGE_EXTRACTION_SYSTEM_PROMPT},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": IMAGE_EXTRACTION_USER_PROMPT},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{mime_type};base64,{b64_image}",
-                                },
-                            },
-                        ],
-                    },
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-                max_tokens=4096,
-            )
-
-            raw_content = response.choices[0].message.content
-            logger.info("[DEBUG] Vision API: response length=%s chars", len(raw_content) if raw_content else 0)
-            print(f"[VISION] API response length={len(raw_content) if raw_content else 0} chars", flush=True)
-            result = json.loads(raw_content)
-            rows = result.get("rows", [])
-            cols = result.get("columns", [])
-            logger.info(
-                "[DEBUG] Vision API: parsed result columns=%s, rows=%s",
-                cols,
-                len(rows),
-            )
-            if len(rows) and len(rows[0]) != len(cols):
-                logger.warning(
-                    "[DEBUG] Vision API: row length %s != columns %s",
-                    len(rows[0]) if rows else 0,
-                    len(cols),
-                )
+            key = None if bypass_cache else self._image_cache_key(image_bytes, mime_type)
+            cached = self._cache.get(key) if key else None
+            if cached is None:
+                request = self._table_extraction_request(image_bytes, mime_type)
+                response = self._get_client().chat.completions.create(**request)
+                content = response.choices[0].message.content
+            else:
+                content = cached
+            table = self._table_from_response(content)
+            if table is not None and key and cached is None:
+                self._cache.set(key, content)
+            return table
+        except Exception as e:
+            logger.error("Image extraction failed: %s", e, exc_info=True)
+            return None
 
-            if "columns" in result and "rows" in result:
-                return result
-            logger.warning("[DEBUG] Vision API: result missing 'columns' or 'rows', keys=%s", list(result.keys()))
+    async def aextract_table_from_image(
+        self,
+        image_bytes: bytes,
+        mime_type: str = "image/png",
+        bypass_cache: bool = False,
+    ) -> dict[str, Any] | None:
+        """Async extract_table_from_image: awaits the API call instead of blocking the thread."""
+        if not self.is_available:
+            logger.warning("LLM not available for image extraction (no API key).")
             return None
 
+        try:
+            key = None if bypass_cache else self._image_cache_key(image_bytes, mime_type)
+            cached = self._cache.get(key) if key else None
+            if cached is None:
+                request = self._table_extraction_request(image_bytes, mime_type)
+                response = await self._get_async_client().chat.completions.create(**request)
+                content = response.choices[0].message.content
+            else:
+                content = cached
+            table = self._table_from_response(content)
+            if table is not None and key and cached is None:
+                self._cache.set(key, content)
+            return table
         except Exception as e:
             logger.error("Image extraction failed: %s", e, exc_info=True)
-            print(f"[VISION] API failed: {type(e).__name__}: {e}", flush=True)
             return None
 
+    def _table_extraction_request(self, image_bytes: bytes, mime_type: str) -> dict[str, Any]:
+        """
+        Keyword arguments for the Vision table-extraction chat completion.
+
+        Chat Completions only takes images inline (an uploaded file_id is not
+        accepted for image parts), so repeats are avoided by the response cache
+        instead: a cached image never reaches this point.
+        """
+        image_bytes, mime_type = _shrink_image(image_bytes, mime_type)
+        # base64 output is pure ASCII: build the data URL in one pass without a utf-8 decode
+        data_url = f"data:{mime_type};base64," + base64.b64encode(image_bytes).decode("ascii")
+        logger.debug(
+            "Vision API: calling model=%s, image_bytes=%s, mime=%s",
+            self.vision_model,
+            len(image_bytes),
+            mime_type,
+        )
+        return dict(
+            model=self.vision_model,
+            messages=[
+                {"role": "system", "content": IMAGE_EXTRACTION_SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": IMAGE_EXTRACTION_USER_PROMPT},
+                        {
+                            "type": "image_url",
+                            "image_url": {"url": data_url},
+                        },
+                    ],
+                },
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            max_tokens=4096,
+        )
+
+    def _image_cache_key(self, image_bytes: bytes, mime_type: str) -> str:
+        """Cache key for an extraction request, hashed from the raw image (not its base64)."""
+        return cache_key(
+            self.vision_model, IMAGE_EXTRACTION_SYSTEM_PROMPT, IMAGE_EXTRACTION_USER_PROMPT, mime_type, image_bytes
+        )
+
+    @staticmethod
+    def _table_from_response(raw_content: str) -> dict[str, Any] | None:
+        """The extracted {'columns', 'rows'} table, or None if the response lacks either."""
+        result = json.loads(raw_content)
+        if logger.isEnabledFor(logging.DEBUG):
+            rows, cols = result.get("rows", []), result.get("columns", [])
+            logger.debug(
+                "Vision API: response length=%s chars, columns=%s, rows=%s",
+                len(raw_content or ""), cols, len(rows),
+            )
+            if rows and len(rows[0]) != len(cols):
+                logger.debug("Vision API: row length %s != columns %s", len(rows[0]), len(cols))
+
+        if "columns" in result and "rows" in result:
+            return result
+        logger.warning("Vision API: result missing 'columns' or 'rows', keys=%s", list(result))
+        return None
+
 
 # Global singleton
 llm_client = LLMClient()
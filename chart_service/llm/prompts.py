@@ -18,12 +18,13 @@ Rules:
 CHART_CONFIG_USER_PROMPT = """Here is the tabular data to visualize:
 
 **Columns:** {columns}
-**Sample data (first {n_rows} rows):**
-{sample_data}
 **Total rows:** {total_rows}
 
-**Column types:**
-{column_types}
+**Column summary (one JSON object per column):**
+{column_summary}
+
+**First {n_rows} rows (values in column order):**
+{sample_data}
 
 Recommend the best chart type and configuration. Respond with JSON only:
 {{
@@ -36,6 +37,27 @@ Recommend the best chart type and configuration. Respond with JSON only:
   "reasoning": "Brief explanation"
 }}"""
 
+CHART_CONFIGS_USER_PROMPT = """Here are several independent datasets to visualize, one JSON object per line.
+Each has an "id", "total_rows", a "columns" summary (dtype, nulls, range or distinct values) and its "first_rows" (values in column order):
+
+{datasets}
+
+Recommend the best chart type and configuration for EACH dataset. Respond with JSON only, one result per dataset id:
+{{
+  "results": [
+    {{
+      "id": 0,
+      "chart_type": "line|bar|scatter|pie",
+      "x_column": "column_name",
+      "y_columns": ["column_name1", ...],
+      "title": "Descriptive chart title",
+      "x_label": "X axis label",
+      "y_label": "Y axis label"
+    }},
+    ...
+  ]
+}}"""
+
 IMAGE_EXTRACTION_SYSTEM_PROMPT = """You are a data extraction expert. Given an image containing tabular data (spreadsheet screenshot, table, chart with data labels), extract ALL the data into a structured table format.
 
 Rules:
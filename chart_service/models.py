@@ -5,14 +5,15 @@ Data models for the chart service.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional
+from functools import cached_property
+from typing import Any, Optional
 
 import pandas as pd
 
 
-@dataclass
+@dataclass(slots=True)
 class ChartConfig:
-    """Configuration for chart generation."""
+    """Configuration for chart generation (slotted: no per-instance __dict__)."""
 
     chart_type: str = "bar"
     x_column: Optional[str] = None
@@ -28,7 +29,12 @@ class ChartConfig:
     template: str = "plotly_white"
 
     def to_dict(self) -> dict:
-        """Serialize config to dict."""
+        """
+        Serialize config to dict.
+
+        Spelled out rather than dataclasses.asdict(), which deep-copies every
+        list and dict field on each call.
+        """
         return {
             "chart_type": self.chart_type,
             "x_column": self.x_column,
@@ -45,7 +51,8 @@ class ChartConfig:
     @classmethod
     def from_dict(cls, data: dict) -> ChartConfig:
         """Deserialize config from dict."""
-        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+        fields = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in data.items() if k in fields})
 
 
 @dataclass
@@ -55,6 +62,12 @@ class ParsedData:
     dataframe: pd.DataFrame
     source_type: str = "unknown"  # text, csv, excel, image
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "dataframe":
+            # The cached column split describes the old frame
+            self.__dict__.pop("_column_split", None)
+        object.__setattr__(self, name, value)
+
     @property
     def columns(self) -> list[str]:
         return list(self.dataframe.columns)
@@ -65,8 +78,15 @@ class ParsedData:
 
     @property
     def numeric_columns(self) -> list[str]:
-        return list(self.dataframe.select_dtypes(include="number").columns)
+        return list(self._column_split[0])
 
     @property
     def categorical_columns(self) -> list[str]:
-        return list(self.dataframe.select_dtypes(exclude="number").columns)
+        return list(self._column_split[1])
+
+    @cached_property
+    def _column_split(self) -> tuple[list[str], list[str]]:
+        """(numeric, non-numeric) columns, computed once per dataframe."""
+        from chart_service.chart_types.base import split_columns
+
+        return split_columns(self.dataframe)
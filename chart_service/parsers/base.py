@@ -4,37 +4,70 @@ Base parser interface for the parser registry.
 
 from __future__ import annotations
 
+import os
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import BinaryIO, Optional, Union
 
 import pandas as pd
 
+# Parsers accept raw text, file bytes, or (for CSV/Excel) a binary file object
+# such as an upload's SpooledTemporaryFile, which pandas reads without a copy.
+RawInput = Union[str, bytes, BinaryIO]
+
+
+def input_length(raw_input: Optional[RawInput]) -> Optional[int]:
+    """Length of str/bytes input for logging; None for file objects."""
+    if isinstance(raw_input, (str, bytes)):
+        return len(raw_input)
+    return None
+
+
+def coerce_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert text columns that hold only numbers to a numeric dtype, in place.
+
+    Only object/string columns are tried: columns the reader already typed
+    (numbers, bools, dates) are left as they are instead of being re-parsed.
+    """
+    for i, dtype in enumerate(df.dtypes):
+        if dtype.kind != "O":
+            continue
+        try:
+            df.isetitem(i, pd.to_numeric(df.iloc[:, i]))
+        except (ValueError, TypeError):
+            pass
+    return df
+
 
 class BaseParser(ABC):
     """Abstract base class for all data parsers."""
 
     name: str = "base"
-    supported_extensions: list[str] = []
-    supported_mime_types: list[str] = []
+    supported_extensions: frozenset[str] = frozenset()
+    supported_mime_types: frozenset[str] = frozenset()
 
     def can_handle(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: RawInput, filename: Optional[str] = None, ext: Optional[str] = None
     ) -> bool:
         """
         Check if this parser can handle the given input.
 
         Default implementation checks file extension if filename is provided.
         Subclasses can override for more sophisticated detection.
+
+        Args:
+            ext: The filename's extension as _get_extension returns it, when the
+                caller (the registry) has already computed it.
         """
         if filename:
-            ext = self._get_extension(filename)
-            if ext in self.supported_extensions:
-                return True
+            if ext is None:
+                ext = self._get_extension(filename)
+            return ext in self.supported_extensions
         return False
 
     @abstractmethod
     def parse(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: RawInput, filename: Optional[str] = None, nrows: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Parse the raw input into a pandas DataFrame.
@@ -42,6 +75,8 @@ class BaseParser(ABC):
         Args:
             raw_input: Raw text string or file bytes.
             filename: Optional filename for format detection.
+            nrows: Read at most this many data rows (a preview); None = all.
+                Tabular parsers stop reading early; others may ignore it.
 
         Returns:
             Parsed DataFrame with proper column names and types.
@@ -51,7 +86,5 @@ class BaseParser(ABC):
     @staticmethod
     def _get_extension(filename: str) -> str:
         """Extract lowercase file extension from filename."""
-        import os
-
         _, ext = os.path.splitext(filename)
         return ext.lower()
@@ -4,50 +4,82 @@ CSV parser: handles .csv file uploads.
 
 from __future__ import annotations
 
+import datetime
+import importlib.util
 from io import BytesIO, StringIO
-from typing import Optional, Union
+from typing import BinaryIO, Optional, Union
 
 import pandas as pd
 
-from chart_service.parsers.base import BaseParser
+from chart_service.parsers.base import BaseParser, RawInput, coerce_numeric
+
+# Arrow's CSV reader parses in parallel in C++; optional, the C engine is the fallback
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
 
 
 class CSVParser(BaseParser):
     """Parse CSV file bytes into a DataFrame."""
 
     name = "csv"
-    supported_extensions = [".csv"]
-    supported_mime_types = ["text/csv", "application/csv"]
-
-    def can_handle(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
-    ) -> bool:
-        if filename:
-            return self._get_extension(filename) in self.supported_extensions
-        return False
+    supported_extensions = frozenset({".csv"})
+    supported_mime_types = frozenset({"text/csv", "application/csv"})
 
     def parse(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: RawInput, filename: Optional[str] = None, nrows: Optional[int] = None
     ) -> pd.DataFrame:
         """
-        Parse CSV file bytes with encoding fallback (utf-8 -> latin-1).
+        Parse CSV text, bytes or a binary file object with encoding fallback (utf-8 -> latin-1).
+
+        With nrows the C engine stops after that many rows instead of reading
+        the whole file (pyarrow has no row limit, so it is skipped for previews).
         """
         if isinstance(raw_input, str):
-            df = pd.read_csv(StringIO(raw_input))
+            df = pd.read_csv(StringIO(raw_input), nrows=nrows)
+        elif not isinstance(raw_input, bytes):
+            # File object: let pandas stream it instead of copying into memory
+            start = raw_input.tell()
+            df = self._read_pyarrow(raw_input) if nrows is None else None
+            if df is None:
+                raw_input.seek(start)
+                try:
+                    df = pd.read_csv(raw_input, encoding="utf-8", nrows=nrows)
+                except UnicodeDecodeError:
+                    raw_input.seek(start)
+                    df = pd.read_csv(raw_input, encoding="latin-1", nrows=nrows)
         else:
-            try:
-                df = pd.read_csv(BytesIO(raw_input), encoding="utf-8")
-            except UnicodeDecodeError:
-                df = pd.read_csv(BytesIO(raw_input), encoding="latin-1")
+            df = self._read_pyarrow(BytesIO(raw_input)) if nrows is None else None
+            if df is None:
+                try:
+                    df = pd.read_csv(BytesIO(raw_input), encoding="utf-8", nrows=nrows)
+                except UnicodeDecodeError:
+                    df = pd.read_csv(BytesIO(raw_input), encoding="latin-1", nrows=nrows)
 
         if df.empty:
             raise ValueError("CSV file resulted in an empty DataFrame")
 
-        # Try to convert numeric columns
-        for col in df.columns:
-            try:
-                df[col] = pd.to_numeric(df[col])
-            except (ValueError, TypeError):
-                pass
+        coerce_numeric(df)
 
         return df
+
+    @staticmethod
+    def _read_pyarrow(source: Union[BytesIO, BinaryIO]) -> Optional[pd.DataFrame]:
+        """
+        Read UTF-8 CSV with the pyarrow engine; None when the caller should use
+        the C engine instead (pyarrow missing, input it rejects, or non-UTF-8).
+        """
+        if not _HAS_PYARROW:
+            return None
+        try:
+            df = pd.read_csv(source, engine="pyarrow")
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, ValueError):
+            return None  # e.g. ragged rows, which the C engine tolerates
+        for i, dtype in enumerate(df.dtypes):
+            if dtype.kind != "O" or df.empty:
+                continue
+            first = df.iloc[:, i].dropna().head(1).tolist()
+            if first and isinstance(first[0], bytes):
+                return None  # Invalid UTF-8 comes back as binary: retry with latin-1
+            if first and isinstance(first[0], datetime.date):
+                # Arrow parses date-only columns to date32 (Python objects here)
+                df.isetitem(i, pd.to_datetime(df.iloc[:, i]))
+        return df
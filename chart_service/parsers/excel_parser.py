@@ -4,53 +4,73 @@ Excel parser: handles .xlsx and .xls file uploads.
 
 from __future__ import annotations
 
+import importlib.util
 from io import BytesIO
-from typing import Optional, Union
+from typing import Optional
 
 import pandas as pd
 
-from chart_service.parsers.base import BaseParser
+from chart_service.parsers.base import BaseParser, RawInput, coerce_numeric
+
+# Rust-backed reader for .xlsx and .xls; openpyxl (pure Python, .xlsx only) is the fallback
+_EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
 
 
 class ExcelParser(BaseParser):
     """Parse Excel file bytes into a DataFrame."""
 
     name = "excel"
-    supported_extensions = [".xlsx", ".xls"]
-    supported_mime_types = [
+    supported_extensions = frozenset({".xlsx", ".xls"})
+    supported_mime_types = frozenset({
         "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         "application/vnd.ms-excel",
-    ]
-
-    def can_handle(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
-    ) -> bool:
-        if filename:
-            return self._get_extension(filename) in self.supported_extensions
-        return False
+    })
 
     def parse(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: RawInput, filename: Optional[str] = None, nrows: Optional[int] = None
     ) -> pd.DataFrame:
         """
-        Parse Excel file bytes (reads first sheet by default).
+        Parse Excel file bytes or a binary file object (reads first sheet by default).
         """
-        if isinstance(raw_input, str):
-            raise ValueError("Excel parser requires bytes input, not string")
-
+        source = self._source(raw_input)
         try:
-            df = pd.read_excel(BytesIO(raw_input), sheet_name=0, engine="openpyxl")
+            df = pd.read_excel(source, sheet_name=0, engine=_EXCEL_ENGINE, nrows=nrows)
         except Exception as e:
             raise ValueError(f"Failed to parse Excel file: {e}") from e
 
         if df.empty:
             raise ValueError("Excel file resulted in an empty DataFrame")
 
-        # Try to convert numeric columns
-        for col in df.columns:
-            try:
-                df[col] = pd.to_numeric(df[col])
-            except (ValueError, TypeError):
-                pass
+        coerce_numeric(df)
 
         return df
+
+    def parse_sheets(
+        self, raw_input: RawInput, sheet_names: Optional[list[str]] = None
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Parse several sheets (all of them by default) into {sheet name: DataFrame}.
+
+        The workbook (and its shared-strings table) is loaded once for every
+        sheet rather than once per sheet. Empty sheets are left out.
+        """
+        source = self._source(raw_input)
+        try:
+            frames = pd.read_excel(
+                source,
+                sheet_name=sheet_names,  # None = every sheet
+                engine=_EXCEL_ENGINE,
+            )
+        except Exception as e:
+            raise ValueError(f"Failed to parse Excel file: {e}") from e
+
+        frames = {name: coerce_numeric(df) for name, df in frames.items() if not df.empty}
+        if not frames:
+            raise ValueError("Excel file resulted in an empty DataFrame")
+        return frames
+
+    @staticmethod
+    def _source(raw_input: RawInput):
+        if isinstance(raw_input, str):
+            raise ValueError("Excel parser requires bytes input, not string")
+        return BytesIO(raw_input) if isinstance(raw_input, bytes) else raw_input
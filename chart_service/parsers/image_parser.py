@@ -5,37 +5,44 @@ Image parser: extracts tabular data from images using OCR or Vision LLM.
 from __future__ import annotations
 
 import logging
+import os
 from typing import Optional, Union
 
 import pandas as pd
 
-from chart_service.parsers.base import BaseParser
+from chart_service.parsers.base import BaseParser, coerce_numeric
 
 logger = logging.getLogger(__name__)
 
+# Longest image edge handed to tesseract; larger images are downscaled first
+_OCR_MAX_EDGE = 2000
+# LSTM engine only, and treat the page as one uniform block (rows of a table)
+_OCR_CONFIG = "--oem 1 --psm 6"
+
 
 class ImageParser(BaseParser):
     """Parse images containing tabular data into a DataFrame."""
 
     name = "image"
-    supported_extensions = [".png", ".jpg", ".jpeg", ".webp"]
-    supported_mime_types = ["image/png", "image/jpeg", "image/webp"]
+    supported_extensions = frozenset({".png", ".jpg", ".jpeg", ".webp"})
+    supported_mime_types = frozenset({"image/png", "image/jpeg", "image/webp"})
 
     def can_handle(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: Union[str, bytes], filename: Optional[str] = None, ext: Optional[str] = None
     ) -> bool:
         if filename:
-            return self._get_extension(filename) in self.supported_extensions
+            return super().can_handle(raw_input, filename, ext)
         # Check if it looks like image bytes (check magic bytes)
         if isinstance(raw_input, bytes) and len(raw_input) > 8:
             return self._is_image_bytes(raw_input)
         return False
 
     def parse(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: Union[str, bytes], filename: Optional[str] = None, nrows: Optional[int] = None
     ) -> pd.DataFrame:
         """
-        Extract tabular data from an image.
+        Extract tabular data from an image (the whole table: nrows is ignored,
+        since extraction cost doesn't depend on how many rows are kept).
 
         Strategy:
         1. Try Vision LLM (GPT-4V) if API key available
@@ -47,32 +54,26 @@ class ImageParser(BaseParser):
 
         # Determine MIME type
         mime_type = self._guess_mime_type(raw_input, filename)
-        logger.info(
-            "[DEBUG] Image parse started: filename=%s, mime_type=%s, image_size_bytes=%s",
+        logger.debug(
+            "Image parse started: filename=%s, mime_type=%s, image_size_bytes=%s",
             filename,
             mime_type,
             len(raw_input),
         )
-        print(f"[IMAGE] parse started filename={filename!r} mime={mime_type} size={len(raw_input)}", flush=True)
 
         # Strategy 1: Vision LLM
         df, vision_error = self._try_vision_llm(raw_input, mime_type)
         if df is not None:
-            logger.info("[DEBUG] Image parse succeeded via Vision LLM: shape=%s", df.shape)
-            print(f"[IMAGE] parse OK via Vision LLM shape={df.shape}", flush=True)
+            logger.debug("Image parse succeeded via Vision LLM: shape=%s", df.shape)
             return df
-        err_str = f"{type(vision_error).__name__}: {vision_error}" if vision_error else "None"
-        logger.info("[DEBUG] Vision LLM did not return data. vision_error=%s", err_str)
-        print(f"[IMAGE] Vision LLM no data. vision_error={err_str}", flush=True)
+        logger.debug("Vision LLM did not return data. vision_error=%r", vision_error)
 
         # Strategy 2: OCR with pytesseract
         df = self._try_ocr(raw_input)
         if df is not None:
-            logger.info("[DEBUG] Image parse succeeded via OCR: shape=%s", df.shape)
-            print(f"[IMAGE] parse OK via OCR shape={df.shape}", flush=True)
+            logger.debug("Image parse succeeded via OCR: shape=%s", df.shape)
             return df
-        logger.info("[DEBUG] OCR did not return data.")
-        print("[IMAGE] OCR did not return data", flush=True)
+        logger.debug("OCR did not return data.")
 
         msg = (
             "Could not extract tabular data from image. "
@@ -80,8 +81,7 @@ class ImageParser(BaseParser):
         )
         if vision_error is not None:
             msg += f" Vision API error: {vision_error!s}"
-        logger.warning("[DEBUG] Image parse failed. %s", msg)
-        print(f"[IMAGE] parse FAILED: {msg}", flush=True)
+        logger.warning("Image parse failed. %s", msg)
         raise ValueError(msg)
 
     def _try_vision_llm(self, image_bytes: bytes, mime_type: str) -> tuple[pd.DataFrame | None, Exception | None]:
@@ -90,36 +90,21 @@ class ImageParser(BaseParser):
         try:
             from chart_service.llm.client import llm_client
 
-            logger.info("[DEBUG] Vision LLM: is_available=%s", llm_client.is_available)
-            print(f"[IMAGE] Vision LLM is_available={llm_client.is_available}", flush=True)
             if not llm_client.is_available:
-                logger.info("[DEBUG] Vision LLM: skipped (no API key)")
-                print("[IMAGE] Vision LLM skipped (no API key)", flush=True)
-                last_error = None
-                return None, last_error
+                logger.debug("Vision LLM: skipped (no API key)")
+                return None, None
 
-            logger.info("[DEBUG] Vision LLM: calling API (image_bytes=%s, mime=%s)", len(image_bytes), mime_type)
-            print(f"[IMAGE] Vision LLM calling API size={len(image_bytes)} mime={mime_type}", flush=True)
+            logger.debug("Vision LLM: calling API (image_bytes=%s, mime=%s)", len(image_bytes), mime_type)
             result = llm_client.extract_table_from_image(image_bytes, mime_type)
-            logger.info(
-                "[DEBUG] Vision LLM: result keys=%s, rows_count=%s",
-                list(result.keys()) if result else None,
-                len(result.get("rows", [])) if result else 0,
-            )
             if result and "columns" in result and "rows" in result:
                 df = pd.DataFrame(result["rows"], columns=result["columns"])
-                # Convert numeric columns
-                for col in df.columns:
-                    try:
-                        df[col] = pd.to_numeric(df[col])
-                    except (ValueError, TypeError):
-                        pass
+                coerce_numeric(df)
                 if not df.empty:
                     logger.info("Vision LLM extracted table: %s", df.shape)
                     return df, None
-                logger.info("[DEBUG] Vision LLM: result had empty DataFrame after conversion")
+                logger.debug("Vision LLM: result had empty DataFrame after conversion")
             else:
-                logger.info("[DEBUG] Vision LLM: result missing columns/rows or empty")
+                logger.debug("Vision LLM: result missing columns/rows or empty")
         except Exception as e:
             last_error = e
             logger.warning("Vision LLM extraction failed: %s", e, exc_info=True)
@@ -128,70 +113,118 @@ class ImageParser(BaseParser):
     def _try_ocr(self, image_bytes: bytes) -> pd.DataFrame | None:
         """Try to extract table using pytesseract OCR."""
         try:
-            from io import BytesIO, StringIO
+            from io import BytesIO
 
             from PIL import Image
             import pytesseract
 
-            logger.info("[DEBUG] OCR: opening image (size=%s bytes)", len(image_bytes))
-            img = Image.open(BytesIO(image_bytes))
-            text = pytesseract.image_to_string(img)
-            logger.info("[DEBUG] OCR: extracted text length=%s chars, preview=%s", len(text), repr(text[:200]) if text else "")
+            logger.debug("OCR: opening image (size=%s bytes)", len(image_bytes))
+            img = self._prepare_for_ocr(Image.open(BytesIO(image_bytes)))
+            # Word boxes rather than plain text: cells are recovered from positions,
+            # not by delimiter-sniffing the text with read_csv's Python engine
+            words = pytesseract.image_to_data(img, config=_OCR_CONFIG, output_type=pytesseract.Output.DATAFRAME)
+            logger.debug("OCR: extracted %s word boxes", len(words))
 
-            if not text.strip():
-                logger.info("[DEBUG] OCR: no text extracted")
+            df = self._table_from_ocr_words(words)
+            if df is None:
+                logger.debug("OCR: no table rows recognized")
                 return None
-
-            # Try to parse the OCR text as tabular data
-            df = pd.read_csv(StringIO(text), sep=None, engine="python", skipinitialspace=True)
-            if not df.empty:
-                # Convert numeric columns
-                for col in df.columns:
-                    try:
-                        df[col] = pd.to_numeric(df[col])
-                    except (ValueError, TypeError):
-                        pass
-                logger.info("OCR extracted table: %s", df.shape)
-                return df
-            logger.info("[DEBUG] OCR: read_csv produced empty DataFrame")
+            coerce_numeric(df)
+            logger.info("OCR extracted table: %s", df.shape)
+            return df
         except ImportError as e:
             logger.warning("pytesseract not available for OCR: %s", e)
         except Exception as e:
             logger.warning("OCR extraction failed: %s", e, exc_info=True)
         return None
 
+    @staticmethod
+    def _table_from_ocr_words(words: pd.DataFrame) -> pd.DataFrame | None:
+        """
+        Rebuild a table from tesseract word boxes (image_to_data's DataFrame).
+
+        Words on one line closer than a character height apart form one cell.
+        The first line is the header; each later cell goes to the header column
+        whose centre is nearest, so blank cells don't shift values left.
+        """
+        words = words[(words["conf"] != -1) & words["text"].notna()]
+        words = words[words["text"].astype(str).str.strip() != ""]
+        if words.empty:
+            return None
+
+        lines = []
+        for _, line in words.sort_values("left").groupby(["block_num", "par_num", "line_num"], sort=False):
+            gap_limit = line["height"].median()
+            cells: list[list] = []  # [text, left, right]
+            for text, left, width in zip(line["text"].astype(str), line["left"], line["width"]):
+                if cells and left - cells[-1][2] < gap_limit:
+                    cells[-1][0] += " " + text
+                    cells[-1][2] = left + width
+                else:
+                    cells.append([text, left, left + width])
+            lines.append((line["top"].min(), cells))
+        lines.sort(key=lambda item: item[0])
+
+        header = lines[0][1]
+        if len(lines) < 2 or len(header) < 2:
+            return None
+        centers = [(left + right) / 2 for _, left, right in header]
+        rows = []
+        for _, cells in lines[1:]:
+            row: list = [None] * len(header)
+            for text, left, right in cells:
+                center = (left + right) / 2
+                col = min(range(len(centers)), key=lambda i: abs(centers[i] - center))
+                row[col] = text if row[col] is None else f"{row[col]} {text}"
+            rows.append(row)
+        return pd.DataFrame(rows, columns=[text for text, _, _ in header])
+
+    @staticmethod
+    def _prepare_for_ocr(img):
+        """
+        Grayscale, contrast-stretched and at most _OCR_MAX_EDGE px: tesseract's
+        time grows with pixel count, and table text stays legible at this size.
+        """
+        from PIL import Image, ImageOps
+
+        img = img.convert("L")
+        img.thumbnail((_OCR_MAX_EDGE, _OCR_MAX_EDGE), Image.LANCZOS)
+        return ImageOps.autocontrast(img)
+
     @staticmethod
     def _is_image_bytes(data: bytes) -> bool:
         """Check if bytes look like an image based on magic bytes."""
-        # PNG: 89 50 4E 47
-        if data[:4] == b"\x89PNG":
-            return True
-        # JPEG: FF D8 FF
-        if data[:3] == b"\xff\xd8\xff":
-            return True
-        # WebP: RIFF....WEBP
-        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
-            return True
-        return False
+        return _sniff_image_mime(data) is not None
 
     @staticmethod
     def _guess_mime_type(data: bytes, filename: str | None) -> str:
         """Guess MIME type from filename or magic bytes."""
         if filename:
-            ext = filename.lower().rsplit(".", 1)[-1] if "." in filename else ""
-            mime_map = {
-                "png": "image/png",
-                "jpg": "image/jpeg",
-                "jpeg": "image/jpeg",
-                "webp": "image/webp",
-            }
-            if ext in mime_map:
-                return mime_map[ext]
-
-        if data[:4] == b"\x89PNG":
-            return "image/png"
-        if data[:3] == b"\xff\xd8\xff":
-            return "image/jpeg"
-        if data[:4] == b"RIFF":
-            return "image/webp"
-        return "image/png"
+            _, ext = os.path.splitext(filename)
+            mime = _EXTENSION_MIME_TYPES.get(ext.lower())
+            if mime:
+                return mime
+        return _sniff_image_mime(data) or "image/png"
+
+
+# Extension -> MIME type for the supported image formats
+_EXTENSION_MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+}
+
+# Leading magic bytes -> MIME type. WebP ("RIFF" + size + "WEBP") is checked separately.
+_MAGIC_MIME_TYPES = {
+    b"\x89PNG": "image/png",  # 89 50 4E 47
+    b"\xff\xd8\xff": "image/jpeg",  # FF D8 FF (the 4th byte varies by JPEG flavour)
+}
+
+
+def _sniff_image_mime(data: bytes) -> Optional[str]:
+    """MIME type of a PNG/JPEG/WebP header in one pass over the first 12 bytes; None if not an image."""
+    head = data[:4]
+    if head == b"RIFF":
+        return "image/webp" if data[8:12] == b"WEBP" else None
+    return _MAGIC_MIME_TYPES.get(head) or _MAGIC_MIME_TYPES.get(head[:3])
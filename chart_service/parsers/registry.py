@@ -5,9 +5,9 @@ Parser registry: manages parser instances and dispatches to the right one.
 from __future__ import annotations
 
 import logging
-from typing import Optional, Union
+from typing import Optional
 
-from chart_service.parsers.base import BaseParser
+from chart_service.parsers.base import BaseParser, RawInput, input_length
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +17,21 @@ class ParserRegistry:
 
     def __init__(self) -> None:
         self._parsers: dict[str, BaseParser] = {}
+        # Extension -> parser, so a filename dispatches with one dict lookup
+        self._by_ext: dict[str, BaseParser] = {}
+        # Parsers asked in registration order when the extension is unknown
+        self._content_parsers: list[BaseParser] = []
 
     def register(self, parser: BaseParser) -> None:
         """Register a parser instance."""
         self._parsers[parser.name] = parser
+        for ext in parser.supported_extensions:
+            # Earlier registrations keep priority, as in the sequential scan
+            self._by_ext.setdefault(ext, parser)
+        self._content_parsers.append(parser)
 
     def get_parser_for(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: RawInput, filename: Optional[str] = None
     ) -> BaseParser:
         """
         Find and return the first parser that can handle the input.
@@ -33,24 +41,30 @@ class ParserRegistry:
         Raises:
             ValueError: If no parser can handle the input.
         """
-        for parser in self._parsers.values():
-            if parser.can_handle(raw_input, filename):
-                logger.info(
-                    "[DEBUG] Parser selected: %s (filename=%s, input_type=%s, input_len=%s)",
-                    parser.name,
-                    filename,
-                    type(raw_input).__name__,
-                    len(raw_input) if raw_input is not None else 0,
-                )
-                print(f"[PARSER] selected: {parser.name} filename={filename!r} input_len={len(raw_input) if raw_input else 0}", flush=True)
-                return parser
-
-        raise ValueError(
-            f"No parser found for input (filename={filename}, "
-            f"type={type(raw_input).__name__}, "
-            f"length={len(raw_input)}). "
-            f"Available parsers: {self.list_parsers()}"
-        )
+        # Extension computed once and shared with every can_handle() below
+        ext = BaseParser._get_extension(filename) if filename else None
+        parser = self._by_ext.get(ext) if ext is not None else None
+        if parser is None:
+            parser = next(
+                (p for p in self._content_parsers if p.can_handle(raw_input, filename, ext)), None
+            )
+        if parser is None:
+            raise ValueError(
+                f"No parser found for input (filename={filename}, "
+                f"type={type(raw_input).__name__}, "
+                f"length={input_length(raw_input)}). "
+                f"Available parsers: {self.list_parsers()}"
+            )
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Parser selected: %s (filename=%s, input_type=%s, input_len=%s)",
+                parser.name,
+                filename,
+                type(raw_input).__name__,
+                input_length(raw_input),
+            )
+        return parser
 
     def list_parsers(self) -> list[str]:
         """Return list of registered parser names."""
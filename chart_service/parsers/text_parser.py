@@ -4,69 +4,114 @@ Text parser: handles raw tab/space/comma-separated text input.
 
 from __future__ import annotations
 
-from io import StringIO
+import re
+from io import BytesIO, StringIO
 from typing import Optional, Union
 
 import pandas as pd
 
 from chart_service.parsers.base import BaseParser
 
+# Extensions owned by the file parsers; text with one of these isn't ours
+_KNOWN_EXTS = frozenset({".csv", ".xlsx", ".xls", ".png", ".jpg", ".jpeg", ".webp"})
+
+# Delimiters recognised from the header line, in tie-break order
+_DELIMITERS = ("\t", ",", ";", "|")
+
+
+# First line holding anything but whitespace (the header), for str and bytes input
+_HEADER_LINE = re.compile(r"^.*\S.*$", re.MULTILINE)
+_HEADER_LINE_BYTES = re.compile(rb"^.*\S.*$", re.MULTILINE)
+
+
+def _sniff_delimiter(text: Union[str, bytes]) -> Optional[str]:
+    """Pick the most frequent delimiter on the header line; None if it has none."""
+    if isinstance(text, bytes):
+        match = _HEADER_LINE_BYTES.search(text)
+        header = match.group().decode("utf-8", "replace") if match else ""
+    else:
+        match = _HEADER_LINE.search(text)
+        header = match.group() if match else ""
+    counts = [(header.count(d), d) for d in _DELIMITERS]
+    count, sep = max(counts, key=lambda c: c[0])
+    return sep if count else None
+
+
+def _buffer(raw_input: Union[str, bytes]) -> Union[BytesIO, StringIO]:
+    """
+    Wrap the input for read_csv as-is, with no decoded or stripped copy. Bytes
+    are decoded by the C parser in one pass; blank and whitespace-only lines
+    are skipped there too.
+    """
+    return BytesIO(raw_input) if isinstance(raw_input, bytes) else StringIO(raw_input)
+
 
 class TextParser(BaseParser):
     """Parse raw text (tab/space/comma separated) into a DataFrame."""
 
     name = "text"
-    supported_extensions = [".txt", ".tsv"]
-    supported_mime_types = ["text/plain", "text/tab-separated-values"]
+    supported_extensions = frozenset({".txt", ".tsv"})
+    supported_mime_types = frozenset({"text/plain", "text/tab-separated-values"})
 
     def can_handle(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: Union[str, bytes], filename: Optional[str] = None, ext: Optional[str] = None
     ) -> bool:
         """Text parser handles any string input without a recognized file extension."""
         if filename:
-            ext = self._get_extension(filename)
+            if ext is None:
+                ext = self._get_extension(filename)
             if ext in self.supported_extensions:
                 return True
             # If the filename has another recognized extension, don't handle it
-            if ext in (".csv", ".xlsx", ".xls", ".png", ".jpg", ".jpeg", ".webp"):
+            if ext in _KNOWN_EXTS:
                 return False
         # Handle any plain string input
         return isinstance(raw_input, str)
 
     def parse(
-        self, raw_input: Union[str, bytes], filename: Optional[str] = None
+        self, raw_input: Union[str, bytes], filename: Optional[str] = None, nrows: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Parse text input using pandas with automatic delimiter detection.
 
         Handles tab-separated, comma-separated, and space-separated text.
-        First row is treated as headers.
+        First row is treated as headers. The delimiter is read off the header
+        line so the C engine can do the parsing; pandas' Python-engine sniffer
+        is only used when that fails.
         """
-        if isinstance(raw_input, bytes):
-            raw_input = raw_input.decode("utf-8")
-
-        text = raw_input.strip()
-        if not text:
+        if not raw_input:
             raise ValueError("Empty text input")
 
+        sep = _sniff_delimiter(raw_input)
         try:
             df = pd.read_csv(
-                StringIO(text),
-                sep=None,
-                engine="python",
+                _buffer(raw_input),
+                sep=sep if sep is not None else r"\s+",
+                engine="c",
                 skipinitialspace=True,
+                encoding="utf-8",
+                nrows=nrows,
             )
-        except Exception as e:
-            raise ValueError(f"Failed to parse text input: {e}") from e
+        except pd.errors.EmptyDataError:
+            # Whitespace-only input: read_csv finds no header line
+            raise ValueError("Empty text input") from None
+        except Exception:
+            # Ragged or oddly delimited text: let the sniffer have a go
+            try:
+                df = pd.read_csv(
+                    _buffer(raw_input),
+                    sep=None,
+                    engine="python",
+                    skipinitialspace=True,
+                    encoding="utf-8",
+                    nrows=nrows,
+                )
+            except Exception as e:
+                raise ValueError(f"Failed to parse text input: {e}") from e
 
         if df.empty:
             raise ValueError("Parsed text resulted in an empty DataFrame")
 
-        # Try to convert numeric columns
-        for col in df.columns:
-            try:
-                df[col] = pd.to_numeric(df[col])
-            except (ValueError, TypeError):
-                pass
-
+        # No coerce_numeric pass: read_csv already typed every column that
+        # to_numeric could convert, so it would only raise and catch per text column
         return df
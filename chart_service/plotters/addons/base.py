@@ -17,6 +17,15 @@ class PlotAddon(ABC):
     name: str = "base_addon"
     order: int = 0  # Lower = applied first
 
+    def applies_to(self, config: ChartConfig) -> bool:
+        """
+        Whether apply() would change anything for this config.
+
+        Checked by the registry so add-ons with nothing to do are skipped
+        without a call into apply(). Defaults to True.
+        """
+        return True
+
     @abstractmethod
     def apply(self, fig: go.Figure, config: ChartConfig) -> go.Figure:
         """
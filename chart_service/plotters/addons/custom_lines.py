@@ -16,36 +16,54 @@ class CustomLinesAddon(PlotAddon):
     name = "custom_lines"
     order = 20
 
+    def applies_to(self, config: ChartConfig) -> bool:
+        return bool(config.reference_lines)
+
     def apply(self, fig: go.Figure, config: ChartConfig) -> go.Figure:
         if not config.reference_lines:
             return fig
 
+        # Built as plain dicts and added in one update_layout call: each
+        # add_hline/add_vline re-validates the whole shapes list
+        shapes = []
+        annotations = []
         for line_spec in config.reference_lines:
             orientation = line_spec.get("orientation", "h")
             value = line_spec.get("value")
-            color = line_spec.get("color", "red")
-            dash = line_spec.get("dash", "dash")
-            label = line_spec.get("label", "")
-            width = line_spec.get("width", 2)
-
-            if value is None:
+            if value is None or orientation not in ("h", "v"):
                 continue
 
+            line = {
+                "color": line_spec.get("color", "red"),
+                "dash": line_spec.get("dash", "dash"),
+                "width": line_spec.get("width", 2),
+            }
+            label = line_spec.get("label", "")
+            # Same geometry add_hline/add_vline produce: span the plot area
+            # along one axis, sit at `value` on the other; label at the top right
             if orientation == "h":
-                fig.add_hline(
-                    y=value,
-                    line_dash=dash,
-                    line_color=color,
-                    line_width=width,
-                    annotation_text=label,
-                )
-            elif orientation == "v":
-                fig.add_vline(
-                    x=value,
-                    line_dash=dash,
-                    line_color=color,
-                    line_width=width,
-                    annotation_text=label,
-                )
+                shapes.append(dict(
+                    type="line", xref="x domain", x0=0, x1=1, yref="y", y0=value, y1=value, line=line,
+                ))
+                if label:
+                    annotations.append(dict(
+                        text=label, showarrow=False, xref="x domain", x=1, xanchor="right",
+                        yref="y", y=value, yanchor="bottom",
+                    ))
+            else:
+                shapes.append(dict(
+                    type="line", xref="x", x0=value, x1=value, yref="y domain", y0=0, y1=1, line=line,
+                ))
+                if label:
+                    annotations.append(dict(
+                        text=label, showarrow=False, xref="x", x=value, xanchor="left",
+                        yref="y domain", y=1, yanchor="top",
+                    ))
+
+        if shapes:
+            layout_updates = {"shapes": fig.layout.shapes + tuple(shapes)}
+            if annotations:
+                layout_updates["annotations"] = fig.layout.annotations + tuple(annotations)
+            fig.update_layout(**layout_updates)
 
         return fig
@@ -10,6 +10,14 @@ from chart_service.models import ChartConfig
 from chart_service.plotters.addons.base import PlotAddon
 
 
+# Standard layout improvements applied to every chart (shared; never mutated)
+_DEFAULT_LAYOUT = {
+    "font": {"family": "Inter, Arial, sans-serif"},
+    "hoverlabel": {"bgcolor": "white", "font_size": 13},
+    "margin": {"l": 60, "r": 30, "t": 60, "b": 60},
+}
+
+
 class LayoutAddon(PlotAddon):
     """Apply layout customizations to the chart."""
 
@@ -17,7 +25,7 @@ class LayoutAddon(PlotAddon):
     order = 100  # Applied last
 
     def apply(self, fig: go.Figure, config: ChartConfig) -> go.Figure:
-        layout_updates = {}
+        layout_updates = {**_DEFAULT_LAYOUT}
 
         # Apply template
         if config.template:
@@ -25,30 +33,17 @@ class LayoutAddon(PlotAddon):
 
         # Apply annotations
         if config.annotations:
-            annotations = []
-            for ann in config.annotations:
-                annotations.append(
-                    dict(
-                        x=ann.get("x"),
-                        y=ann.get("y"),
-                        text=ann.get("text", ""),
-                        showarrow=ann.get("showarrow", True),
-                        arrowhead=ann.get("arrowhead", 2),
-                        font=dict(size=ann.get("font_size", 12)),
-                    )
-                )
-            layout_updates["annotations"] = annotations
-
-        # Standard layout improvements
-        layout_updates.update(
-            {
-                "font": dict(family="Inter, Arial, sans-serif"),
-                "hoverlabel": dict(bgcolor="white", font_size=13),
-                "margin": dict(l=60, r=30, t=60, b=60),
-            }
-        )
-
-        if layout_updates:
-            fig.update_layout(**layout_updates)
-
+            layout_updates["annotations"] = [
+                {
+                    "x": ann.get("x"),
+                    "y": ann.get("y"),
+                    "text": ann.get("text", ""),
+                    "showarrow": ann.get("showarrow", True),
+                    "arrowhead": ann.get("arrowhead", 2),
+                    "font": {"size": ann.get("font_size", 12)},
+                }
+                for ann in config.annotations
+            ]
+
+        fig.update_layout(**layout_updates)
         return fig
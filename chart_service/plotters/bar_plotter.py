@@ -5,7 +5,6 @@ Bar chart plotter using Plotly Express.
 from __future__ import annotations
 
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 
 from chart_service.models import ChartConfig
@@ -18,10 +17,9 @@ class BarPlotter(BasePlotter):
     chart_type = "bar"
 
     def plot(self, df: pd.DataFrame, config: ChartConfig) -> go.Figure:
-        x_col = config.x_column or df.columns[0]
-        y_cols = config.y_columns or [
-            c for c in df.select_dtypes(include="number").columns if c != x_col
-        ]
+        px = self._px()
+
+        x_col, y_cols = self._resolve_xy(df, config)
 
         if len(y_cols) == 1:
             fig = px.bar(
@@ -9,6 +9,7 @@ from abc import ABC, abstractmethod
 import pandas as pd
 import plotly.graph_objects as go
 
+from chart_service.chart_types.base import split_columns
 from chart_service.models import ChartConfig
 
 
@@ -30,3 +31,26 @@ class BasePlotter(ABC):
             A plotly Figure object.
         """
         ...
+
+    @staticmethod
+    def _px():
+        """
+        plotly.express, imported on first use rather than at module load.
+
+        Importing it takes ~0.2 s (it loads every trace validator), which
+        importing chart_service or starting the API shouldn't pay for; after the
+        first chart this is a sys.modules lookup.
+        """
+        import plotly.express as px
+
+        return px
+
+    @staticmethod
+    def _resolve_xy(df: pd.DataFrame, config: ChartConfig) -> tuple[str, list[str]]:
+        """
+        X and Y columns for the plot: the config's choice, else the first column
+        against every other numeric column (found in one pass over df.dtypes).
+        """
+        x_col = config.x_column or df.columns[0]
+        y_cols = config.y_columns or [c for c in split_columns(df)[0] if c != x_col]
+        return x_col, y_cols
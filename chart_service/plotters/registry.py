@@ -4,6 +4,12 @@ Plotter registry: manages plotter instances and add-on pipeline.
 
 from __future__ import annotations
 
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional
+
 import pandas as pd
 import plotly.graph_objects as go
 
@@ -11,22 +17,54 @@ from chart_service.models import ChartConfig
 from chart_service.plotters.base import BasePlotter
 from chart_service.plotters.addons.base import PlotAddon
 
+# Figures kept for repeated (data, config) pairs, e.g. preview re-renders
+# (only for callers that pass memoize=True)
+_PLOT_CACHE_SIZE = 32
+
+
+def _plot_cache_key(df: pd.DataFrame, config: ChartConfig) -> Optional[tuple[str, str]]:
+    """
+    Key a plot by config and frame content; None if the frame can't be hashed.
+
+    Column names and dtypes go into the digest because hash_pandas_object
+    only covers values and index.
+    """
+    try:
+        values = pd.util.hash_pandas_object(df, index=True).values
+    except TypeError:  # unhashable cells such as lists
+        return None
+    h = hashlib.blake2b(values.tobytes(), digest_size=16)
+    h.update(repr((list(df.columns), [str(t) for t in df.dtypes])).encode())
+    config_key = json.dumps(config.to_dict(), sort_keys=True, default=str)
+    return config_key, h.hexdigest()
+
 
 class PlotterRegistry:
     """Registry of chart plotters with an add-on pipeline."""
 
-    def __init__(self) -> None:
+    def __init__(self, cache_size: int = _PLOT_CACHE_SIZE) -> None:
         self._plotters: dict[str, BasePlotter] = {}
-        self._addons: list[PlotAddon] = []
+        # Kept sorted by `order`; rebuilt on (rare) registration, iterated per plot
+        self._addons: tuple[PlotAddon, ...] = ()
+        # LRU of finished figures; callers get copies, never the cached object
+        self._cache: OrderedDict[tuple[str, str], go.Figure] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
 
     def register_plotter(self, plotter: BasePlotter) -> None:
         """Register a plotter for a specific chart type."""
         self._plotters[plotter.chart_type] = plotter
+        self.clear_cache()
 
     def register_addon(self, addon: PlotAddon) -> None:
         """Register a plot add-on. Add-ons are applied in order of their `order` attribute."""
-        self._addons.append(addon)
-        self._addons.sort(key=lambda a: a.order)
+        self._addons = tuple(sorted((*self._addons, addon), key=lambda a: a.order))
+        self.clear_cache()
+
+    def clear_cache(self) -> None:
+        """Forget memoized figures."""
+        with self._cache_lock:
+            self._cache.clear()
 
     def get_plotter(self, chart_type: str) -> BasePlotter:
         """
@@ -42,7 +80,7 @@ class PlotterRegistry:
             )
         return self._plotters[chart_type]
 
-    def plot(self, df: pd.DataFrame, config: ChartConfig) -> go.Figure:
+    def plot(self, df: pd.DataFrame, config: ChartConfig, memoize: bool = False) -> go.Figure:
         """
         Create a figure using the appropriate plotter and apply all add-ons.
 
@@ -50,16 +88,36 @@ class PlotterRegistry:
         2. Create base figure
         3. Apply each registered add-on in order
 
+        With memoize=True, identical data and config return a copy of the
+        previously built figure. Meant for callers that re-render the same
+        input (UI previews): hashing the frame and copying the figure cost
+        ~10 ms, wasted on the one-off charts the API builds.
+
         Returns:
             Final Plotly figure.
         """
         plotter = self.get_plotter(config.chart_type)
+        key = _plot_cache_key(df, config) if memoize and self._cache_size > 0 else None
+        if key is not None:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+            if cached is not None:
+                return go.Figure(cached)
+
         fig = plotter.plot(df, config)
 
         # Apply add-on pipeline
         for addon in self._addons:
-            fig = addon.apply(fig, config)
-
+            if addon.applies_to(config):
+                fig = addon.apply(fig, config)
+
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = go.Figure(fig)
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
         return fig
 
     def list_plotters(self) -> list[str]:
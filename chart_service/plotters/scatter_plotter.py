@@ -5,9 +5,9 @@ Scatter chart plotter using Plotly Express.
 from __future__ import annotations
 
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 
+from chart_service.chart_types.base import split_columns
 from chart_service.models import ChartConfig
 from chart_service.plotters.base import BasePlotter
 
@@ -18,13 +18,12 @@ class ScatterPlotter(BasePlotter):
     chart_type = "scatter"
 
     def plot(self, df: pd.DataFrame, config: ChartConfig) -> go.Figure:
-        x_col = config.x_column or df.columns[0]
-        y_cols = config.y_columns or [
-            c for c in df.select_dtypes(include="number").columns if c != x_col
-        ]
+        px = self._px()
+
+        x_col, y_cols = self._resolve_xy(df, config)
 
         if not y_cols:
-            numeric = list(df.select_dtypes(include="number").columns)
+            numeric = split_columns(df)[0]
             if len(numeric) >= 2:
                 x_col = numeric[0]
                 y_cols = [numeric[1]]
@@ -30,10 +30,12 @@ class AppConfig:
     openai_api_key: str = ""
     llm_model: str = "gpt-4o-mini"
     vision_model: str = "gpt-4o"
+    llm_cache_path: str = ""  # SQLite file for LLM responses shared across workers; empty = in-process only
 
     # API
     api_keys: list[str] = field(default_factory=list)
     rate_limit: str = "60/minute"
+    redis_url: str = ""  # Shared rate-limit storage across workers; empty = in-process memory
     api_host: str = "0.0.0.0"
     api_port: int = 8000
 
@@ -63,8 +65,10 @@ class AppConfig:
             openai_api_key=os.environ.get("OPENAI_API_KEY", ""),
             llm_model=os.environ.get("LLM_MODEL", "gpt-4o-mini"),
             vision_model=os.environ.get("VISION_MODEL", "gpt-4o"),
+            llm_cache_path=os.environ.get("LLM_CACHE_PATH", ""),
             api_keys=api_keys,
             rate_limit=os.environ.get("RATE_LIMIT", "60/minute"),
+            redis_url=os.environ.get("REDIS_URL", ""),
             api_host=os.environ.get("API_HOST", "0.0.0.0"),
             api_port=int(os.environ.get("API_PORT", "8000")),
             ui_host=os.environ.get("UI_HOST", "0.0.0.0"),
@@ -174,7 +174,8 @@ def main():
 
                     from chart_service.plotters import plotter_registry
 
-                    fig = plotter_registry.plot(parsed.dataframe, config_obj)
+                    # Reruns re-plot the same upload and options: reuse the figure
+                    fig = plotter_registry.plot(parsed.dataframe, config_obj, memoize=True)
 
                     chart_id = EmbedExporter.store_chart(fig)
 
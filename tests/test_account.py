@@ -1,7 +1,7 @@
 """
 Tests for account routes: register, login, me, keys, usage.
 Uses temp saas.db for isolation.
-Requires bcrypt (pip install bcrypt or passlib[bcrypt]).
+Requires bcrypt (pip install bcrypt).
 """
 
 from __future__ import annotations
@@ -197,6 +197,50 @@ class TestAccountKeys:
         ids = [k["id"] for k in list_resp.json()["keys"]]
         assert key_id not in ids
 
+    def test_revoked_key_no_longer_authenticates(self, client):
+        from api.saas.repository import get_tenant_by_key
+
+        token = self._get_token(client)
+        create = client.post(
+            "/v1/account/keys",
+            json={"name": "Cached Key"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        raw_key, key_id = create.json()["key"], create.json()["id"]
+        assert get_tenant_by_key(raw_key) is not None  # Populates the lookup cache
+        client.delete(
+            f"/v1/account/keys/{key_id}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert get_tenant_by_key(raw_key) is None
+
+    def test_key_prefix_widened_and_legacy_prefix_still_resolves(self, client, temp_saas_db):
+        import sqlite3
+
+        from api.saas.repository import _hash_key, create_api_key, create_tenant, get_tenant_by_key
+
+        tenant = create_tenant("Prefix Tenant", "prefix@test.com", "x")
+        raw_key, info = create_api_key(tenant.id, "New")
+        assert info.key_prefix == raw_key[:12]
+        assert get_tenant_by_key(raw_key).tenant.id == tenant.id
+
+        legacy_key = "legacykey-0123456789abcdef"
+        with sqlite3.connect(temp_saas_db) as conn:
+            conn.execute(
+                "INSERT INTO api_keys (tenant_id, key_hash, key_prefix, name, created_at) VALUES (?, ?, ?, ?, ?)",
+                (tenant.id, _hash_key(legacy_key), legacy_key[:8], "Legacy", "2024-01-01T00:00:00+00:00"),
+            )
+        assert get_tenant_by_key(legacy_key).tenant.id == tenant.id
+
+    def test_plans_served_from_memory(self, client):
+        from api.saas import repository
+
+        repository.invalidate_plans()
+        assert repository.get_plan(1).name == "free"
+        with patch("api.saas.repository._conn_for_thread", side_effect=AssertionError("no SQL")):
+            assert repository.get_plan(2).name == "pro"
+            assert repository.get_plan(999) is None
+
 
 class TestAccountUsage:
     def test_usage_returns_period_and_count(self, client):
@@ -44,6 +44,13 @@ class TestColorPaletteAddon:
         result = addon.apply(sample_fig, config)
         assert result is sample_fig
 
+    def test_colors_stop_at_palette_length(self):
+        fig = go.Figure([go.Bar(y=[1]), go.Scatter(y=[2]), go.Bar(y=[3])])
+        config = ChartConfig(chart_type="bar", color_palette=["#111111", "#222222"])
+        result = ColorPaletteAddon().apply(fig, config)
+        assert [t.marker.color for t in result.data] == ["#111111", "#222222", None]
+        assert result.data[1].line.color == "#222222"
+
     def test_palettes_defined(self):
         assert "vibrant" in PALETTES
         assert "pastel" in PALETTES
@@ -94,6 +101,18 @@ class TestCustomLinesAddon:
         )
         result = addon.apply(sample_fig, config)
         assert isinstance(result, go.Figure)
+        assert [shape.y0 for shape in result.layout.shapes] == [10, 25]
+        assert result.layout.shapes[1].line.color == "green"
+
+    def test_lines_keep_existing_shapes_and_labels(self, sample_fig):
+        sample_fig.add_hline(y=5, annotation_text="Existing")
+        config = ChartConfig(
+            chart_type="bar",
+            reference_lines=[{"orientation": "h", "value": 12, "label": "Target"}],
+        )
+        result = CustomLinesAddon().apply(sample_fig, config)
+        assert len(result.layout.shapes) == 2
+        assert [a.text for a in result.layout.annotations] == ["Existing", "Target"]
 
     def test_line_without_value_skipped(self, sample_fig):
         addon = CustomLinesAddon()
@@ -129,6 +148,14 @@ class TestLayoutAddon:
         result = addon.apply(sample_fig, config)
         assert result.layout.font.family is not None
 
+    def test_applies_to_skips_addons_without_options(self):
+        config = ChartConfig(chart_type="bar")
+        assert not ColorPaletteAddon().applies_to(config)
+        assert not CustomLinesAddon().applies_to(config)
+        assert LayoutAddon().applies_to(config)
+        config.reference_lines = [{"orientation": "h", "value": 1}]
+        assert CustomLinesAddon().applies_to(config)
+
     def test_addon_order(self):
         """Verify add-ons have correct ordering."""
         assert ColorPaletteAddon().order < CustomLinesAddon().order
@@ -1,7 +1,7 @@
 """
 Tests for admin routes: tenants, keys, usage.
 Uses temp saas.db and patched admin credentials.
-Requires bcrypt (pip install bcrypt or passlib[bcrypt]).
+Requires bcrypt (pip install bcrypt).
 """
 
 from __future__ import annotations
@@ -92,10 +92,98 @@ class TestAdminTenants:
         assert len(tenants) == 1
         assert tenants[0]["email"] == "tenant@admin.test"
 
+    def test_list_tenants_search_filters_server_side(self, client):
+        from api.saas.repository import create_tenant
+
+        create_tenant("Acme Corp", "ops@acme.test", "x")
+        create_tenant("Globex", "admin@globex.test", "x")
+        create_tenant("100% Real", "real@percent.test", "x")
+        resp = client.get("/admin/v1/tenants", params={"q": "ACME"}, headers=client.admin_headers)
+        assert resp.status_code == 200
+        assert [t["name"] for t in resp.json()["tenants"]] == ["Acme Corp"]
+        resp = client.get("/admin/v1/tenants", params={"q": "globex.test"}, headers=client.admin_headers)
+        assert [t["name"] for t in resp.json()["tenants"]] == ["Globex"]
+        resp = client.get("/admin/v1/tenants", params={"q": "%"}, headers=client.admin_headers)
+        assert [t["name"] for t in resp.json()["tenants"]] == ["100% Real"]
+
+    def test_list_tenants_include_keys_and_usage(self, client):
+        from api.saas.repository import create_api_key, create_tenant
+
+        tenant = create_tenant("Batch Tenant", "batch@admin.test", "x")
+        create_api_key(tenant.id, "Batch Key")
+        resp = client.get(
+            "/admin/v1/tenants",
+            params={"include": "keys,usage"},
+            headers=client.admin_headers,
+        )
+        assert resp.status_code == 200
+        [t] = resp.json()["tenants"]
+        assert [k["name"] for k in t["keys"]] == ["Batch Key"]
+        assert "request_count" in t["usage"]["current"]
+        assert isinstance(t["usage"]["history"], list)
+
+    def test_list_tenants_paginates_with_cursor(self, client):
+        from api.saas.repository import create_tenant
+
+        for i in range(5):
+            create_tenant(f"Page {i}", f"page{i}@admin.test", "x")
+        resp = client.get("/admin/v1/tenants", params={"limit": 2}, headers=client.admin_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [t["name"] for t in data["tenants"]] == ["Page 4", "Page 3"]
+        assert 'rel="next"' in resp.headers["link"]
+        assert f"after={data['next_cursor']}" in resp.headers["link"]
+
+        names = [t["name"] for t in data["tenants"]]
+        while data["next_cursor"] is not None:
+            resp = client.get(
+                "/admin/v1/tenants",
+                params={"limit": 2, "after": data["next_cursor"]},
+                headers=client.admin_headers,
+            )
+            data = resp.json()
+            names += [t["name"] for t in data["tenants"]]
+        assert names == [f"Page {i}" for i in range(4, -1, -1)]
+        assert "link" not in resp.headers
+
+    def test_list_tenant_usage_single_query(self, client, tmp_path):
+        from api.saas.repository import create_tenant
+        from api.usage import UsageTracker
+
+        busy = create_tenant("Busy", "busy@admin.test", "x")
+        create_tenant("Idle", "idle@admin.test", "x")
+        tracker = UsageTracker(db_path=str(tmp_path / "usage.db"))
+        for _ in range(3):
+            tracker.record_for_tenant(busy.id)
+        with patch("api.routers.admin.usage_tracker", tracker):
+            resp = client.get("/admin/v1/usage/tenants", headers=client.admin_headers)
+            assert resp.status_code == 200
+            data = resp.json()
+            assert {t["name"]: t["request_count"] for t in data["tenants"]} == {"Busy": 3, "Idle": 0}
+            resp = client.get(
+                "/admin/v1/usage/tenants",
+                params={"period": "2000-01", "limit": 1},
+                headers=client.admin_headers,
+            )
+            assert [t["request_count"] for t in resp.json()["tenants"]] == [0]
+            assert resp.json()["next_cursor"] is not None
+        # The usage DB is detached again: plain writes still work
+        create_tenant("After", "after@admin.test", "x")
+
     def test_list_tenants_unauthorized(self, client):
         resp = client.get("/admin/v1/tenants")
         assert resp.status_code == 401
 
+    def test_bearer_auth_and_cached_credentials(self, client):
+        ok = {"Authorization": "Bearer admin:admin123"}
+        assert client.get("/admin/v1/tenants", headers=ok).status_code == 200
+        assert client.get("/admin/v1/tenants", headers=ok).status_code == 200  # Cached
+        bad = {"Authorization": "Bearer admin:wrong"}
+        assert client.get("/admin/v1/tenants", headers=bad).status_code == 401
+        # A password change must not be masked by the cache
+        with patch("config.config.admin_password", "rotated"):
+            assert client.get("/admin/v1/tenants", headers=ok).status_code == 401
+
     def test_get_tenant_detail(self, client):
         tenant_id = _create_tenant_via_register(client)
         resp = client.get(
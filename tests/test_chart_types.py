@@ -57,6 +57,28 @@ class TestInferBestType:
         result = chart_type_registry.infer_best_type(df)
         assert result == "line"
 
+    def test_falls_back_when_preferred_type_unregistered(self):
+        from chart_service.chart_types.registry import ChartTypeRegistry
+
+        registry = ChartTypeRegistry()
+        registry.register(LineChartType())
+        df = pd.DataFrame({"Category": ["A", "B", "C"], "Value": [10, 20, 30]})
+        assert registry.infer_best_type(df) == "line"  # No pie/bar: first registered
+        registry.register(BarChartType())
+        assert registry.infer_best_type(df) == "bar"
+
+    def test_datetime_probe_only_parses_a_sample(self):
+        from unittest.mock import patch
+
+        from chart_service.chart_types.registry import ChartTypeRegistry
+
+        dates = pd.Series(["2025-01-01"] * 1000 + [None])
+        with patch("chart_service.chart_types.registry.pd.to_datetime", wraps=pd.to_datetime) as to_dt:
+            assert ChartTypeRegistry._is_datetime_like(dates) is True
+        assert len(to_dt.call_args[0][0]) == 20
+        assert ChartTypeRegistry._is_datetime_like(pd.Series([20250101, 20250102])) is False
+        assert ChartTypeRegistry._is_datetime_like(pd.Series(["a", "b"])) is False
+
 
 class TestChartTypeDefaultConfig:
     def test_bar_default_config(self):
@@ -78,3 +100,20 @@ class TestChartTypeDefaultConfig:
         assert config.chart_type == "pie"
         assert config.x_column == "Fruit"
         assert "Count" in config.y_columns
+
+
+def test_split_columns_matches_select_dtypes():
+    from chart_service.chart_types.base import split_columns
+
+    df = pd.DataFrame({
+        "i": [1, 2],
+        "f": [1.5, 2.5],
+        "nullable": pd.array([1, None], dtype="Int64"),
+        "td": pd.to_timedelta([1, 2], unit="s"),
+        "flag": [True, False],
+        "s": ["a", "b"],
+        "d": pd.to_datetime(["2025-01-01", "2025-01-02"]),
+    })
+    numeric, other = split_columns(df)
+    assert numeric == list(df.select_dtypes(include="number").columns)
+    assert other == list(df.select_dtypes(exclude="number").columns)
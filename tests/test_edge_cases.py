@@ -110,6 +110,19 @@ class TestExcelParserEdgeCases:
         assert df["Sales"].iloc[0] == 100
 
 
+    def test_parse_sheets_skips_empty_sheets(self):
+        buf = io.BytesIO()
+        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+            pd.DataFrame({"A": [1, 2]}).to_excel(writer, sheet_name="First", index=False)
+            pd.DataFrame().to_excel(writer, sheet_name="Blank", index=False)
+            pd.DataFrame({"B": ["x"]}).to_excel(writer, sheet_name="Third", index=False)
+
+        sheets = ExcelParser().parse_sheets(buf.getvalue())
+        assert list(sheets) == ["First", "Third"]
+        assert sheets["First"]["A"].tolist() == [1, 2]
+        assert list(ExcelParser().parse_sheets(buf.getvalue(), ["Third"])) == ["Third"]
+
+
 class TestParserRegistryEdgeCases:
     def test_image_parser_registered(self):
         assert "image" in parser_registry.list_parsers()
@@ -219,6 +219,36 @@ class TestTryOCR:
         result = parser._try_ocr(PNG_HEADER)
         assert result is None
 
+    def test_table_from_ocr_words(self, parser):
+        # (line, left, top, text): "Work Points" is one cell; week 2 has no value
+        boxes = [
+            (1, 10, 5, "Week"), (1, 200, 5, "Work"), (1, 250, 5, "Points"),
+            (2, 10, 30, "1"), (2, 220, 30, "40"),
+            (3, 10, 55, "2"),
+            (4, 10, 80, "3"), (4, 225, 80, "35"),
+        ]
+        words = pd.DataFrame({
+            "block_num": 1, "par_num": 1,
+            "line_num": [b[0] for b in boxes],
+            "left": [b[1] for b in boxes],
+            "top": [b[2] for b in boxes],
+            "width": [10 * len(b[3]) for b in boxes],
+            "height": 12,
+            "conf": 90,
+            "text": [b[3] for b in boxes],
+        })
+        df = parser._table_from_ocr_words(words)
+        assert list(df.columns) == ["Week", "Work Points"]
+        assert df["Work Points"].iloc[[0, 2]].tolist() == ["40", "35"]
+        assert pd.isna(df["Work Points"].iloc[1])
+
+    def test_prepare_for_ocr_downscales_to_grayscale(self, parser):
+        from PIL import Image
+
+        img = parser._prepare_for_ocr(Image.new("RGB", (4000, 1000), "white"))
+        assert img.mode == "L"
+        assert img.size == (2000, 500)
+
 
 class TestImageParserWithFixtureImage:
     """Test image parser using the attached mock_data image (Week / Work Points table)."""
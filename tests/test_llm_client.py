@@ -30,6 +30,41 @@ class TestLLMClientAvailability:
         client = LLMClient(api_key="")
         assert client.is_available is False
 
+    def test_key_resolved_once_until_refresh(self):
+        with patch("chart_service.llm.client._get_api_key", return_value="sk-one") as resolve:
+            client = LLMClient(api_key=None)
+            assert client.is_available and client.is_available
+            assert resolve.call_count == 1
+        with patch("chart_service.llm.client._get_api_key", return_value="sk-two"):
+            client._client = MagicMock()
+            client.refresh()
+        assert client.api_key == "sk-two"
+        assert client._client is None  # Rebuilt with the new key on next use
+
+    def test_clients_share_one_connection_pool(self):
+        a = LLMClient(api_key="sk-a")._get_client()
+        b = LLMClient(api_key="sk-b")._get_client()
+        assert a is not b
+        assert a._client is b._client  # Same httpx.Client underneath
+        assert a.max_retries == 5
+
+    def test_concurrent_get_client_builds_one_client(self):
+        import threading
+        import time
+
+        def slow_openai(**kwargs):
+            time.sleep(0.05)
+            return MagicMock()
+
+        client = LLMClient(api_key="sk-test")
+        with patch("chart_service.llm.client.OpenAI", side_effect=slow_openai) as openai_cls:
+            threads = [threading.Thread(target=client._get_client) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert openai_cls.call_count == 1
+
     def test_custom_models(self):
         client = LLMClient(api_key="key", model="gpt-4", vision_model="gpt-4-vision")
         assert client.model == "gpt-4"
@@ -158,6 +193,15 @@ class TestInferChartConfig:
         assert result is None
 
 
+    def test_prompt_summarizes_instead_of_listing_rows(self):
+        client = LLMClient(api_key="sk-test", cache_path="")
+        df = pd.DataFrame({"Category": [f"C{i % 3}" for i in range(200)], "Value": range(200)})
+        prompt = client._chart_config_request(df)["messages"][1]["content"]
+        assert '"distinct":3' in prompt
+        assert '"min":0,"max":199' in prompt
+        assert "C0" in prompt and "150" not in prompt  # Only the first rows are sent verbatim
+
+
 class TestExtractTableFromImage:
     def test_returns_none_when_unavailable(self):
         client = LLMClient(api_key="")
@@ -206,3 +250,182 @@ class TestExtractTableFromImage:
 
         result = client.extract_table_from_image(b"fake-image-bytes")
         assert result is None
+
+
+class TestAsyncInference:
+    def test_ainfer_chart_configs_keeps_order(self):
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        client = LLMClient(api_key="sk-test")
+
+        def response_for(**kwargs):
+            # Echo the first column back so each result identifies its dataframe
+            first_col = kwargs["messages"][1]["content"].split("['")[1].split("'")[0]
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = json.dumps(
+                {"chart_type": "bar", "x_column": first_col, "y_columns": []}
+            )
+            return response
+
+        mock_openai = MagicMock()
+        mock_openai.chat.completions.create = AsyncMock(side_effect=response_for)
+        dfs = [pd.DataFrame({name: [1, 2]}) for name in ("A", "B", "C")]
+        with patch.object(client, "_get_async_client", return_value=mock_openai):
+            results = asyncio.run(client.ainfer_chart_configs(dfs, max_concurrency=2))
+        assert [r.x_column for r in results] == ["A", "B", "C"]
+        assert mock_openai.chat.completions.create.await_count == 3
+
+    def test_aextract_table_error_returns_none(self):
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        client = LLMClient(api_key="sk-test")
+        mock_openai = MagicMock()
+        mock_openai.chat.completions.create = AsyncMock(side_effect=Exception("Vision API error"))
+        with patch.object(client, "_get_async_client", return_value=mock_openai):
+            assert asyncio.run(client.aextract_table_from_image(b"fake-image-bytes")) is None
+
+    def test_async_client_is_per_event_loop(self):
+        import asyncio
+
+        pytest.importorskip("openai")
+        client = LLMClient(api_key="sk-test")
+
+        async def get_twice():
+            return client._get_async_client(), client._get_async_client()
+
+        first_a, first_b = asyncio.run(get_twice())
+        second, _ = asyncio.run(get_twice())
+        assert first_a is first_b
+        # A later asyncio.run() must not reuse connections bound to the closed loop
+        assert second is not first_a
+        assert second._client is not first_a._client
+
+
+class TestResponseCache:
+    @staticmethod
+    def _mock_openai(content: dict) -> MagicMock:
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = json.dumps(content)
+        mock_openai = MagicMock()
+        mock_openai.chat.completions.create.return_value = mock_response
+        return mock_openai
+
+    def test_repeated_inference_hits_cache(self):
+        client = LLMClient(api_key="sk-test", cache_path="")
+        client._client = self._mock_openai({"chart_type": "bar", "x_column": "A", "y_columns": ["B"]})
+        df = pd.DataFrame({"A": ["x", "y"], "B": [3, 4]})
+
+        assert client.infer_chart_config(df).chart_type == "bar"
+        assert client.infer_chart_config(df).chart_type == "bar"
+        assert client._client.chat.completions.create.call_count == 1
+
+        client.infer_chart_config(df, bypass_cache=True)
+        assert client._client.chat.completions.create.call_count == 2
+
+    def test_invalid_answers_are_not_cached(self):
+        client = LLMClient(api_key="sk-test", cache_path="")
+        client._client = self._mock_openai({"data": "no columns key"})
+
+        assert client.extract_table_from_image(b"img") is None
+        assert client.extract_table_from_image(b"img") is None
+        assert client._client.chat.completions.create.call_count == 2
+
+    def test_disk_cache_shared_between_clients(self, tmp_path):
+        path = str(tmp_path / "llm_cache.db")
+        first = LLMClient(api_key="sk-test", cache_path=path)
+        first._client = self._mock_openai({"columns": ["A"], "rows": [[1]]})
+        assert first.extract_table_from_image(b"img")["columns"] == ["A"]
+
+        second = LLMClient(api_key="sk-test", cache_path=path)
+        second._client = self._mock_openai({"columns": ["other"], "rows": []})
+        assert second.extract_table_from_image(b"img")["columns"] == ["A"]
+        second._client.chat.completions.create.assert_not_called()
+
+
+class TestShrinkImage:
+    def test_large_image_is_downscaled(self):
+        import os
+        from io import BytesIO
+
+        from PIL import Image
+
+        from chart_service.llm.client import _VISION_MAX_EDGE, _shrink_image
+
+        img = Image.frombytes("RGB", (3000, 1000), os.urandom(3000 * 1000 * 3))
+        buf = BytesIO()
+        img.save(buf, format="PNG")
+        shrunk, mime = _shrink_image(buf.getvalue(), "image/png")
+        assert len(shrunk) < len(buf.getvalue())
+        assert max(Image.open(BytesIO(shrunk)).size) == _VISION_MAX_EDGE
+        assert mime == "image/jpeg"  # Noise doesn't compress as PNG
+
+    def test_small_or_undecodable_image_unchanged(self):
+        from io import BytesIO
+
+        from PIL import Image
+
+        from chart_service.llm.client import _shrink_image
+
+        buf = BytesIO()
+        Image.new("RGB", (100, 50), "white").save(buf, format="PNG")
+        assert _shrink_image(buf.getvalue(), "image/png") == (buf.getvalue(), "image/png")
+        assert _shrink_image(b"fake-image-bytes", "image/png") == (b"fake-image-bytes", "image/png")
+
+
+class TestBatchInference:
+    def test_batch_results_follow_input_order(self):
+        client = LLMClient(api_key="sk-test", cache_path="")
+        mock_openai = MagicMock()
+        mock_openai.files.create.return_value = MagicMock(id="file-in")
+        mock_openai.batches.create.return_value = MagicMock(id="batch-1", status="in_progress")
+        mock_openai.batches.retrieve.return_value = MagicMock(
+            id="batch-1", status="completed", output_file_id="file-out"
+        )
+
+        def line(custom_id, content):
+            body = {"choices": [{"message": {"content": json.dumps(content)}}]}
+            return json.dumps({"custom_id": custom_id, "response": {"status_code": 200, "body": body}})
+
+        # Output order differs from input order; the second request's answer is invalid
+        mock_openai.files.content.return_value = MagicMock(text="\n".join([
+            line("1", {"chart_type": "bar", "x_column": "Missing", "y_columns": []}),
+            line("0", {"chart_type": "line", "x_column": "A", "y_columns": ["B"]}),
+        ]))
+        client._client = mock_openai
+
+        dfs = [pd.DataFrame({"A": [1], "B": [2]}), pd.DataFrame({"C": [1]})]
+        results = client.infer_chart_config_batch(dfs, poll_interval=0)
+        assert results[0].chart_type == "line"
+        assert results[1] is None
+        uploaded = mock_openai.files.create.call_args.kwargs["file"][1].decode().splitlines()
+        assert [json.loads(entry)["custom_id"] for entry in uploaded] == ["0", "1"]
+
+
+class TestPackedInference:
+    def test_packs_requests_and_falls_back_for_missing_answers(self):
+        client = LLMClient(api_key="sk-test", cache_path="")
+
+        def respond(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            if '"id":0' in prompt:  # Packed request for datasets 0 and 1; answers only 0
+                content = {"results": [{"id": 0, "chart_type": "bar", "x_column": "A", "y_columns": ["B"]}]}
+            else:  # Single-dataset fallback request
+                content = {"chart_type": "pie", "x_column": "A", "y_columns": ["B"]}
+            response.choices[0].message.content = json.dumps(content)
+            return response
+
+        mock_openai = MagicMock()
+        mock_openai.chat.completions.create.side_effect = respond
+        client._client = mock_openai
+
+        dfs = [pd.DataFrame({"A": ["x", "y"], "B": [i, i + 1]}) for i in range(3)]
+        results = client.infer_chart_configs(dfs, per_request=2)
+        assert [r.chart_type for r in results] == ["bar", "pie", "pie"]
+        # Packed [0, 1], packed [2], then single fallbacks for 1 and 2
+        assert mock_openai.chat.completions.create.call_count == 4
@@ -73,6 +73,15 @@ class TestChartConfig:
         assert restored.title == original.title
         assert restored.template == original.template
 
+    def test_to_dict_covers_every_field_and_pickles(self):
+        import dataclasses
+        import pickle
+
+        config = ChartConfig(chart_type="pie", annotations=[{"text": "peak"}])
+        assert config.to_dict() == dataclasses.asdict(config)
+        assert not hasattr(config, "__dict__")
+        assert pickle.loads(pickle.dumps(config)) == config
+
 
 class TestParsedData:
     def test_basic_properties(self):
@@ -104,3 +113,10 @@ class TestParsedData:
         df = pd.DataFrame({"A": [1]})
         parsed = ParsedData(dataframe=df)
         assert parsed.source_type == "unknown"
+
+    def test_column_split_follows_dataframe_reassignment(self):
+        parsed = ParsedData(dataframe=pd.DataFrame({"Name": ["A"], "Value": [1]}))
+        assert parsed.numeric_columns == ["Value"]
+        parsed.dataframe = pd.DataFrame({"Label": ["x"], "Count": [2], "Share": [0.5]})
+        assert parsed.numeric_columns == ["Count", "Share"]
+        assert parsed.categorical_columns == ["Label"]
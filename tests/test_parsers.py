@@ -27,6 +27,22 @@ class TestTextParser:
         assert df.shape == (2, 2)
         assert "City" in df.columns
 
+    def test_parse_semicolon_pipe_and_space_separated(self):
+        parser = TextParser()
+        assert list(parser.parse("A;B\n1;2\n3;4").columns) == ["A", "B"]
+        assert parser.parse("A | B\n1 | 2")["B"].iloc[0] == 2
+        df = parser.parse("Name Score\nAlice 85\nBob 92")
+        assert df.shape == (2, 2)
+        assert df["Score"].tolist() == [85, 92]
+
+    def test_parse_bytes_and_surrounding_blank_lines(self):
+        parser = TextParser()
+        df = parser.parse("\n\nCity;Temp\nMünchen;20\n   \n".encode())
+        assert df.shape == (1, 2)
+        assert df["City"].iloc[0] == "München"
+        with pytest.raises(ValueError, match="Empty text input"):
+            parser.parse(b" \n\t")
+
     def test_parse_empty_raises(self):
         parser = TextParser()
         with pytest.raises(ValueError, match="Empty text input"):
@@ -56,6 +72,36 @@ class TestCSVParser:
         assert df.shape == (2, 2)
         assert df["X"].iloc[0] == 10
 
+    def test_parse_csv_file_object_with_latin1_fallback(self):
+        from io import BytesIO
+
+        stream = BytesIO("City,Temp\nMünchen,20\nZürich,18".encode("latin-1"))
+        df = CSVParser().parse(stream, filename="temps.csv")
+        assert df.shape == (2, 2)
+        assert df["City"].iloc[0] == "München"
+
+    def test_parse_csv_bytes_latin1_and_dates(self):
+        csv_bytes = "Day,City\n2024-01-01,München\n2024-01-02,Zürich".encode("latin-1")
+        df = CSVParser().parse(csv_bytes)
+        assert df["City"].iloc[0] == "München"
+        assert pd.to_datetime(df["Day"]).iloc[1] == pd.Timestamp("2024-01-02")
+
+    def test_parse_csv_preview_rows(self):
+        from io import BytesIO
+
+        rows = "\n".join(["A,B"] + [f"{i},{i * 2}" for i in range(500)]).encode()
+        assert CSVParser().parse(rows, nrows=50).shape == (50, 2)
+        assert CSVParser().parse(BytesIO(rows), nrows=5)["B"].tolist() == [0, 2, 4, 6, 8]
+
+    def test_parse_csv_ragged_rows_falls_back_to_c_engine(self):
+        df = CSVParser().parse(b"A,B\n1,2,3\n4,5,6")
+        assert df.shape == (2, 2)
+
+    def test_can_handle_uses_precomputed_extension(self):
+        parser = CSVParser()
+        assert parser.can_handle(b"data", filename="export", ext=".csv") is True
+        assert TextParser().can_handle("text", filename="report.CSV", ext=".csv") is False
+
     def test_can_handle_by_extension(self):
         parser = CSVParser()
         assert parser.can_handle(b"data", filename="test.csv") is True
@@ -63,6 +109,28 @@ class TestCSVParser:
         assert parser.can_handle(b"data") is False
 
 
+class TestCoerceNumeric:
+    def test_converts_numeric_text_and_keeps_other_columns(self):
+        from chart_service.parsers.base import coerce_numeric
+
+        df = pd.DataFrame({
+            "n": pd.Series(["1", "2"], dtype=object),
+            "label": ["a", "b"],
+            "when": pd.to_datetime(["2024-01-01", "2024-02-01"]),
+        })
+        coerce_numeric(df)
+        assert pd.api.types.is_integer_dtype(df["n"])
+        assert not pd.api.types.is_numeric_dtype(df["label"])
+        assert pd.api.types.is_datetime64_any_dtype(df["when"])
+
+    def test_duplicate_column_names(self):
+        from chart_service.parsers.base import coerce_numeric
+
+        df = pd.DataFrame([["1", "x"]], columns=["a", "a"])
+        coerce_numeric(df)
+        assert pd.api.types.is_integer_dtype(df.dtypes.iloc[0])
+
+
 class TestParserRegistry:
     def test_get_parser_for_text(self):
         parser = parser_registry.get_parser_for("Name\tValue\nA\t1")
@@ -76,6 +144,15 @@ class TestParserRegistry:
         parser = parser_registry.get_parser_for(b"binary", filename="data.xlsx")
         assert isinstance(parser, ExcelParser)
 
+    def test_extension_lookup_is_case_insensitive(self):
+        assert isinstance(parser_registry.get_parser_for(b"binary", filename="Q3.XLSX"), ExcelParser)
+        assert isinstance(parser_registry.get_parser_for("A\tB\n1\t2", filename="notes.txt"), TextParser)
+
+    def test_unknown_extension_falls_back_to_content(self):
+        assert isinstance(parser_registry.get_parser_for("A,B\n1,2", filename="data.dat"), TextParser)
+        with pytest.raises(ValueError, match="No parser found"):
+            parser_registry.get_parser_for(b"A,B\n1,2", filename="data.dat")
+
     def test_no_parser_found(self):
         with pytest.raises(ValueError, match="No parser found"):
             parser_registry.get_parser_for(b"random bytes")
@@ -26,6 +26,37 @@ class TestPlotterRegistry:
         with pytest.raises(KeyError, match="No plotter"):
             plotter_registry.get_plotter("nonexistent")
 
+    def test_repeated_plot_returns_independent_copy(self):
+        df = pd.DataFrame({"Cat": ["A", "B"], "Val": [1, 2]})
+        config = ChartConfig(chart_type="bar", x_column="Cat", y_columns=["Val"], title="Memo")
+        first = plotter_registry.plot(df, config, memoize=True)
+        first.update_layout(title_text="changed by caller")
+        second = plotter_registry.plot(df, config, memoize=True)
+        assert second is not first
+        assert second.layout.title.text == "Memo"
+
+    def test_default_y_columns_are_the_other_numeric_columns(self):
+        df = pd.DataFrame({"Month": ["Jan", "Feb"], "Sales": [1, 2], "Region": ["N", "S"], "Cost": [0.5, 1.5]})
+        plotter = plotter_registry.get_plotter("line")
+        assert plotter._resolve_xy(df, ChartConfig(chart_type="line")) == ("Month", ["Sales", "Cost"])
+        config = ChartConfig(chart_type="line", x_column="Sales", y_columns=["Cost"])
+        assert plotter._resolve_xy(df, config) == ("Sales", ["Cost"])
+
+    def test_changed_data_is_replotted(self):
+        config = ChartConfig(chart_type="bar", x_column="Cat", y_columns=["Val"])
+        plotter_registry.plot(pd.DataFrame({"Cat": ["A"], "Val": [1]}), config, memoize=True)
+        fig = plotter_registry.plot(pd.DataFrame({"Cat": ["A"], "Val": [5]}), config, memoize=True)
+        assert list(fig.data[0].y) == [5]
+
+    def test_plot_is_not_memoized_by_default(self):
+        from chart_service.plotters import PlotterRegistry, LinePlotter
+
+        registry = PlotterRegistry()
+        registry.register_plotter(LinePlotter())
+        df = pd.DataFrame({"X": [1, 2], "Y": [3, 4]})
+        registry.plot(df, ChartConfig(chart_type="line"))
+        assert not registry._cache
+
 
 class TestLinePlotter:
     def test_plot_single_y(self):
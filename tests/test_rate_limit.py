@@ -27,7 +27,10 @@ class TestRateLimitKeyExtraction:
             "headers": {"X-API-Key": "my-key-123"},
             "client": type("C", (), {"host": "127.0.0.1"})(),
         })()
-        assert _get_api_key_or_ip(mock_request) == "key:my-key-123"
+        result = _get_api_key_or_ip(mock_request)
+        assert result.startswith("key:")
+        assert "my-key-123" not in result  # Raw key is hashed
+        assert result == _get_api_key_or_ip(mock_request)  # Stable per key
 
     def test_ip_used_when_no_key(self):
         from api.middleware.rate_limit import _get_api_key_or_ip
@@ -49,6 +52,14 @@ class TestRateLimitConfig:
         assert "/" in DEFAULT_RATE_LIMIT
         assert isinstance(DEFAULT_RATE_LIMIT, str)
 
+    def test_storage_defaults_to_memory(self):
+        from api.middleware.rate_limit import _get_storage_uri
+
+        with patch("config.config.redis_url", ""):
+            assert _get_storage_uri() == "memory://"
+        with patch("config.config.redis_url", "redis://localhost:6379/0"):
+            assert _get_storage_uri() == "redis://localhost:6379/0"
+
     def test_limiter_exists(self):
         from api.middleware.rate_limit import limiter
         assert limiter is not None
@@ -83,3 +94,110 @@ class TestRateLimitEnforcement:
         for _ in range(20):
             resp = client.get("/health")
             assert resp.status_code == 200
+
+
+class TestTokenBucket:
+    def test_parse_rate_limits(self):
+        from api.middleware.token_bucket import parse_rate_limits
+
+        assert parse_rate_limits("60/minute") == ((1.0, 60.0),)
+        assert parse_rate_limits("10 per second") == ((10.0, 10.0),)
+        assert parse_rate_limits("100/2 hours") == ((100 / 7200, 100.0),)
+        with pytest.raises(ValueError):
+            parse_rate_limits("lots")
+
+    def test_parse_multi_limit_specs(self):
+        from api.middleware.token_bucket import parse_rate_limits
+
+        assert parse_rate_limits("120/minute;1000/hour") == ((2.0, 120.0), (1000 / 3600, 1000.0))
+        assert parse_rate_limits("120 per minute, 1000 per hour") == parse_rate_limits("120/minute;1000/hour")
+
+    def test_multi_limit_spec_enforces_every_limit(self):
+        from api.main import app
+        from api.middleware import rate_limit
+
+        client = TestClient(app)
+        spec = "100/minute;2/hour"
+        with patch("config.config.rate_limit", spec):
+            rate_limit._buckets.pop(spec, None)
+            codes = [
+                client.post("/v1/charts", data={"data": "A,B\n1,2", "chart_type": "bar"}).status_code
+                for _ in range(3)
+            ]
+            rate_limit._buckets.pop(spec, None)
+        assert codes == [200, 200, 429]
+
+    def test_burst_then_refill(self):
+        from api.middleware.token_bucket import TokenBucket
+
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        with patch("api.middleware.token_bucket.time.monotonic", return_value=100.0):
+            assert bucket.try_consume("a") is True
+            assert bucket.try_consume("a") is True
+            assert bucket.try_consume("a") is False
+            assert bucket.try_consume("b") is True  # Keys are independent
+            assert bucket.retry_after("a") == pytest.approx(1.0)
+        with patch("api.middleware.token_bucket.time.monotonic", return_value=101.0):
+            assert bucket.try_consume("a") is True
+
+    def test_evicts_least_recently_used_key_past_max_keys(self):
+        from api.middleware.token_bucket import TokenBucket
+
+        bucket = TokenBucket(rate=0.001, capacity=1, max_keys=2)
+        with patch("api.middleware.token_bucket.time.monotonic", return_value=100.0):
+            assert bucket.try_consume("a") is True
+            assert bucket.try_consume("b") is True
+            assert bucket.try_consume("a") is False  # "a" is now the most recent
+            assert bucket.try_consume("c") is True  # Evicts "b", still refilling
+        assert list(bucket._state) == ["a", "c"]
+
+    def test_chart_endpoint_returns_429_when_bucket_empty(self):
+        from api.main import app
+        from api.middleware import rate_limit
+
+        client = TestClient(app)
+        with patch("config.config.rate_limit", "2/hour"):
+            rate_limit._buckets.pop("2/hour", None)
+            codes = [
+                client.post("/v1/charts", data={"data": "A,B\n1,2", "chart_type": "bar"}).status_code
+                for _ in range(3)
+            ]
+            rate_limit._buckets.pop("2/hour", None)
+        assert codes == [200, 200, 429]
+
+    def test_zero_rate_plan_blocks_with_429(self):
+        from api.main import app
+        from api.middleware import rate_limit
+
+        client = TestClient(app)
+        with patch("config.config.rate_limit", "0/minute"):
+            rate_limit._buckets.pop("0/minute", None)
+            resp = client.post("/v1/charts", data={"data": "A,B\n1,2", "chart_type": "bar"})
+            rate_limit._buckets.pop("0/minute", None)
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == str(rate_limit._MAX_RETRY_AFTER_S)
+
+    def test_shared_limiter_uses_plan_limit(self):
+        """With shared storage, slowapi counts against the plan's limit, not the global default."""
+        from api.main import app
+        from api.middleware import rate_limit
+
+        client = TestClient(app)
+        rate_limit.limiter.enabled = True
+        try:
+            with patch("config.config.rate_limit", "5/minute"):
+                rate_limit._buckets.pop("5/minute", None)
+                resp = client.post("/v1/charts", data={"data": "A,B\n1,2", "chart_type": "bar"})
+                rate_limit._buckets.pop("5/minute", None)
+            keys = list(rate_limit.limiter._storage.storage)
+        finally:
+            rate_limit.limiter.enabled = False
+            rate_limit.limiter.reset()
+        assert resp.status_code == 200
+        assert any(k.endswith("/5/1/minute") and "5/minute@" in k for k in keys)
+
+    def test_plan_limit_read_back_from_key(self):
+        from api.middleware.rate_limit import DEFAULT_RATE_LIMIT, _plan_limit
+
+        assert _plan_limit("300/minute;5000/hour@tenant:7") == "300/minute;5000/hour"
+        assert _plan_limit("127.0.0.1") == DEFAULT_RATE_LIMIT
@@ -39,8 +39,8 @@ class TestChartStore:
 
         data = store.get(chart_id)
         assert data is not None
-        assert "figure_json" in data
-        assert "dataframe_dict" in data
+        assert "figure" in data
+        assert "dataframe" in data
         assert "config" in data
         assert "created_at" in data
 
@@ -84,3 +84,39 @@ class TestChartStore:
         assert isinstance(config, ChartConfig)
         assert config.chart_type == "bar"
         assert config.x_column == "X"
+
+    def test_expired_charts_removed_on_save(self, sample_fig, sample_df, sample_config):
+        store = ChartStore(ttl_hours=0)
+        old_id = store.save(sample_fig, sample_df, sample_config)
+        store.save(sample_fig, sample_df, sample_config)
+        assert not store.exists(old_id)
+
+    def test_resave_keeps_chart_alive(self, store, sample_fig, sample_df, sample_config):
+        store.save(sample_fig, sample_df, sample_config, chart_id="same")
+        store.save(sample_fig, sample_df, sample_config, chart_id="same")
+        store._cleanup()
+        assert store.exists("same")
+
+    def test_get_figure_json_is_lazy_and_cached(self, store, sample_fig, sample_df, sample_config):
+        import json
+
+        chart_id = store.save(sample_fig, sample_df, sample_config)
+        assert "figure_json" not in store.get(chart_id)
+        fig_json = store.get_figure_json(chart_id)
+        assert json.loads(fig_json)["data"][0]["type"] == "bar"
+        assert store.get_figure_json(chart_id) is fig_json
+        assert store.get_figure_json("nope") is None
+
+    def test_embed_html_and_png_are_cached(self, store, sample_fig, sample_df, sample_config):
+        from unittest.mock import patch
+
+        chart_id = store.save(sample_fig, sample_df, sample_config)
+        html = store.get_embed_html(chart_id)
+        assert isinstance(html, bytes) and b"plotly" in html.lower()
+        assert store.get_embed_html(chart_id) is html
+        with patch("chart_service.exporters.image.pio.to_image", return_value=b"\x89PNG") as to_image:
+            assert store.get_png(chart_id) == b"\x89PNG"
+            assert store.get_png(chart_id) == b"\x89PNG"
+        assert to_image.call_count == 1
+        assert store.get_embed_html("nope") is None
+        assert store.get_png("nope") is None
@@ -0,0 +1,61 @@
+"""
+Tests for the TTL cache used on auth hot paths.
+"""
+
+from __future__ import annotations
+
+import time
+
+from api.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    def test_set_and_get(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+    def test_missing_returns_default(self):
+        cache = TTLCache()
+        assert cache.get("nope") is None
+        assert cache.get("nope", 5) == 5
+
+    def test_entries_expire(self):
+        cache = TTLCache(ttl=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_per_entry_ttl_override(self):
+        cache = TTLCache(ttl=60)
+        cache.set("short", 1, ttl=0)
+        cache.set("long", 2)
+        assert cache.get("short") is None
+        assert cache.get("long") == 2
+
+    def test_evicts_oldest_when_full(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+    def test_pop_and_clear(self):
+        cache = TTLCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.pop("a") == 1
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_incr_only_touches_live_entries(self):
+        cache = TTLCache(ttl=60)
+        cache.set("n", 1)
+        cache.incr("n")
+        cache.incr("missing")
+        assert cache.get("n") == 2
+        assert cache.get("missing") is None
@@ -0,0 +1,134 @@
+"""
+Tests for the tenant quota counter (SQLite fallback; Redis is optional).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from api.usage import UsageTracker
+from api.usage_counter import QuotaCounter, _seconds_until_period_end
+
+
+@pytest.fixture
+def tracker():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    t = UsageTracker(db_path=path)
+    yield t
+    t.flush()
+    os.unlink(path)
+
+
+class TestQuotaCounterFallback:
+    def test_allows_until_limit(self, tracker):
+        counter = QuotaCounter(tracker=tracker)
+        assert asyncio.run(counter.incr_and_check(1, limit=2)) is True
+        tracker.record_for_tenant(1)
+        tracker.record_for_tenant(1)
+        assert asyncio.run(counter.incr_and_check(1, limit=2)) is False
+        assert asyncio.run(counter.incr_and_check(2, limit=2)) is True  # Other tenant
+
+    def test_release_is_noop_without_redis(self, tracker):
+        counter = QuotaCounter(tracker=tracker)
+        asyncio.run(counter.release(1))
+        assert tracker.get_count_for_tenant(1) == 0
+
+
+class _FakeRedis:
+    """Just the async redis calls QuotaCounter makes."""
+
+    def __init__(self):
+        self.values: dict[str, int] = {}
+        self.expiry: dict[str, int] = {}
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = int(value)
+        if ex is not None:
+            self.expiry[key] = ex
+        return True
+
+    async def incr(self, key):
+        return await self.incrby(key, 1)
+
+    async def incrby(self, key, amount):
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+    async def decr(self, key):
+        return await self.incrby(key, -1)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client, self._calls = client, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, nx=False, ex=None):
+        self._calls.append(lambda: self._client.set(key, value, nx=nx, ex=ex))
+
+    def incr(self, key):
+        self._calls.append(lambda: self._client.incr(key))
+
+    async def execute(self):
+        return [await call() for call in self._calls]
+
+
+class TestQuotaCounterRedis:
+    def test_seeds_from_tracker_only_when_key_is_created(self, tracker):
+        for _ in range(3):
+            tracker.record_for_tenant(7)
+        counter = QuotaCounter(redis_url="redis://unused", tracker=tracker)
+        counter._redis = fake = _FakeRedis()
+
+        with patch.object(tracker, "get_count_for_tenant", wraps=tracker.get_count_for_tenant) as seed:
+            assert asyncio.run(counter.incr_and_check(7, limit=5)) is True  # 3 persisted + 1
+            assert asyncio.run(counter.incr_and_check(7, limit=5)) is True
+            assert asyncio.run(counter.incr_and_check(7, limit=5)) is False
+        assert seed.call_count == 1
+        (key,) = fake.values
+        assert fake.values[key] == 5  # The rejected request was given back
+        assert fake.expiry[key] > 0
+
+    def test_seed_set_by_another_worker_is_kept(self, tracker):
+        for _ in range(3):
+            tracker.record_for_tenant(7)
+        counter = QuotaCounter(redis_url="redis://unused", tracker=tracker)
+        counter._redis = fake = _FakeRedis()
+
+        async def seeded_meanwhile(key):
+            # Another worker seeds and counts between our EXISTS and our SET NX
+            fake.values[key] = 4
+            return 0
+
+        with patch.object(fake, "exists", side_effect=seeded_meanwhile):
+            assert asyncio.run(counter.incr_and_check(7, limit=5)) is True
+        (key,) = fake.values
+        assert fake.values[key] == 5  # Their seed kept, our request counted on top
+
+
+def test_period_expiry_covers_rest_of_month():
+    now = 1709121600.0  # 2024-02-28 12:00 UTC
+    with patch("api.usage.time.time", return_value=now), patch("api.usage_counter.time.time", return_value=now), \
+            patch("api.usage._period_cache", ("", 0.0)):
+        seconds = _seconds_until_period_end()
+    assert seconds > 36 * 3600  # Rest of Feb 28-29 plus grace
+    assert seconds < 3 * 24 * 3600